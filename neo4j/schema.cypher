@@ -122,5 +122,5 @@ ON (s.nazev, s.mesto);
 // (:Firma)-[:PODAVA_NABIDKU {datum_podani, nabidkova_cena, mena, zdroj_id}]->(:Zakazka)
 // (:Firma)-[:JE_PRIDELENA {smlouva_id, platnost_od, platnost_do, hodnota, mena, zdroj_id}]->(:Zakazka)
 // (:Osoba)-[:STUDOVAL_NA {obor, od, do, zdroj_id}]->(:Skola)
-// (:Any)-[:POCHAZI_Z {datum_ziskani}]->(:Zdroj)
+// (:Any)-[:POCHAZI_Z {datum_ziskani, datum_posledniho_ziskani}]->(:Zdroj)
 // (:Zadavatel)-[:VYHLASUJE_ZAKAZKU {datum_vyhlaseni, zdroj_id}]->(:Zakazka)
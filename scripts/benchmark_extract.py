@@ -0,0 +1,299 @@
+"""
+benchmark_extract.py
+
+Benchmarky extrakce a transformace nad syntetickými daty (viz generate_synthetic_dumps.py).
+
+Měří:
+- extract_contracts: extract_contracts_from_xml (streamovaně) nad syntetickým dumpem Registru smluv
+- extract_persons: extract_person_from_xml nad syntetickou odpovědí RZP
+- transform: Neo4jTransformer - smlouvy a osoby z RZP do uzlů a vztahů
+- snapshot: zápis snapshotu transformovaných dat (save_transformed_data)
+- transform_streaming: transformace i zápis snapshotu ve streamovaném režimu (shardy, omezená paměť)
+
+Pro každý benchmark a velikost dat se měří nejlepší čas z --repeat běhů,
+počet záznamů za sekundu a špičková alokovaná paměť (tracemalloc, v samostatném
+běhu - tracemalloc měření zpomaluje). Výsledky lze uložit jako baseline
+(--save-baseline) a další běhy s ní porovnat (--check vrátí chybu při regresi).
+"""
+
+from pathlib import Path
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import argparse
+import io
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import scripts.extract_smlouvy_contracts as extract_smlouvy
+from scripts.extract_rzp import extract_person_from_xml
+from scripts.generate_synthetic_dumps import DEFAULT_SEED, ensure_synthetic_data, format_scale, parse_scale
+from scripts.transform_to_neo4j import Neo4jTransformer
+
+BASE_DIR = Path(__file__).parent.parent
+BASELINE_FILE = BASE_DIR / "data" / "benchmarks" / "baselines.json"
+
+BENCHMARKS = ("extract_contracts", "extract_persons", "transform", "snapshot", "transform_streaming")
+DEFAULT_REPEAT = 3
+
+# Poměr času vůči baseline, od kterého se výsledek hlásí jako regrese
+REGRESSION_THRESHOLD = 1.25
+
+
+@contextmanager
+def quiet() -> Iterator[None]:
+    """Potlačí průběžné výpisy měřených funkcí."""
+    with redirect_stdout(io.StringIO()):
+        yield
+
+
+def measure(run: Callable[[], int], repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """
+    Změří funkci vracející počet zpracovaných záznamů.
+
+    Čas je nejlepší z repeat běhů, paměť je špička tracemalloc v dalším běhu.
+    """
+    best = None
+    records = 0
+    for _ in range(repeat):
+        with quiet():
+            started = time.perf_counter()
+            records = run()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        with quiet():
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "records": records,
+        "seconds": round(best, 4),
+        "records_per_s": round(records / best) if best else 0,
+        "peak_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+class BenchmarkData:
+    """Syntetická data jedné velikosti a mezivýsledky sdílené benchmarky (připravují se líně)."""
+
+    def __init__(self, records: int, seed: int, work_dir: Path):
+        self.dump_path, self.rzp_path = ensure_synthetic_data(records, seed)
+        self.work_dir = work_dir
+        self._contracts = None
+        self._persons_file = None
+        self._persons_count = 0
+
+    @property
+    def contracts(self) -> List[Any]:
+        if self._contracts is None:
+            with quiet():
+                self._contracts = extract_smlouvy.extract_contracts_from_xml(self.dump_path, streaming=True)
+        return self._contracts
+
+    @property
+    def persons_file(self) -> Path:
+        """Osoby z RZP uložené jako extrahovaný soubor (vstup transform_rzp_data)."""
+        if self._persons_file is None:
+            with quiet():
+                persons = extract_person_from_xml(self.rzp_path)
+            self._persons_count = len(persons)
+            self._persons_file = self.work_dir / "rzp_persons_synthetic.json"
+            with open(self._persons_file, 'w', encoding='utf-8') as f:
+                json.dump(persons, f, ensure_ascii=False)
+        return self._persons_file
+
+    @property
+    def persons_count(self) -> int:
+        self.persons_file
+        return self._persons_count
+
+    def transform(self, streaming: bool = False) -> Neo4jTransformer:
+        """Transformuje smlouvy i osoby z RZP stejně jako transform_all (bez ostatních zdrojů)."""
+        transformer = Neo4jTransformer(streaming=streaming, output_dir=str(self.work_dir / "transformed"))
+
+        zdroj_smlouvy = transformer.get_or_create_zdroj("REGISTR_SMLUV", "Registr smluv", "https://smlouvy.gov.cz", "registr")
+        transformer.transform_smlouvy_contract_records(self.contracts, zdroj_smlouvy)
+        zdroj_rzp = transformer.get_or_create_zdroj("RZP", "Registr živnostenského podnikání", "https://rzp.gov.cz", "registr")
+        transformer.transform_rzp_data(str(self.persons_file), zdroj_rzp)
+        return transformer
+
+
+def run_benchmark(name: str, data: BenchmarkData, repeat: int) -> Dict[str, Any]:
+    """Připraví vstupy benchmarku (mimo měření) a změří ho."""
+    if name == "extract_contracts":
+        return measure(lambda: len(extract_smlouvy.extract_contracts_from_xml(data.dump_path, streaming=True)), repeat)
+
+    if name == "extract_persons":
+        return measure(lambda: len(extract_person_from_xml(data.rzp_path)), repeat)
+
+    if name == "transform":
+        records = len(data.contracts) + data.persons_count
+
+        def transform() -> int:
+            data.transform()
+            return records
+
+        return measure(transform, repeat)
+
+    if name == "snapshot":
+        with quiet():
+            transformer = data.transform()
+
+        def save() -> int:
+            transformer.save_transformed_data()
+            return (
+                sum(len(nodes) for nodes in transformer.nodes.values())
+                + sum(len(rels) for rels in transformer.relationships.values())
+            )
+
+        return measure(save, repeat)
+
+    if name == "transform_streaming":
+        records = len(data.contracts) + data.persons_count
+
+        def transform_streaming() -> int:
+            data.transform(streaming=True).save_transformed_data()
+            return records
+
+        return measure(transform_streaming, repeat)
+
+    raise ValueError(f"Neznámý benchmark: {name}")
+
+
+def result_key(name: str, records: int) -> str:
+    """Klíč výsledku v baseline (např. "extract_contracts@10k")."""
+    return f"{name}@{format_scale(records)}"
+
+
+def load_baselines() -> Dict[str, Any]:
+    """Načte uložené baseline (prázdné, pokud ještě neexistují)."""
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"results": {}}
+
+
+def save_baselines(results: Dict[str, Dict[str, Any]]) -> None:
+    """Uloží výsledky jako baseline (ostatní uložené velikosti a benchmarky zůstanou)."""
+    baselines = load_baselines()
+    baselines["results"].update(results)
+    baselines.update({
+        "updated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "xml_parser": extract_smlouvy.resolve_parser(),
+    })
+
+    BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, ensure_ascii=False, sort_keys=True)
+    print(f"[benchmark] Baseline uložena: {BASELINE_FILE}")
+
+
+def format_result(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> str:
+    """Řádek výsledku, případně s porovnáním vůči baseline."""
+    line = (
+        f"{result['seconds']:>9.3f} s  {result['records_per_s']:>10} záz./s  "
+        f"{result['peak_mb']:>9.1f} MB"
+    )
+    if baseline:
+        ratio = result["seconds"] / baseline["seconds"] if baseline["seconds"] else 0.0
+        line += f"  (baseline {baseline['seconds']:.3f} s, {baseline['peak_mb']:.1f} MB, čas {ratio:.2f}×)"
+    return line
+
+
+def run_benchmarks(
+    scales: List[int],
+    benchmarks: List[str],
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = DEFAULT_SEED,
+    threshold: float = REGRESSION_THRESHOLD
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Spustí benchmarky pro všechny velikosti dat a vypíše je spolu s porovnáním vůči baseline.
+
+    Returns:
+        Slovník {klíč výsledku: výsledek}; regrese jsou označeny klíčem "regression"
+    """
+    baselines = load_baselines()["results"]
+    results = {}
+
+    work_dir = Path(tempfile.mkdtemp(prefix="benchmark_extract_"))
+    try:
+        for records in scales:
+            print(f"\n[benchmark] Data: {format_scale(records)} záznamů (seed {seed})")
+            data = BenchmarkData(records, seed, work_dir)
+
+            for name in benchmarks:
+                key = result_key(name, records)
+                result = run_benchmark(name, data, repeat)
+                baseline = baselines.get(key)
+                if baseline and baseline.get("seconds") and result["seconds"] / baseline["seconds"] > threshold:
+                    result["regression"] = True
+                results[key] = result
+
+                flag = "  ⚠ REGRESE" if result.get("regression") else ""
+                print(f"  {name:<18} {format_result(result, baseline)}{flag}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    """CLI argumenty pro samostatné použití."""
+    parser = argparse.ArgumentParser(
+        description="Benchmarky extrakce a transformace nad syntetickými dumpy."
+    )
+    parser.add_argument("--scale", type=parse_scale, action="append",
+                        help="Počet záznamů syntetických dat (např. 10k, 1M, 10M); lze zadat vícekrát (výchozí: 10k)")
+    parser.add_argument("--only", choices=BENCHMARKS, action="append",
+                        help="Spustit jen vybraný benchmark; lze zadat vícekrát")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"Počet měřených běhů, bere se nejlepší (výchozí: {DEFAULT_REPEAT})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help=f"Semínko syntetických dat (výchozí: {DEFAULT_SEED})")
+    parser.add_argument("--parser", choices=extract_smlouvy.XML_PARSERS, default=extract_smlouvy.XML_PARSER,
+                        help="Parser XML pro extrakci smluv")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"Uložit výsledky jako baseline ({BASELINE_FILE.relative_to(BASE_DIR)})")
+    parser.add_argument("--check", action="store_true",
+                        help="Skončit s chybou, pokud je některý benchmark pomalejší než baseline × --threshold")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help=f"Poměr času vůči baseline považovaný za regresi (výchozí: {REGRESSION_THRESHOLD})")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    extract_smlouvy.XML_PARSER = args.parser
+
+    results = run_benchmarks(
+        args.scale or [10_000],
+        args.only or list(BENCHMARKS),
+        repeat=args.repeat,
+        seed=args.seed,
+        threshold=args.threshold
+    )
+
+    if args.save_baseline:
+        save_baselines({key: {k: v for k, v in result.items() if k != "regression"} for key, result in results.items()})
+
+    regressions = [key for key, result in results.items() if result.get("regression")]
+    if regressions:
+        print(f"\n⚠ Regrese oproti baseline: {', '.join(regressions)}")
+        if args.check:
+            exit(1)
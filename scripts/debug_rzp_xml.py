@@ -1,9 +1,14 @@
 """Debug script to inspect RZP XML structure"""
+import sys
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
-xml_file = Path("data/people/raw/rzp/rzp_ico_47114983.xml")
-tree = ET.parse(xml_file)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.smlouvy_dump import open_dump
+
+xml_file = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/people/raw/rzp/rzp_ico_47114983.xml")
+with open_dump(xml_file) as f:
+    tree = ET.parse(f)
 root = tree.getroot()
 
 ns = "{urn:cz:isvs:rzp:schemas:VerejnaCast:v1}"
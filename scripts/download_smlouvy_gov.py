@@ -4,17 +4,39 @@ download_smlouvy_gov.py
 Stahování open dat z Registru smluv (smlouvy.gov.cz).
 
 Verze 0.2:
-- stáhne index dumpů (index.xml)
+- stáhne index dumpů (index.xml) - podmíněně (ETag/Last-Modified), rozparsovaný drží v cache
 - umí:
     a) najít a stáhnout poslední "dokončený" měsíční dump
     b) nebo stáhnout konkrétní rok + měsíc (pokud jsou zadány)
+    c) vypsat denní dumpy novější než zadané datum (denní inkrementální režim)
+    d) souběžně stáhnout rozsah měsíců (--from/--to) přes sdílenou HTTP session
 - soubory ukládá do: data/tenders/raw/smlouvy_gov/
+- stahuje přes .part soubor s navazováním (HTTP Range) a ověřením velikosti a hashe
+- ke staženému dumpu uloží Bloom filtr IČO (pro rychlé vyřazení dumpů)
+- ověřený dump volitelně uloží komprimovaně (gzip nebo zstd; výchozí bez komprese)
 """
 
 from pathlib import Path
 import requests
 import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 import argparse
+import hashlib
+import json
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.smlouvy_dump import (
+    build_ico_bloom, compress_dump, find_stored_dump, glob_dumps, is_compressed, iter_months,
+    parse_year_month, COMPRESSION_SUFFIXES
+)
+from scripts.extract_smlouvy_contracts import load_metadata, update_metadata, METADATA_DIR
 
 BASE_URL = "https://data.smlouvy.gov.cz"
 INDEX_URL = f"{BASE_URL}/index.xml"
@@ -25,14 +47,40 @@ XML_NS = "http://portal.gov.cz/rejstriky/ISRS/1.2/"
 # Make path relative to script location, not current working directory
 RAW_DIR = Path(__file__).parent.parent / "data" / "tenders" / "raw" / "smlouvy_gov"
 
+# Lokální cache rozparsovaného index.xml (obnovuje se podmíněným GET)
+INDEX_CACHE_FILE = METADATA_DIR / "smlouvy_gov_index.json"
+INDEX_CACHE_VERSION = 1
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_WORKERS = 4
+
+# Komprese uložených dumpů: None, "gzip" nebo "zstd" (vyžaduje zstandard).
+# Výchozí je bez komprese - komprimovaný dump nejde mapovat do paměti, takže
+# extrakce nad ním nemůže použít paralelní čtení, předfiltr ani index IČO.
+RAW_COMPRESSION: Optional[str] = None
+
+
+def create_session(pool_size: int = DOWNLOAD_WORKERS) -> requests.Session:
+    """
+    Vytvoří sdílenou HTTP session s poolem spojení pro souběžné stahování.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
-def download_index() -> ET.Element:
+def download_index(session: Optional[requests.Session] = None) -> ET.Element:
     """
     Stáhne indexový soubor (index.xml) a vrátí jej jako XML root element.
+
+    Pro opakované dotazy je výhodnější load_dump_index() (cache + podmíněný GET).
     """
     RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-    resp = requests.get(INDEX_URL, timeout=60)
+    resp = (session or requests).get(INDEX_URL, timeout=60)
     resp.raise_for_status()
     
     try:
@@ -41,102 +89,436 @@ def download_index() -> ET.Element:
         raise ValueError(f"Chyba při parsování XML indexu: {e}") from e
 
 
-def select_latest_finished_dump(index_root: ET.Element) -> dict:
+def parse_index_dumps(index_root: ET.Element) -> List[dict]:
     """
-    Z indexu vybere poslední "dokončený" dump.
+    Převede XML index na seznam dumpů (rok, mesic, den, dokonceny, url, size, hash).
 
-    Index obsahuje prvky <dump>, u nichž je:
-    - rok
-    - mesic
-    - dokoncenyMesic (0/1)
-    - odkaz (URL na dump)
-
-    Vrací slovník s klíči: rok, mesic, url
+    Měsíční dumpy mají den None.
     """
     dumps = []
-
-    for dump in index_root.findall(f".//{{{XML_NS}}}dump"):
+    for dump in index_root.iter(f"{{{XML_NS}}}dump"):
         try:
             rok = int(dump.findtext(f"{{{XML_NS}}}rok"))
             mesic = int(dump.findtext(f"{{{XML_NS}}}mesic"))
+            den_elem = dump.findtext(f"{{{XML_NS}}}den")
+            den = int(den_elem) if den_elem else None
         except (TypeError, ValueError):
             continue
 
-        dokonceny = dump.findtext(f"{{{XML_NS}}}dokoncenyMesic") == "1"
-        url = dump.findtext(f"{{{XML_NS}}}odkaz")
+        dumps.append({
+            "rok": rok,
+            "mesic": mesic,
+            "den": den,
+            "dokonceny": dump.findtext(f"{{{XML_NS}}}dokoncenyMesic") == "1",
+            "url": dump.findtext(f"{{{XML_NS}}}odkaz"),
+            **dump_checksums(dump),
+        })
+    return dumps
 
-        if not url:
-            continue
 
-        dumps.append(
-            {
-                "rok": rok,
-                "mesic": mesic,
-                "dokonceny": dokonceny,
-                "url": url,
-            }
-        )
-
-    finished = [d for d in dumps if d["dokonceny"]]
-    if not finished:
-        raise ValueError("V indexu není žádný dump označený jako dokončený měsíc.")
+class DumpIndex:
+    """
+    Rozparsovaný index dumpů s vyhledáním v O(1) podle (rok, měsíc) nebo (rok, měsíc, den).
+    """
+
+    def __init__(self, dumps: List[dict]):
+        self.dumps = dumps
+        self.monthly: Dict[Tuple[int, int], dict] = {}
+        self.daily: Dict[Tuple[int, int, int], dict] = {}
+        self.latest_daily: Dict[Tuple[int, int], dict] = {}
+        self.latest_finished: Optional[dict] = None
+
+        for dump in dumps:
+            month_key = (dump["rok"], dump["mesic"])
+            if dump["den"] is None:
+                # Při duplicitě platí první výskyt v indexu
+                self.monthly.setdefault(month_key, dump)
+                if dump["dokonceny"] and dump["url"] and (
+                    self.latest_finished is None
+                    or month_key > (self.latest_finished["rok"], self.latest_finished["mesic"])
+                ):
+                    self.latest_finished = dump
+            else:
+                self.daily.setdefault(month_key + (dump["den"],), dump)
+                latest = self.latest_daily.get(month_key)
+                if dump["url"] and (latest is None or dump["den"] > latest["den"]):
+                    self.latest_daily[month_key] = dump
+
+    @classmethod
+    def from_xml(cls, index_root: ET.Element) -> "DumpIndex":
+        return cls(parse_index_dumps(index_root))
+
+
+def as_dump_index(index) -> DumpIndex:
+    """Přijme DumpIndex nebo XML root indexu (zpětná kompatibilita) a vrátí DumpIndex."""
+    if isinstance(index, DumpIndex):
+        return index
+    return DumpIndex.from_xml(index)
+
+
+def read_index_cache() -> Optional[dict]:
+    """Načte lokální cache rozparsovaného indexu, pokud existuje."""
+    if not INDEX_CACHE_FILE.exists():
+        return None
+    try:
+        with open(INDEX_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("version") != INDEX_CACHE_VERSION:
+        return None
+    return cache
+
+
+def write_index_cache(dumps: List[dict], etag: Optional[str], last_modified: Optional[str]) -> None:
+    """Uloží rozparsovaný index spolu s ETag/Last-Modified pro podmíněný GET."""
+    INDEX_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    cache = {
+        "version": INDEX_CACHE_VERSION,
+        "url": INDEX_URL,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": datetime.now().isoformat(),
+        "dumps": dumps,
+    }
+    tmp_path = INDEX_CACHE_FILE.with_name(INDEX_CACHE_FILE.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    tmp_path.replace(INDEX_CACHE_FILE)
+
+
+def load_dump_index(session: Optional[requests.Session] = None, use_cache: bool = True) -> DumpIndex:
+    """
+    Vrátí rozparsovaný index dumpů.
+
+    Index se stahuje podmíněně (If-None-Match / If-Modified-Since podle lokální
+    cache); při odpovědi 304 se použije cache bez stahování a parsování XML.
+    Pokud server není dostupný a cache existuje, použije se cache.
+    """
+    cache = read_index_cache() if use_cache else None
+
+    headers = {}
+    if cache and cache.get("url") == INDEX_URL:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    try:
+        resp = (session or requests).get(INDEX_URL, timeout=60, headers=headers)
+        if resp.status_code == 304 and headers:
+            print("[smlouvy.gov.cz] Index se nezměnil, používám lokální cache")
+            return DumpIndex(cache["dumps"])
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        if cache is None:
+            raise
+        print(f"[smlouvy.gov.cz] ⚠ Index nelze stáhnout ({e}), používám lokální cache z {cache.get('fetched_at')}")
+        return DumpIndex(cache["dumps"])
 
-    finished.sort(key=lambda d: (d["rok"], d["mesic"]), reverse=True)
-    return finished[0]
+    try:
+        index_root = ET.fromstring(resp.content)
+    except ET.ParseError as e:
+        raise ValueError(f"Chyba při parsování XML indexu: {e}") from e
+
+    dumps = parse_index_dumps(index_root)
+    if use_cache:
+        write_index_cache(dumps, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return DumpIndex(dumps)
+
+
+def select_latest_finished_dump(index) -> dict:
+    """
+    Z indexu vybere poslední "dokončený" dump.
 
+    Index obsahuje prvky <dump>, u nichž je:
+    - rok
+    - mesic
+    - dokoncenyMesic (0/1)
+    - odkaz (URL na dump)
 
-def select_specific_dump(index_root: ET.Element, year: int, month: int) -> dict:
+    Vrací slovník s klíči: rok, mesic, url (a dokonceny, size, hash z indexu)
+    """
+    latest = as_dump_index(index).latest_finished
+    if latest is None:
+        raise ValueError("V indexu není žádný dump označený jako dokončený měsíc.")
+    return dict(latest)
+
+
+def select_specific_dump(index, year: int, month: int) -> dict:
     """
     Z indexu vybere dump pro konkrétní rok+měsíc.
 
     Pokud dump neexistuje nebo není označený jako dokončený,
     vyhodí výjimku.
     """
-    for dump in index_root.findall(f".//{{{XML_NS}}}dump"):
-        try:
-            rok = int(dump.findtext(f"{{{XML_NS}}}rok"))
-            mesic = int(dump.findtext(f"{{{XML_NS}}}mesic"))
-        except (TypeError, ValueError):
-            continue
+    dump = as_dump_index(index).monthly.get((year, month))
+    if dump is None:
+        raise ValueError(f"Dump pro {year}-{month:02d} nebyl v indexu nalezen.")
+    if not dump["dokonceny"]:
+        raise ValueError(f"Dump {year}-{month:02d} není označen jako dokončený.")
+    if not dump["url"]:
+        raise ValueError(f"Dump {year}-{month:02d} nemá URL v indexu.")
+    return dict(dump)
 
-        if rok == year and mesic == month:
-            dokonceny = dump.findtext(f"{{{XML_NS}}}dokoncenyMesic") == "1"
-            url = dump.findtext(f"{{{XML_NS}}}odkaz")
-            if not dokonceny:
-                raise ValueError(f"Dump {year}-{month:02d} není označen jako dokončený.")
-            if not url:
-                raise ValueError(f"Dump {year}-{month:02d} nemá URL v indexu.")
-            return {"rok": rok, "mesic": mesic, "url": url}
 
-    raise ValueError(f"Dump pro {year}-{month:02d} nebyl v indexu nalezen.")
+def dump_checksums(dump: ET.Element) -> dict:
+    """
+    Vrátí velikost a hash dumpu z indexu (prvky velikostDumpu a hashDumpu), pokud je index uvádí.
+    """
+    size = None
+    try:
+        size = int(dump.findtext(f"{{{XML_NS}}}velikostDumpu"))
+    except (TypeError, ValueError):
+        pass
+
+    hash_elem = dump.find(f"{{{XML_NS}}}hashDumpu")
+    hash_value = hash_elem.text.strip().lower() if hash_elem is not None and hash_elem.text else None
+    hash_algorithm = hash_elem.get("algoritmus", "sha256").lower() if hash_elem is not None else "sha256"
+
+    return {"size": size, "hash": hash_value, "hash_algorithm": hash_algorithm}
+
+
+def record_download(
+    filename: str,
+    url: str,
+    size: int,
+    digest: str,
+    hash_algorithm: str,
+    stored_path: Optional[Path] = None
+) -> None:
+    """Zapíše ověřený stažený dump (a případně jeho komprimovanou podobu) do metadat."""
+    with update_metadata(touched="last_download") as metadata:
+        metadata.setdefault("downloads", {})[filename] = {
+            "url": url,
+            "size": size,
+            "hash": digest,
+            "hash_algorithm": hash_algorithm,
+            "verified_at": datetime.now().isoformat(),
+        }
+        if stored_path is not None and stored_path.name != filename:
+            metadata["downloads"][filename]["stored_as"] = stored_path.name
+            metadata["downloads"][filename]["stored_size"] = stored_path.stat().st_size
+        dump_key = Path(filename).stem.replace("dump_", "")
+        if dump_key not in metadata["downloaded_months"]:
+            metadata["downloaded_months"].append(dump_key)
+
+
+def is_verified_download(target_path: Path) -> bool:
+    """Zda je soubor zapsán v metadatech jako ověřený a od té doby nezměnil velikost."""
+    entry = load_metadata().get("downloads", {}).get(target_path.name)
+    return entry is not None and entry.get("size") == target_path.stat().st_size
+
+
+def content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """Celková velikost z hlavičky Content-Range ("bytes 0-99/1234", "bytes */1234")."""
+    if not content_range or "/" not in content_range:
+        return None
+    try:
+        return int(content_range.rsplit("/", 1)[1])
+    except ValueError:
+        return None
 
 
-def download_dump(dump_url: str) -> Path:
+def probe_remote_size(dump_url: str, session: Optional[requests.Session] = None) -> Optional[int]:
+    """
+    Zjistí velikost dumpu na serveru bez stažení obsahu (HEAD, případně Range na první bajt).
+
+    Vrací None, pokud ji server neuvádí nebo není dostupný.
+    """
+    try:
+        resp = (session or requests).head(dump_url, timeout=60, allow_redirects=True)
+        if resp.ok and resp.headers.get("Content-Length"):
+            return int(resp.headers["Content-Length"])
+
+        resp = (session or requests).get(dump_url, stream=True, timeout=60, headers={"Range": "bytes=0-0"})
+        try:
+            if resp.status_code == 206:
+                return content_range_total(resp.headers.get("Content-Range"))
+        finally:
+            resp.close()
+    except (requests.RequestException, ValueError) as e:
+        print(f"[smlouvy.gov.cz] ⚠ Velikost dumpu nelze zjistit ({e})")
+    return None
+
+
+def download_dump(
+    dump_url: str,
+    expected_size: Optional[int] = None,
+    expected_hash: Optional[str] = None,
+    hash_algorithm: str = "sha256",
+    session: Optional[requests.Session] = None,
+    on_chunk: Optional[Callable[[bytes], None]] = None
+) -> Path:
     """
     Stáhne XML dump z dané URL do RAW_DIR.
 
-    Pokud soubor už existuje, znovu ho nestahuje a pouze vrátí cestu.
+    Stahuje se do souboru `.part`, který se po přerušení navazuje HTTP Range
+    požadavkem. Na finální jméno se přesune až po ověření velikosti (z indexu,
+    jinak z hlaviček odpovědi) a hashe (pokud ho index uvádí); ověření se zapíše
+    do metadat.
+
+    Pokud soubor už existuje, znovu ho nestahuje a pouze vrátí cestu. Neúplný
+    soubor (menší než velikost z indexu) se přejmenuje na `.part` a dotáhne.
+    Bez velikosti v indexu se existujícímu souboru věří, jen pokud je v metadatech
+    jako ověřený; jinak se velikost zjistí ze serveru (HEAD / Range).
+
+    Volitelný `on_chunk` dostane všechny bajty dumpu popořadě (i dříve stažené
+    části `.part`) - lze tak dump parsovat ještě během stahování. Bloom filtr IČO
+    pak sestaví a uloží volající z bajtů, které už má (DumpScan); bez `on_chunk`
+    se staví po stažení dalším průchodem dumpem.
+
+    Ověřený dump se podle RAW_COMPRESSION případně uloží komprimovaně (dump.xml.gz /
+    .xml.zst); komprimovaná varianta se považuje za kompletní.
     """
     RAW_DIR.mkdir(parents=True, exist_ok=True)
 
     filename = dump_url.split("/")[-1]
     target_path = RAW_DIR / filename
+    part_path = RAW_DIR / f"{filename}.part"
+
+    stored_path = find_stored_dump(RAW_DIR, target_path.stem)
+    if stored_path is not None and is_compressed(stored_path):
+        # Komprimuje se až po ověření, komprimovaný dump je tedy kompletní
+        print(f"[smlouvy.gov.cz] Dump už existuje, nestahuji znovu: {stored_path}")
+        return stored_path
 
     if target_path.exists():
-        print(f"[smlouvy.gov.cz] Dump už existuje, nestahuji znovu: {target_path}")
-        return target_path
+        size = target_path.stat().st_size
+        if is_verified_download(target_path):
+            print(f"[smlouvy.gov.cz] Dump už existuje, nestahuji znovu: {target_path}")
+            return target_path
+        if expected_size is None:
+            expected_size = probe_remote_size(dump_url, session)
+        if size == expected_size:
+            print(f"[smlouvy.gov.cz] Dump už existuje, nestahuji znovu: {target_path}")
+            return target_path
+        if (expected_size is None or size < expected_size) and not part_path.exists():
+            print(f"[smlouvy.gov.cz] Dump je neúplný ({size} z {expected_size} B), navazuji stahování")
+            target_path.replace(part_path)
+        else:
+            target_path.unlink()
+
+    hasher = hashlib.new(hash_algorithm)
+    offset = 0
+    if part_path.exists():
+        # Hash už stažené části (při navázání se pak počítá jen z nových dat)
+        with part_path.open("rb") as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+                offset += len(chunk)
+                if on_chunk:
+                    on_chunk(chunk)
+
+    total_size = expected_size
+    attempts = 0
+    while total_size is None or offset < total_size:
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        if offset:
+            print(f"[smlouvy.gov.cz] Navazuji stahování {filename} od {offset} B")
+        else:
+            print(f"[smlouvy.gov.cz] Stahuji dump z {dump_url}")
 
-    print(f"[smlouvy.gov.cz] Stahuji dump z {dump_url}")
-    resp = requests.get(dump_url, stream=True, timeout=300)
-    resp.raise_for_status()
+        try:
+            resp = (session or requests).get(dump_url, stream=True, timeout=300, headers=headers)
+            if resp.status_code == 416:
+                # Range mimo soubor - .part už obsahuje celý dump (velikost z "bytes */N")
+                if total_size is None:
+                    total_size = content_range_total(resp.headers.get("Content-Range"))
+                    if total_size is None:
+                        total_size = offset
+                break
+            resp.raise_for_status()
+
+            # Server Range nepodporuje - už staženou část odpovědi přeskočit
+            skip = offset if resp.status_code != 206 else 0
+
+            if total_size is None:
+                remote_total = content_range_total(resp.headers.get("Content-Range"))
+                if remote_total is not None:
+                    total_size = remote_total
+                elif resp.headers.get("Content-Length"):
+                    total_size = offset - skip + int(resp.headers["Content-Length"])
+
+            with part_path.open("ab") as f:
+                for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if skip:
+                        if len(chunk) <= skip:
+                            skip -= len(chunk)
+                            continue
+                        chunk, skip = chunk[skip:], 0
+                    if chunk:
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        offset += len(chunk)
+                        if on_chunk:
+                            on_chunk(chunk)
+        except requests.RequestException as e:
+            attempts += 1
+            client_error = isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code < 500
+            if client_error or attempts > DOWNLOAD_RETRIES:
+                raise
+            print(f"[smlouvy.gov.cz] ⚠ Stahování přerušeno ({e}), pokus {attempts}/{DOWNLOAD_RETRIES}")
+            time.sleep(min(2 ** attempts, 60))
+            continue
 
-    with target_path.open("wb") as f:
-        for chunk in resp.iter_content(chunk_size=1024 * 1024):
-            if chunk:
-                f.write(chunk)
+        if total_size is None:
+            # Velikost neznáme ani z indexu, ani z hlaviček - bereme to, co server poslal
+            total_size = offset
 
-    print(f"[smlouvy.gov.cz] Dump uložen jako: {target_path}")
-    return target_path
+    if offset != total_size:
+        # .part neodpovídá dumpu na serveru - navazovat na něj nemá smysl
+        part_path.unlink()
+        raise ValueError(f"Velikost dumpu {filename} nesouhlasí: {offset} B, očekáváno {total_size} B")
+
+    digest = hasher.hexdigest()
+    if expected_hash and digest != expected_hash.lower():
+        part_path.unlink()
+        raise ValueError(f"Hash dumpu {filename} nesouhlasí ({hash_algorithm}): {digest} != {expected_hash}")
+
+    part_path.replace(target_path)
+
+    verified = f"{hash_algorithm} ověřen" if expected_hash else "velikost ověřena"
+    print(f"[smlouvy.gov.cz] Dump uložen jako: {target_path} ({offset} B, {verified})")
+
+    # Bloom filtr IČO - pipeline podle něj pozná dumpy, které IČO neobsahují
+    # (staví se ještě nad nekomprimovaným souborem, kompresí se přenese);
+    # při průběžném parsování ho sestaví volající z bajtů předaných do on_chunk
+    if on_chunk is None:
+        build_ico_bloom(target_path)
+
+    stored_path = compress_dump(target_path, RAW_COMPRESSION) if RAW_COMPRESSION else target_path
+    record_download(filename, dump_url, offset, digest, hash_algorithm, stored_path=stored_path)
+
+    return stored_path
+
+
+def compress_raw_dumps(method: str = "gzip") -> List[Path]:
+    """
+    Zkomprimuje všechny dosud nekomprimované dumpy v RAW_DIR (převod starších dat).
+    """
+    compressed = []
+    for dump_path in glob_dumps(RAW_DIR):
+        if not is_compressed(dump_path):
+            compressed.append(compress_dump(dump_path, method))
+    print(f"[smlouvy.gov.cz] ✓ Zkomprimováno {len(compressed)} dumpů")
+    return compressed
+
+
+def download_selected_dump(
+    selected: dict,
+    session: Optional[requests.Session] = None,
+    on_chunk: Optional[Callable[[bytes], None]] = None
+) -> Path:
+    """Stáhne dump vybraný z indexu (s ověřením velikosti a hashe, pokud je index uvádí)."""
+    return download_dump(
+        selected["url"],
+        expected_size=selected.get("size"),
+        expected_hash=selected.get("hash"),
+        hash_algorithm=selected.get("hash_algorithm", "sha256"),
+        session=session,
+        on_chunk=on_chunk,
+    )
 
 
 def get_latest_dump_path() -> Path:
@@ -146,9 +528,9 @@ def get_latest_dump_path() -> Path:
     Vrací:
         Path k lokálnímu XML souboru s dumpem.
     """
-    print("[smlouvy.gov.cz] Stahuji index dumpů...")
-    index_root = download_index()
-    latest = select_latest_finished_dump(index_root)
+    print("[smlouvy.gov.cz] Načítám index dumpů...")
+    dump_index = load_dump_index()
+    latest = select_latest_finished_dump(dump_index)
 
     rok = latest["rok"]
     mesic = latest["mesic"]
@@ -157,61 +539,43 @@ def get_latest_dump_path() -> Path:
     print(f"[smlouvy.gov.cz] Nejnovější dokončený dump: {rok}-{mesic:02d}")
     print(f"[smlouvy.gov.cz] URL dumpu: {url}")
 
-    dump_path = download_dump(url)
+    dump_path = download_selected_dump(latest)
     return dump_path
 
 
-def select_daily_dump(index_root: ET.Element, year: int, month: int, day: int) -> dict:
+def select_daily_dump(index, year: int, month: int, day: int) -> dict:
     """
     Z indexu vybere denní dump pro konkrétní datum.
     """
-    for dump in index_root.findall(f".//{{{XML_NS}}}dump"):
-        try:
-            rok = int(dump.findtext(f"{{{XML_NS}}}rok"))
-            mesic = int(dump.findtext(f"{{{XML_NS}}}mesic"))
-            den_elem = dump.findtext(f"{{{XML_NS}}}den")
-            if not den_elem:
-                continue
-            den = int(den_elem)
-        except (TypeError, ValueError):
-            continue
-
-        if rok == year and mesic == month and den == day:
-            url = dump.findtext(f"{{{XML_NS}}}odkaz")
-            if not url:
-                raise ValueError(f"Dump {year}-{month:02d}-{day:02d} nemá URL v indexu.")
-            return {"rok": rok, "mesic": mesic, "den": den, "url": url}
+    dump = as_dump_index(index).daily.get((year, month, day))
+    if dump is None:
+        raise ValueError(f"Dump pro {year}-{month:02d}-{day:02d} nebyl v indexu nalezen.")
+    if not dump["url"]:
+        raise ValueError(f"Dump {year}-{month:02d}-{day:02d} nemá URL v indexu.")
+    return dict(dump)
 
-    raise ValueError(f"Dump pro {year}-{month:02d}-{day:02d} nebyl v indexu nalezen.")
 
-
-def select_latest_daily_dump_in_month(index_root: ET.Element, year: int, month: int) -> dict:
+def select_latest_daily_dump_in_month(index, year: int, month: int) -> dict:
     """
     Z indexu vybere nejnovější denní dump z daného měsíce.
     """
-    dumps = []
-    for dump in index_root.findall(f".//{{{XML_NS}}}dump"):
-        try:
-            rok = int(dump.findtext(f"{{{XML_NS}}}rok"))
-            mesic = int(dump.findtext(f"{{{XML_NS}}}mesic"))
-            den_elem = dump.findtext(f"{{{XML_NS}}}den")
-            if not den_elem:
-                continue
-            den = int(den_elem)
-        except (TypeError, ValueError):
-            continue
+    dump = as_dump_index(index).latest_daily.get((year, month))
+    if dump is None:
+        raise ValueError(f"V indexu nejsou žádné denní dumpy pro {year}-{month:02d}.")
+    return dict(dump)
 
-        if rok == year and mesic == month:
-            url = dump.findtext(f"{{{XML_NS}}}odkaz")
-            if url:
-                dumps.append({"rok": rok, "mesic": mesic, "den": den, "url": url})
 
-    if not dumps:
-        raise ValueError(f"V indexu nejsou žádné denní dumpy pro {year}-{month:02d}.")
+def select_daily_dumps_after(index, after: Optional[Tuple[int, int, int]] = None) -> List[dict]:
+    """
+    Z indexu vybere všechny denní dumpy novější než zadané datum (rok, měsíc, den).
 
-    # Seřadit podle dne (nejnovější první)
-    dumps.sort(key=lambda d: d["den"], reverse=True)
-    return dumps[0]
+    Vrací seznam slovníků s klíči: rok, mesic, den, url - seřazený od nejstaršího.
+    """
+    daily = as_dump_index(index).daily
+    return [
+        dict(daily[key]) for key in sorted(daily)
+        if (after is None or key > after) and daily[key]["url"]
+    ]
 
 
 def get_dump_for_year_month(year: int, month: int, day: int = None) -> Path:
@@ -232,20 +596,20 @@ def get_dump_for_year_month(year: int, month: int, day: int = None) -> Path:
     if not (1 <= month <= 12):
         raise ValueError(f"Měsíc musí být v rozsahu 1-12, zadáno: {month}")
     
-    print("[smlouvy.gov.cz] Stahuji index dumpů...")
-    index_root = download_index()
+    print("[smlouvy.gov.cz] Načítám index dumpů...")
+    dump_index = load_dump_index()
     
     # Pokud je zadán den, stáhnout denní dump
     if day is not None:
-        selected = select_daily_dump(index_root, year, month, day)
+        selected = select_daily_dump(dump_index, year, month, day)
     else:
         # Zkusit najít měsíční dump
         try:
-            selected = select_specific_dump(index_root, year, month)
+            selected = select_specific_dump(dump_index, year, month)
         except ValueError:
             # Pokud měsíční dump neexistuje, použít nejnovější denní dump z měsíce
             print(f"[smlouvy.gov.cz] Měsíční dump neexistuje, hledám nejnovější denní dump z {year}-{month:02d}...")
-            selected = select_latest_daily_dump_in_month(index_root, year, month)
+            selected = select_latest_daily_dump_in_month(dump_index, year, month)
 
     rok = selected["rok"]
     mesic = selected["mesic"]
@@ -258,10 +622,77 @@ def get_dump_for_year_month(year: int, month: int, day: int = None) -> Path:
         print(f"[smlouvy.gov.cz] Vybraný dump: {rok}-{mesic:02d}")
     print(f"[smlouvy.gov.cz] URL dumpu: {url}")
 
-    dump_path = download_dump(url)
+    dump_path = download_selected_dump(selected)
     return dump_path
 
 
+def select_month_dump(dump_index, year: int, month: int) -> dict:
+    """
+    Vybere dump pro měsíc: dokončený měsíční dump, jinak nejnovější denní dump z měsíce.
+    """
+    try:
+        return select_specific_dump(dump_index, year, month)
+    except ValueError:
+        return select_latest_daily_dump_in_month(dump_index, year, month)
+
+
+def download_month_range(
+    start: Tuple[int, int],
+    end: Tuple[int, int],
+    workers: int = DOWNLOAD_WORKERS
+) -> Dict[Tuple[int, int], Path]:
+    """
+    Souběžně stáhne dumpy pro rozsah měsíců (backfill historie).
+
+    Index se stáhne jen jednou; dumpy se stahují v omezeném poolu vláken přes
+    jednu sdílenou session (znovupoužití spojení). Měsíce, které v indexu nejsou
+    nebo se nepodařilo stáhnout, se vypíšou v souhrnu.
+
+    Returns:
+        Slovník (rok, měsíc) -> cesta ke staženému dumpu
+    """
+    session = create_session(pool_size=workers)
+
+    print("[smlouvy.gov.cz] Načítám index dumpů...")
+    dump_index = load_dump_index(session=session)
+
+    selected = {}
+    missing = []
+    for year, month in iter_months(start, end):
+        try:
+            selected[(year, month)] = select_month_dump(dump_index, year, month)
+        except ValueError:
+            missing.append((year, month))
+
+    print(f"[smlouvy.gov.cz] Backfill {start[0]}-{start[1]:02d} až {end[0]}-{end[1]:02d}: "
+          f"{len(selected)} dumpů, {workers} souběžných stahování")
+
+    paths = {}
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(download_selected_dump, dump, session): key
+            for key, dump in selected.items()
+        }
+        for future in as_completed(futures):
+            year, month = futures[future]
+            try:
+                paths[(year, month)] = future.result()
+            except (requests.RequestException, ValueError) as e:
+                print(f"[smlouvy.gov.cz] ❌ {year}-{month:02d}: {e}")
+                failed.append((year, month))
+
+    session.close()
+
+    print(f"[smlouvy.gov.cz] ✓ Staženo {len(paths)} dumpů")
+    if missing:
+        print(f"[smlouvy.gov.cz] ⚠ V indexu chybí: {', '.join(f'{y}-{m:02d}' for y, m in missing)}")
+    if failed:
+        print(f"[smlouvy.gov.cz] ⚠ Nepodařilo se stáhnout: {', '.join(f'{y}-{m:02d}' for y, m in sorted(failed))}")
+
+    return dict(sorted(paths.items()))
+
+
 def parse_args() -> argparse.Namespace:
     """
     Jednoduché CLI pro samostatné použití skriptu.
@@ -272,14 +703,36 @@ def parse_args() -> argparse.Namespace:
 
     parser.add_argument("--year", type=int, help="Rok dumpu (např. 2024)")
     parser.add_argument("--month", type=int, help="Měsíc dumpu (1–12)")
+    parser.add_argument("--from", dest="date_from", type=parse_year_month,
+                        help="Začátek rozsahu měsíců pro backfill (YYYY-MM)")
+    parser.add_argument("--to", dest="date_to", type=parse_year_month,
+                        help="Konec rozsahu měsíců pro backfill (YYYY-MM, včetně)")
+    parser.add_argument("--compression", choices=[*COMPRESSION_SUFFIXES, "none"], default=RAW_COMPRESSION or "none",
+                        help="Komprese ukládaných dumpů (výchozí: none; komprimované dumpy nelze "
+                             "extrahovat paralelně ani přes předfiltr a index IČO)")
+    parser.add_argument("--compress-existing", action="store_true",
+                        help="Zkomprimovat už stažené nekomprimované dumpy a skončit")
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS,
+                        help=f"Počet souběžných stahování při backfillu (výchozí: {DOWNLOAD_WORKERS})")
 
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
+    RAW_COMPRESSION = None if args.compression == "none" else args.compression
 
-    if args.year and args.month:
+    if args.compress_existing:
+        compress_raw_dumps(RAW_COMPRESSION or "gzip")
+        path = None
+    elif args.date_from or args.date_to:
+        if not (args.date_from and args.date_to):
+            print("Prosím zadej oba parametry --from a --to.")
+        else:
+            paths = download_month_range(args.date_from, args.date_to, workers=args.workers)
+            print(f"Stažené dumpy: {len(paths)}")
+        path = None
+    elif args.year and args.month:
         path = get_dump_for_year_month(args.year, args.month)
     elif args.year or args.month:
         print("Prosím zadej buď oba parametry --year a --month, nebo žádný.")
@@ -8,18 +8,66 @@ Funkce:
 - extrahuje informace o osobách (živnostnících)
 - extrahuje vazby mezi osobami a firmami
 - ukládá do strukturovaného JSON formátu
+- čte i komprimované XML soubory (.xml.gz, .xml.zst)
 """
 
 from pathlib import Path
 import xml.etree.ElementTree as ET
 import json
 import argparse
+import sys
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.smlouvy_dump import open_dump, dump_stem, glob_dumps
+
 # RZP XML namespace
 RZP_NS = "urn:cz:isvs:rzp:schemas:VerejnaCast:v1"
 
+# Kvalifikované názvy elementů (předpočítané, ne f-string při každém přístupu)
+TAG_ADRESA_PODNIKANI_SEZNAM = f"{{{RZP_NS}}}AdresaPodnikaniSeznam"
+TAG_CLEN = f"{{{RZP_NS}}}Clen"
+TAG_DATUM_NAROZENI = f"{{{RZP_NS}}}DatumNarozeni"
+TAG_DATUM_PLATNOSTI_DO = f"{{{RZP_NS}}}DatumPlatnostiDo"
+TAG_DATUM_PLATNOSTI_OD = f"{{{RZP_NS}}}DatumPlatnostiOd"
+TAG_DATUM_ZAPISU_DO = f"{{{RZP_NS}}}DatumZapisuDo"
+TAG_DATUM_ZAPISU_OD = f"{{{RZP_NS}}}DatumZapisuOd"
+TAG_IDENTIFIKACNI_CISLO = f"{{{RZP_NS}}}IdentifikacniCislo"
+TAG_IDENTIFIKACNI_CISLO_SEZNAM = f"{{{RZP_NS}}}IdentifikacniCisloSeznam"
+TAG_JMENO = f"{{{RZP_NS}}}Jmeno"
+TAG_MESTO = f"{{{RZP_NS}}}Mesto"
+TAG_OBCHODNI_JMENO = f"{{{RZP_NS}}}ObchodniJmeno"
+TAG_OBCHODNI_JMENO_SEZNAM = f"{{{RZP_NS}}}ObchodniJmenoSeznam"
+TAG_OBDOBI_FUNKCE = f"{{{RZP_NS}}}ObdobiFunkce"
+TAG_OSOBA_JMENO_PRIJMENI = f"{{{RZP_NS}}}OsobaJmenoPrijmeni"
+TAG_OSOBA_VE_FUNKCI = f"{{{RZP_NS}}}OsobaVeFunkci"
+TAG_PLATNOST_DO = f"{{{RZP_NS}}}PlatnostDo"
+TAG_PLATNOST_OD = f"{{{RZP_NS}}}PlatnostOd"
+TAG_PODIL = f"{{{RZP_NS}}}Podil"
+TAG_PODNIKATEL = f"{{{RZP_NS}}}Podnikatel"
+TAG_PODNIKATEL_SEZNAM = f"{{{RZP_NS}}}PodnikatelSeznam"
+TAG_PREDMET = f"{{{RZP_NS}}}Predmet"
+TAG_PRIJMENI = f"{{{RZP_NS}}}Prijmeni"
+TAG_PSC = f"{{{RZP_NS}}}Psc"
+TAG_ROLE = f"{{{RZP_NS}}}Role"
+TAG_SPOLECNIK = f"{{{RZP_NS}}}Spolecnik"
+TAG_STATUTARNI_ORGAN = f"{{{RZP_NS}}}StatutarniOrgan"
+TAG_STATUTARNI_ORGAN_CLEN = f"{{{RZP_NS}}}StatutarniOrganClen"
+TAG_UKONCEN = f"{{{RZP_NS}}}Ukoncen"
+TAG_ULICE = f"{{{RZP_NS}}}Ulice"
+TAG_USTANOVEN = f"{{{RZP_NS}}}Ustanoven"
+TAG_VAZBA = f"{{{RZP_NS}}}Vazba"
+TAG_VE_FUNKCI = f"{{{RZP_NS}}}VeFunkci"
+TAG_VYSLEDEK = f"{{{RZP_NS}}}Vysledek"
+TAG_VZNIK_FUNKCE = f"{{{RZP_NS}}}VznikFunkce"
+TAG_ZANIK_FUNKCE = f"{{{RZP_NS}}}ZanikFunkce"
+TAG_ZAPSANA_OSOBA = f"{{{RZP_NS}}}ZapsanaOsoba"
+TAG_ZAPSANO = f"{{{RZP_NS}}}Zapsano"
+TAG_ZIVNOST = f"{{{RZP_NS}}}Zivnost"
+
 # Paths
 BASE_DIR = Path(__file__).parent.parent
 RAW_DIR = BASE_DIR / "data" / "people" / "raw" / "rzp"
@@ -57,9 +105,9 @@ def extract_address(element: ET.Element, prefix: str = "") -> Dict[str, str]:
         city_elem = element.find(f"{{{RZP_NS}}}{prefix}Mesto")
         psc_elem = element.find(f"{{{RZP_NS}}}{prefix}Psc")
     else:
-        street_elem = element.find(f"{{{RZP_NS}}}Ulice")
-        city_elem = element.find(f"{{{RZP_NS}}}Mesto")
-        psc_elem = element.find(f"{{{RZP_NS}}}Psc")
+        street_elem = element.find(TAG_ULICE)
+        city_elem = element.find(TAG_MESTO)
+        psc_elem = element.find(TAG_PSC)
     
     if street_elem is not None:
         address["ulice"] = street_elem.text or ""
@@ -88,20 +136,20 @@ def extract_roles(podnikatel: ET.Element) -> List[Dict[str, Any]]:
     
     # Statutární orgán - může být přímo v podnikateli nebo v Clen elementech
     # Hledat všechny StatutarniOrgan elementy
-    statutarni_organy = podnikatel.findall(f".//{{{RZP_NS}}}StatutarniOrgan")
+    statutarni_organy = podnikatel.findall(f".//{TAG_STATUTARNI_ORGAN}")
     
     for stat_org in statutarni_organy:
         # Statutární orgán může obsahovat Clen elementy (členy orgánu)
-        clenove = stat_org.findall(f"{{{RZP_NS}}}Clen")
+        clenove = stat_org.findall(TAG_CLEN)
         
         if clenove:
             # Pro každého člena statutárního orgánu
             for clen in clenove:
-                jmeno = clen.findtext(f"{{{RZP_NS}}}Jmeno", "")
-                prijmeni = clen.findtext(f"{{{RZP_NS}}}Prijmeni", "")
+                jmeno = clen.findtext(TAG_JMENO, "")
+                prijmeni = clen.findtext(TAG_PRIJMENI, "")
                 cele_jmeno = f"{jmeno} {prijmeni}".strip()
-                platnost_od = clen.findtext(f"{{{RZP_NS}}}VznikFunkce", "") or clen.findtext(f"{{{RZP_NS}}}PlatnostOd", "")
-                platnost_do = clen.findtext(f"{{{RZP_NS}}}ZanikFunkce", "") or clen.findtext(f"{{{RZP_NS}}}PlatnostDo", "")
+                platnost_od = clen.findtext(TAG_VZNIK_FUNKCE, "") or clen.findtext(TAG_PLATNOST_OD, "")
+                platnost_do = clen.findtext(TAG_ZANIK_FUNKCE, "") or clen.findtext(TAG_PLATNOST_DO, "")
                 
                 # Získat IČO firmy z nadřazeného elementu
                 # Statutární orgán je v kontextu firmy
@@ -109,7 +157,7 @@ def extract_roles(podnikatel: ET.Element) -> List[Dict[str, Any]]:
                 # Zkusit najít IČO v nadřazených elementech
                 parent = stat_org
                 while parent is not None:
-                    ico_elem = parent.find(f"{{{RZP_NS}}}IdentifikacniCislo")
+                    ico_elem = parent.find(TAG_IDENTIFIKACNI_CISLO)
                     if ico_elem is not None:
                         firma_ico = normalize_ico(ico_elem.text)
                         break
@@ -126,9 +174,9 @@ def extract_roles(podnikatel: ET.Element) -> List[Dict[str, Any]]:
                     })
         else:
             # Statutární orgán bez členů - zkusit získat IČO přímo
-            firma_ico = stat_org.findtext(f"{{{RZP_NS}}}IdentifikacniCislo", "")
-            platnost_od = stat_org.findtext(f"{{{RZP_NS}}}PlatnostOd", "")
-            platnost_do = stat_org.findtext(f"{{{RZP_NS}}}PlatnostDo", "")
+            firma_ico = stat_org.findtext(TAG_IDENTIFIKACNI_CISLO, "")
+            platnost_od = stat_org.findtext(TAG_PLATNOST_OD, "")
+            platnost_do = stat_org.findtext(TAG_PLATNOST_DO, "")
             
             if firma_ico:
                 relationships.append({
@@ -140,13 +188,13 @@ def extract_roles(podnikatel: ET.Element) -> List[Dict[str, Any]]:
                 })
     
     # Také hledat přímo Clen elementy (mohou být členy statutárního orgánu)
-    clenove = podnikatel.findall(f".//{{{RZP_NS}}}Clen")
+    clenove = podnikatel.findall(f".//{TAG_CLEN}")
     for clen in clenove:
-        jmeno = clen.findtext(f"{{{RZP_NS}}}Jmeno", "")
-        prijmeni = clen.findtext(f"{{{RZP_NS}}}Prijmeni", "")
+        jmeno = clen.findtext(TAG_JMENO, "")
+        prijmeni = clen.findtext(TAG_PRIJMENI, "")
         cele_jmeno = f"{jmeno} {prijmeni}".strip()
-        platnost_od = clen.findtext(f"{{{RZP_NS}}}VznikFunkce", "") or clen.findtext(f"{{{RZP_NS}}}PlatnostOd", "")
-        platnost_do = clen.findtext(f"{{{RZP_NS}}}ZanikFunkce", "") or clen.findtext(f"{{{RZP_NS}}}PlatnostDo", "")
+        platnost_od = clen.findtext(TAG_VZNIK_FUNKCE, "") or clen.findtext(TAG_PLATNOST_OD, "")
+        platnost_do = clen.findtext(TAG_ZANIK_FUNKCE, "") or clen.findtext(TAG_PLATNOST_DO, "")
         
         # Zkusit najít IČO firmy z kontextu
         firma_ico = None
@@ -154,7 +202,7 @@ def extract_roles(podnikatel: ET.Element) -> List[Dict[str, Any]]:
         for _ in range(5):  # Max 5 úrovní nahoru
             if parent is None:
                 break
-            ico_elem = parent.find(f"{{{RZP_NS}}}IdentifikacniCislo")
+            ico_elem = parent.find(TAG_IDENTIFIKACNI_CISLO)
             if ico_elem is not None:
                 firma_ico = normalize_ico(ico_elem.text)
                 break
@@ -175,12 +223,12 @@ def extract_roles(podnikatel: ET.Element) -> List[Dict[str, Any]]:
             })
     
     # Společníci
-    spolecnici = podnikatel.findall(f".//{{{RZP_NS}}}Spolecnik")
+    spolecnici = podnikatel.findall(f".//{TAG_SPOLECNIK}")
     for spolecnik in spolecnici:
-        firma_ico = spolecnik.findtext(f"{{{RZP_NS}}}IdentifikacniCislo", "")
-        podil = spolecnik.findtext(f"{{{RZP_NS}}}Podil", "")
-        platnost_od = spolecnik.findtext(f"{{{RZP_NS}}}PlatnostOd", "")
-        platnost_do = spolecnik.findtext(f"{{{RZP_NS}}}PlatnostDo", "")
+        firma_ico = spolecnik.findtext(TAG_IDENTIFIKACNI_CISLO, "")
+        podil = spolecnik.findtext(TAG_PODIL, "")
+        platnost_od = spolecnik.findtext(TAG_PLATNOST_OD, "")
+        platnost_do = spolecnik.findtext(TAG_PLATNOST_DO, "")
         
         if firma_ico:
             relationships.append({
@@ -206,12 +254,12 @@ def extract_roles(podnikatel: ET.Element) -> List[Dict[str, Any]]:
                     pass
     
     # Obecné vazby (pokud existují)
-    vazby = podnikatel.findall(f".//{{{RZP_NS}}}Vazba")
+    vazby = podnikatel.findall(f".//{TAG_VAZBA}")
     for vazba in vazby:
-        firma_ico = vazba.findtext(f"{{{RZP_NS}}}IdentifikacniCislo", "")
-        role = vazba.findtext(f"{{{RZP_NS}}}Role", "")
-        platnost_od = vazba.findtext(f"{{{RZP_NS}}}PlatnostOd", "")
-        platnost_do = vazba.findtext(f"{{{RZP_NS}}}PlatnostDo", "")
+        firma_ico = vazba.findtext(TAG_IDENTIFIKACNI_CISLO, "")
+        role = vazba.findtext(TAG_ROLE, "")
+        platnost_od = vazba.findtext(TAG_PLATNOST_OD, "")
+        platnost_do = vazba.findtext(TAG_PLATNOST_DO, "")
         
         if firma_ico and role:
             relationships.append({
@@ -238,9 +286,9 @@ def extract_business_fields(podnikatel: ET.Element) -> List[str]:
     obory = []
     
     # Hledat živnosti
-    zivnosti = podnikatel.findall(f".//{{{RZP_NS}}}Zivnost")
+    zivnosti = podnikatel.findall(f".//{TAG_ZIVNOST}")
     for zivnost in zivnosti:
-        predmet = zivnost.findtext(f"{{{RZP_NS}}}Predmet", "")
+        predmet = zivnost.findtext(TAG_PREDMET, "")
         if predmet:
             obory.append(predmet)
     
@@ -266,21 +314,21 @@ def extract_statutarni_organ_from_firma(root: ET.Element, xml_path: Path = None)
     
     # Nejdřív zkusit najít IČO firmy (může být na různých místech)
     firma_ico = None
-    ico_elem = root.find(f".//{{{RZP_NS}}}IdentifikacniCislo")
+    ico_elem = root.find(f".//{TAG_IDENTIFIKACNI_CISLO}")
     if ico_elem is not None and ico_elem.text and ico_elem.text.strip():
         firma_ico = normalize_ico(ico_elem.text.strip())
     
     # Pokud IČO není v XML, zkusit získat z názvu souboru
     if not firma_ico and xml_path:
-        if 'ico_' in xml_path.stem:
-            parts = xml_path.stem.split('ico_')
+        if 'ico_' in dump_stem(xml_path):
+            parts = dump_stem(xml_path).split('ico_')
             if len(parts) > 1:
                 ico_from_filename = parts[1].split('_')[0]
                 firma_ico = normalize_ico(ico_from_filename)
                 print(f"[extract_statutarni_organ] IČO z názvu souboru: {firma_ico}")
     
     # Metoda 1: StatutarniOrgan/Clen struktura
-    stat_orgs = root.findall(f".//{{{RZP_NS}}}StatutarniOrgan")
+    stat_orgs = root.findall(f".//{TAG_STATUTARNI_ORGAN}")
     
     for stat_org in stat_orgs:
         # Získat IČO firmy z kontextu (pokud ještě nemáme)
@@ -289,11 +337,11 @@ def extract_statutarni_organ_from_firma(root: ET.Element, xml_path: Path = None)
             for _ in range(10):
                 if parent is None:
                     break
-                ico_elem = parent.find(f"{{{RZP_NS}}}IdentifikacniCislo")
+                ico_elem = parent.find(TAG_IDENTIFIKACNI_CISLO)
                 if ico_elem is not None and ico_elem.text:
                     firma_ico = normalize_ico(ico_elem.text.strip())
                     break
-                ico_seznam = parent.find(f"{{{RZP_NS}}}IdentifikacniCisloSeznam")
+                ico_seznam = parent.find(TAG_IDENTIFIKACNI_CISLO_SEZNAM)
                 if ico_seznam is not None and ico_seznam.text:
                     firma_ico = normalize_ico(ico_seznam.text.strip())
                     break
@@ -303,15 +351,15 @@ def extract_statutarni_organ_from_firma(root: ET.Element, xml_path: Path = None)
                     break
         
         # Najít všechny Clen elementy
-        clenove = stat_org.findall(f"{{{RZP_NS}}}Clen")
+        clenove = stat_org.findall(TAG_CLEN)
         
         for clen in clenove:
-            jmeno = clen.findtext(f"{{{RZP_NS}}}Jmeno", "")
-            prijmeni = clen.findtext(f"{{{RZP_NS}}}Prijmeni", "")
+            jmeno = clen.findtext(TAG_JMENO, "")
+            prijmeni = clen.findtext(TAG_PRIJMENI, "")
             cele_jmeno = f"{jmeno} {prijmeni}".strip()
-            datum_narozeni = clen.findtext(f"{{{RZP_NS}}}DatumNarozeni", "")
-            platnost_od = clen.findtext(f"{{{RZP_NS}}}VznikFunkce", "") or clen.findtext(f"{{{RZP_NS}}}PlatnostOd", "")
-            platnost_do = clen.findtext(f"{{{RZP_NS}}}ZanikFunkce", "") or clen.findtext(f"{{{RZP_NS}}}PlatnostDo", "")
+            datum_narozeni = clen.findtext(TAG_DATUM_NAROZENI, "")
+            platnost_od = clen.findtext(TAG_VZNIK_FUNKCE, "") or clen.findtext(TAG_PLATNOST_OD, "")
+            platnost_do = clen.findtext(TAG_ZANIK_FUNKCE, "") or clen.findtext(TAG_PLATNOST_DO, "")
             
             if cele_jmeno and firma_ico:
                 person = {
@@ -333,13 +381,13 @@ def extract_statutarni_organ_from_firma(root: ET.Element, xml_path: Path = None)
                 persons.append(person)
     
     # Metoda 2: StatutarniOrganClen/ZapsanaOsoba struktura
-    stat_org_clen = root.findall(f".//{{{RZP_NS}}}StatutarniOrganClen")
+    stat_org_clen = root.findall(f".//{TAG_STATUTARNI_ORGAN_CLEN}")
     
     for stat_org_clen_elem in stat_org_clen:
-        zapsane_osoby = stat_org_clen_elem.findall(f".//{{{RZP_NS}}}ZapsanaOsoba")
+        zapsane_osoby = stat_org_clen_elem.findall(f".//{TAG_ZAPSANA_OSOBA}")
         
         for zapsana in zapsane_osoby:
-            jmeno_prijmeni = zapsana.findtext(f"{{{RZP_NS}}}OsobaJmenoPrijmeni", "")
+            jmeno_prijmeni = zapsana.findtext(TAG_OSOBA_JMENO_PRIJMENI, "")
             if not jmeno_prijmeni:
                 continue
             
@@ -358,18 +406,18 @@ def extract_statutarni_organ_from_firma(root: ET.Element, xml_path: Path = None)
             platnost_od = None
             platnost_do = None
             
-            zapsano = zapsana.find(f"{{{RZP_NS}}}Zapsano")
+            zapsano = zapsana.find(TAG_ZAPSANO)
             if zapsano is not None:
-                ve_funkci = zapsano.find(f"{{{RZP_NS}}}VeFunkci")
+                ve_funkci = zapsano.find(TAG_VE_FUNKCI)
                 if ve_funkci is not None:
-                    platnost_od = ve_funkci.findtext(f"{{{RZP_NS}}}Ustanoven", "")
-                    platnost_do = ve_funkci.findtext(f"{{{RZP_NS}}}Ukoncen", "")
+                    platnost_od = ve_funkci.findtext(TAG_USTANOVEN, "")
+                    platnost_do = ve_funkci.findtext(TAG_UKONCEN, "")
                 
                 # Zkusit také DatumZapisuOd/Do
                 if not platnost_od:
-                    platnost_od = zapsano.findtext(f"{{{RZP_NS}}}DatumZapisuOd", "")
+                    platnost_od = zapsano.findtext(TAG_DATUM_ZAPISU_OD, "")
                 if not platnost_do:
-                    platnost_do = zapsano.findtext(f"{{{RZP_NS}}}DatumZapisuDo", "")
+                    platnost_do = zapsano.findtext(TAG_DATUM_ZAPISU_DO, "")
             
             if jmeno_bez_titulu and firma_ico:
                 person = {
@@ -390,20 +438,20 @@ def extract_statutarni_organ_from_firma(root: ET.Element, xml_path: Path = None)
                 persons.append(person)
     
     # Metoda 3: OsobaVeFunkci struktura (detailní XML z webu)
-    osoby_ve_funkci = root.findall(f".//{{{RZP_NS}}}OsobaVeFunkci")
+    osoby_ve_funkci = root.findall(f".//{TAG_OSOBA_VE_FUNKCI}")
     
     # Najít všechny ObdobiFunkce předem (pro mapování)
-    obdobi_all = root.findall(f".//{{{RZP_NS}}}ObdobiFunkce")
+    obdobi_all = root.findall(f".//{TAG_OBDOBI_FUNKCE}")
     
     # Najít název firmy
     firma_nazev = None
-    nazev_elem = root.find(f".//{{{RZP_NS}}}ObchodniJmeno")
+    nazev_elem = root.find(f".//{TAG_OBCHODNI_JMENO}")
     if nazev_elem is not None and nazev_elem.text:
         firma_nazev = nazev_elem.text.strip()
     
     for idx, osoba_elem in enumerate(osoby_ve_funkci):
         # Získat jméno
-        jmeno_prijmeni = osoba_elem.findtext(f"{{{RZP_NS}}}OsobaJmenoPrijmeni", "")
+        jmeno_prijmeni = osoba_elem.findtext(TAG_OSOBA_JMENO_PRIJMENI, "")
         if not jmeno_prijmeni:
             continue
         
@@ -418,32 +466,32 @@ def extract_statutarni_organ_from_firma(root: ET.Element, xml_path: Path = None)
         platnost_do = None
         
         # Zkusit najít ObdobiFunkce přímo v osobě
-        obdobi = osoba_elem.find(f"{{{RZP_NS}}}ObdobiFunkce")
+        obdobi = osoba_elem.find(TAG_OBDOBI_FUNKCE)
         if obdobi is not None:
             # Zkusit různé názvy elementů pro datum
-            platnost_od = (obdobi.findtext(f"{{{RZP_NS}}}Ustanoven", "") or 
-                          obdobi.findtext(f"{{{RZP_NS}}}DatumZapisuOd", "") or 
-                          obdobi.findtext(f"{{{RZP_NS}}}DatumPlatnostiOd", ""))
-            platnost_do = (obdobi.findtext(f"{{{RZP_NS}}}Ukoncen", "") or 
-                          obdobi.findtext(f"{{{RZP_NS}}}DatumZapisuDo", "") or 
-                          obdobi.findtext(f"{{{RZP_NS}}}DatumPlatnostiDo", ""))
+            platnost_od = (obdobi.findtext(TAG_USTANOVEN, "") or 
+                          obdobi.findtext(TAG_DATUM_ZAPISU_OD, "") or 
+                          obdobi.findtext(TAG_DATUM_PLATNOSTI_OD, ""))
+            platnost_do = (obdobi.findtext(TAG_UKONCEN, "") or 
+                          obdobi.findtext(TAG_DATUM_ZAPISU_DO, "") or 
+                          obdobi.findtext(TAG_DATUM_PLATNOSTI_DO, ""))
         
         # Pokud není ObdobiFunkce v osobě, zkusit najít podle indexu
         # (pokud jsou ve stejném pořadí jako osoby)
         if not platnost_od and idx < len(obdobi_all):
             obdobi = obdobi_all[idx]
-            platnost_od = (obdobi.findtext(f"{{{RZP_NS}}}Ustanoven", "") or 
-                          obdobi.findtext(f"{{{RZP_NS}}}DatumZapisuOd", "") or 
-                          obdobi.findtext(f"{{{RZP_NS}}}DatumPlatnostiOd", ""))
-            platnost_do = (obdobi.findtext(f"{{{RZP_NS}}}Ukoncen", "") or 
-                          obdobi.findtext(f"{{{RZP_NS}}}DatumZapisuDo", "") or 
-                          obdobi.findtext(f"{{{RZP_NS}}}DatumPlatnostiDo", ""))
+            platnost_od = (obdobi.findtext(TAG_USTANOVEN, "") or 
+                          obdobi.findtext(TAG_DATUM_ZAPISU_OD, "") or 
+                          obdobi.findtext(TAG_DATUM_PLATNOSTI_OD, ""))
+            platnost_do = (obdobi.findtext(TAG_UKONCEN, "") or 
+                          obdobi.findtext(TAG_DATUM_ZAPISU_DO, "") or 
+                          obdobi.findtext(TAG_DATUM_PLATNOSTI_DO, ""))
         
         # Získat datum narození (pokud je k dispozici)
-        datum_narozeni = osoba_elem.findtext(f"{{{RZP_NS}}}DatumNarozeni", "")
+        datum_narozeni = osoba_elem.findtext(TAG_DATUM_NAROZENI, "")
         
         # Získat funkci - VeFunkci může být prázdné, použijeme výchozí hodnotu
-        funkce = osoba_elem.findtext(f"{{{RZP_NS}}}VeFunkci", "")
+        funkce = osoba_elem.findtext(TAG_VE_FUNKCI, "")
         if not funkce or not funkce.strip():
             funkce = "statutární orgán"
         
@@ -485,7 +533,8 @@ def extract_person_from_xml(xml_path: Path) -> List[Dict[str, Any]]:
     print(f"[extract_rzp] Parsuji XML soubor: {xml_path.name}")
     
     try:
-        tree = ET.parse(xml_path)
+        with open_dump(xml_path) as f:
+            tree = ET.parse(f)
         root = tree.getroot()
     except ET.ParseError as e:
         raise ValueError(f"Chyba při parsování XML: {e}") from e
@@ -500,29 +549,29 @@ def extract_person_from_xml(xml_path: Path) -> List[Dict[str, Any]]:
     
     # Najít všechny podnikatele v odpovědi
     # RZP může vrátit více výsledků - struktura může být PodnikatelSeznam nebo Podnikatel
-    podnikatele = root.findall(f".//{{{RZP_NS}}}PodnikatelSeznam")
+    podnikatele = root.findall(f".//{TAG_PODNIKATEL_SEZNAM}")
     
     if not podnikatele:
         # Zkusit najít jinou strukturu
-        podnikatele = root.findall(f".//{{{RZP_NS}}}Podnikatel")
+        podnikatele = root.findall(f".//{TAG_PODNIKATEL}")
     
     if not podnikatele:
         # Zkusit najít Vysledek
-        podnikatele = root.findall(f".//{{{RZP_NS}}}Vysledek")
+        podnikatele = root.findall(f".//{TAG_VYSLEDEK}")
     
     print(f"[extract_rzp] Nalezeno {len(podnikatele)} podnikatelů")
     
     for podnikatel in podnikatele:
         # Základní informace - struktura může být různá
         # Pro PodnikatelSeznam:
-        ico_elem = podnikatel.find(f"{{{RZP_NS}}}IdentifikacniCisloSeznam")
+        ico_elem = podnikatel.find(TAG_IDENTIFIKACNI_CISLO_SEZNAM)
         if ico_elem is not None:
             ico = normalize_ico(ico_elem.text)
         else:
-            ico = normalize_ico(podnikatel.findtext(f"{{{RZP_NS}}}IdentifikacniCislo", ""))
+            ico = normalize_ico(podnikatel.findtext(TAG_IDENTIFIKACNI_CISLO, ""))
         
         # Jméno a příjmení - může být v ObchodniJmenoSeznam nebo Jmeno/Prijmeni
-        obchodni_jmeno_elem = podnikatel.find(f"{{{RZP_NS}}}ObchodniJmenoSeznam")
+        obchodni_jmeno_elem = podnikatel.find(TAG_OBCHODNI_JMENO_SEZNAM)
         if obchodni_jmeno_elem is not None:
             cele_jmeno = obchodni_jmeno_elem.text or ""
             # Zkusit rozdělit na jméno a příjmení
@@ -530,14 +579,14 @@ def extract_person_from_xml(xml_path: Path) -> List[Dict[str, Any]]:
             jmeno = name_parts[0] if name_parts else ""
             prijmeni = name_parts[1] if len(name_parts) > 1 else ""
         else:
-            jmeno = podnikatel.findtext(f"{{{RZP_NS}}}Jmeno", "")
-            prijmeni = podnikatel.findtext(f"{{{RZP_NS}}}Prijmeni", "")
+            jmeno = podnikatel.findtext(TAG_JMENO, "")
+            prijmeni = podnikatel.findtext(TAG_PRIJMENI, "")
             cele_jmeno = f"{jmeno} {prijmeni}".strip()
         
-        datum_narozeni = podnikatel.findtext(f"{{{RZP_NS}}}DatumNarozeni", "")
+        datum_narozeni = podnikatel.findtext(TAG_DATUM_NAROZENI, "")
         
         # Adresa - může být v AdresaPodnikaniSeznam
-        adresa_elem = podnikatel.find(f"{{{RZP_NS}}}AdresaPodnikaniSeznam")
+        adresa_elem = podnikatel.find(TAG_ADRESA_PODNIKANI_SEZNAM)
         if adresa_elem is not None:
             adresa_text = adresa_elem.text or ""
             # Parsovat adresu (formát: "Ulice, PSC, Mesto")
@@ -623,7 +672,7 @@ def extract_all_rzp_files(filter_ico: Optional[str] = None):
     Args:
         filter_ico: Volitelné IČO pro filtrování
     """
-    xml_files = list(RAW_DIR.glob("rzp_*.xml"))
+    xml_files = glob_dumps(RAW_DIR, "rzp_*")
     
     if not xml_files:
         print(f"[extract_rzp] Nenalezeny žádné XML soubory v {RAW_DIR}")
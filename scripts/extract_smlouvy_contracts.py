@@ -7,19 +7,119 @@ Funkce:
 - parsuje XML dump soubory
 - extrahuje informace o smlouvách (zadavatel, dodavatel, hodnota, datum)
 - umožňuje filtrování podle IČO
-- ukládá do strukturovaného JSON formátu
-- podporuje inkrementální aktualizace (sleduje, co už bylo zpracováno)
+- ukládá do JSON Lines (jedna smlouva na řádek, volitelně gzip) nebo do JSON pole
+- volitelně exportuje smlouvy do Parquet datasetu rozděleného podle roku/měsíce (--parquet)
+- podporuje inkrementální aktualizace podle otisku dumpu (velikost, čas změny, SHA-256
+  obsahu), filtru IČO a verze extraktoru - znovu se extrahuje jen to, co se změnilo
+- umí streamovat velké dumpy přes iterparse (konstantní paměť)
+- umí paralelně parsovat jeden dump ve více procesech (--workers)
+- umí souběžně extrahovat dumpy za rozsah měsíců (--from/--to, metadata chráněná zámkem)
+- umí v jednom průchodu dumpem extrahovat smlouvy pro celou sadu IČO
+- při filtrování podle IČO předfiltruje záznamy nad bajty (mmap) a parsuje jen kandidáty
+- využívá perzistentní index IČO -> offsety záznamů (dotaz na IČO přes všechny dumpy)
+- přeskakuje dumpy, které podle Bloom filtru nemohou hledané IČO obsahovat
+- umí parsovat dump z proudu bajtů ještě během stahování (XMLPullParser)
+- čte i komprimované dumpy (.xml.gz, .xml.zst) s průběžnou dekompresí
+- volitelně parsuje přes lxml (--parser), výchozí je standardní xml.etree
 """
 
 from pathlib import Path
 import xml.etree.ElementTree as ET
 import json
+import gzip
+import hashlib
 import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple, Union, FrozenSet, Set, Callable
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.smlouvy_dump import (
+    ZAZNAM_OPEN, normalize_ico, decode_ico_value, open_dump_mmap, iter_record_spans,
+    iter_candidate_spans, split_into_shards, load_ico_index, lookup_ico_spans,
+    DumpScan, load_ico_bloom, save_ico_bloom, dump_may_contain, open_dump, is_compressed,
+    dump_stem, glob_dumps, find_stored_dump, iter_months, parse_year_month, STREAM_CHUNK_SIZE
+)
+from scripts.smlouvy_parquet import write_parquet_dataset
+from scripts.smlouvy_records import Attachment, Contract, Party
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # volitelná závislost (pip install lxml)
+    lxml_etree = None
+
+try:
+    import fcntl
+except ImportError:  # Windows - metadata se zamykají jen v rámci procesu
+    fcntl = None
 
 # XML namespace for smlouvy.gov.cz
 XML_NS = "http://portal.gov.cz/rejstriky/ISRS/1.2/"
+ZAZNAM_TAG = f"{{{XML_NS}}}zaznam"
+
+# Kvalifikované názvy elementů záznamu (předpočítané, ne f-string při každém přístupu)
+TAG_PLATNY_ZAZNAM = f"{{{XML_NS}}}platnyZaznam"
+TAG_IDENTIFIKATOR = f"{{{XML_NS}}}identifikator"
+TAG_ID_SMLOUVY = f"{{{XML_NS}}}idSmlouvy"
+TAG_ID_VERZE = f"{{{XML_NS}}}idVerze"
+TAG_ODKAZ = f"{{{XML_NS}}}odkaz"
+TAG_CAS_ZVEREJNENI = f"{{{XML_NS}}}casZverejneni"
+TAG_SMLOUVA = f"{{{XML_NS}}}smlouva"
+TAG_SUBJEKT = f"{{{XML_NS}}}subjekt"
+TAG_SMLUVNI_STRANA = f"{{{XML_NS}}}smluvniStrana"
+TAG_ICO = f"{{{XML_NS}}}ico"
+TAG_NAZEV = f"{{{XML_NS}}}nazev"
+TAG_ADRESA = f"{{{XML_NS}}}adresa"
+TAG_DATOVA_SCHRANKA = f"{{{XML_NS}}}datovaSchranka"
+TAG_UTVAR = f"{{{XML_NS}}}utvar"
+TAG_PREDMET = f"{{{XML_NS}}}predmet"
+TAG_DATUM_UZAVRENI = f"{{{XML_NS}}}datumUzavreni"
+TAG_CISLO_SMLOUVY = f"{{{XML_NS}}}cisloSmlouvy"
+TAG_SCHVALIL = f"{{{XML_NS}}}schvalil"
+TAG_HODNOTA_VCETNE_DPH = f"{{{XML_NS}}}hodnotaVcetneDph"
+TAG_HODNOTA_BEZ_DPH = f"{{{XML_NS}}}hodnotaBezDph"
+TAG_PRILOHY = f"{{{XML_NS}}}prilohy"
+TAG_PRILOHA = f"{{{XML_NS}}}priloha"
+TAG_NAZEV_SOUBORU = f"{{{XML_NS}}}nazevSouboru"
+TAG_HASH = f"{{{XML_NS}}}hash"
+
+# Parser XML: "stdlib" (xml.etree), "lxml" (rychlejší parsování, pomalejší přístup
+# k elementům z Pythonu), "auto" = lxml, pokud je k dispozici.
+# Výchozí zůstává stdlib - co se vyplatí pro konkrétní dumpy, ukáže --benchmark.
+# Nastavuje se přepínačem --parser.
+XML_PARSERS = ("auto", "lxml", "stdlib")
+XML_PARSER = "stdlib"
+
+# Chyby parsování obou parserů
+PARSE_ERRORS = (ET.ParseError,) + ((lxml_etree.XMLSyntaxError,) if lxml_etree is not None else ())
+
+# Otevírací značka záznamu s deklarací namespace (pro parsování vyříznutých záznamů)
+_ZAZNAM_OPEN_NS = f'<zaznam xmlns="{XML_NS}"'.encode()
+
+# Počet shardů na jeden proces při paralelní extrakci (lepší vyvážení zátěže)
+SHARDS_PER_WORKER = 4
+
+# Verze extraktoru - zvýšit při změně tvaru extrahovaných smluv (vše se pak extrahuje znovu)
+EXTRACTOR_VERSION = 1
+
+# Formáty výstupu extrakce -> přípona souboru
+OUTPUT_FORMATS = {
+    "json": ".json",
+    "jsonl": ".jsonl",
+    "jsonl.gz": ".jsonl.gz",
+}
+DEFAULT_OUTPUT_FORMAT = "jsonl"
+
+# Filtr podle IČO - jedno IČO nebo kolekce IČO
+IcoFilter = Union[str, Iterable[str]]
 
 # Paths
 BASE_DIR = Path(__file__).parent.parent
@@ -28,6 +128,9 @@ EXTRACTED_DIR = BASE_DIR / "data" / "tenders" / "extracted" / "smlouvy_gov"
 METADATA_DIR = BASE_DIR / "data" / "tenders" / "metadata"
 METADATA_FILE = METADATA_DIR / "smlouvy_gov_status.json"
 
+# Zápisy metadat z vláken jednoho procesu (mezi procesy zamyká fcntl, viz metadata_lock)
+_METADATA_LOCK = threading.Lock()
+
 
 def load_metadata() -> Dict[str, Any]:
     """Načte metadata o zpracovaných datech."""
@@ -42,290 +145,1295 @@ def load_metadata() -> Dict[str, Any]:
         "downloaded_months": [],
         "extracted_months": [],
         "processed_icos": [],
+        "applied_daily_dumps": [],
+        "dump_fingerprints": {},
+        "extractions": {},
         "last_download": None,
         "last_extract": None
     }
 
 
-def save_metadata(metadata: Dict[str, Any]) -> None:
-    """Uloží metadata o zpracovaných datech."""
+def save_metadata(metadata: Dict[str, Any], touched: str = "last_extract") -> None:
+    """
+    Uloží metadata o zpracovaných datech (a aktualizuje časové razítko `touched`).
+    
+    Zapisuje se do dočasného souboru, který se atomicky přejmenuje - souběžně
+    čtoucí proces nikdy neuvidí rozepsaný soubor.
+    """
     METADATA_DIR.mkdir(parents=True, exist_ok=True)
-    metadata["last_extract"] = datetime.now().isoformat()
+    metadata[touched] = datetime.now().isoformat()
     
-    with open(METADATA_FILE, 'w', encoding='utf-8') as f:
+    tmp_path = METADATA_FILE.with_name(f"{METADATA_FILE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, METADATA_FILE)
+
+
+@contextmanager
+def metadata_lock() -> Iterator[None]:
+    """
+    Exkluzivní zámek metadat mezi vlákny i procesy (fcntl.flock nad .lock souborem).
+    
+    Zámek není reentrantní - uvnitř se nesmí znovu volat update_metadata.
+    """
+    METADATA_DIR.mkdir(parents=True, exist_ok=True)
+    lock_path = METADATA_FILE.with_name(METADATA_FILE.name + ".lock")
+    
+    with _METADATA_LOCK, open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def update_metadata(touched: str = "last_extract") -> Iterator[Dict[str, Any]]:
+    """
+    Načte metadata pod zámkem, předá je k úpravě a po úspěšném bloku je uloží.
+    
+    Použití: `with update_metadata() as metadata: metadata[...] = ...` - souběžné
+    extrakce (a stahování) si tak navzájem nepřepisují změny.
+    """
+    with metadata_lock():
+        metadata = load_metadata()
+        yield metadata
+        save_metadata(metadata, touched)
+
+
+def get_applied_daily_dumps() -> List[str]:
+    """Vrátí názvy denních dumpů, které už byly aplikovány jako delta (např. "dump_2025_11_14")."""
+    return load_metadata().get("applied_daily_dumps", [])
+
+
+def mark_daily_dumps_applied(dump_names: Iterable[str]) -> None:
+    """Zapíše denní dumpy jako aplikované (po úspěšném průchodu celou pipeline)."""
+    with update_metadata() as metadata:
+        applied = metadata.setdefault("applied_daily_dumps", [])
+        for name in dump_names:
+            if name not in applied:
+                applied.append(name)
+        applied.sort()
+
+
+def dump_key(dump_name: str) -> str:
+    """Klíč dumpu v metadatech ("dump_2025_11" -> "2025_11", denní "dump_2025_11_14" -> "2025_11_14")."""
+    return dump_name[len("dump_"):] if dump_name.startswith("dump_") else dump_name
+
+
+def hash_dump_content(dump_path: Path) -> str:
+    """SHA-256 obsahu XML dumpu (komprimované dumpy se hashují po dekompresi)."""
+    digest = hashlib.sha256()
+    with open_dump(dump_path) as f:
+        for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verified_download_hash(dump_path: Path, metadata: Dict[str, Any]) -> Optional[str]:
+    """
+    SHA-256 obsahu dumpu ověřený při stahování, pokud odpovídá uloženému souboru.
+    
+    Stažený dump se ověřuje proti hashi z indexu ještě před kompresí, hash tedy
+    odpovídá obsahu XML i u komprimovaného souboru.
+    """
+    xml_name = f"{dump_stem(dump_path)}.xml"
+    entry = metadata.get("downloads", {}).get(xml_name)
+    if not entry or entry.get("hash_algorithm") != "sha256" or not entry.get("hash"):
+        return None
+    
+    stored_name = entry.get("stored_as", xml_name)
+    stored_size = entry.get("stored_size", entry.get("size"))
+    if stored_name != dump_path.name or stored_size != dump_path.stat().st_size:
+        return None
+    return entry["hash"]
+
+
+def known_dump_fingerprint(dump_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Otisk dumpu, který lze získat bez čtení obsahu: uložený otisk (pokud se od něj
+    nezměnila velikost ani čas změny souboru), případně hash ověřený při stahování.
+    
+    Vrací None, pokud by se hash musel spočítat.
+    """
+    stat = dump_path.stat()
+    metadata = load_metadata()
+    
+    cached = metadata.get("dump_fingerprints", {}).get(dump_path.name)
+    if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime:
+        return cached
+    
+    content_hash = verified_download_hash(dump_path, metadata)
+    if content_hash is None:
+        return None
+    return save_dump_fingerprint(dump_path, stat, content_hash)
+
+
+def save_dump_fingerprint(dump_path: Path, stat: os.stat_result, content_hash: str) -> Dict[str, Any]:
+    """Uloží otisk dumpu do metadat (stat se bere před čtením obsahu)."""
+    fingerprint = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": content_hash}
+    with update_metadata() as metadata:
+        metadata.setdefault("dump_fingerprints", {})[dump_path.name] = fingerprint
+    return fingerprint
+
+
+def dump_fingerprint(dump_path: Path) -> Dict[str, Any]:
+    """
+    Otisk dumpu: velikost, čas změny a SHA-256 obsahu.
+    
+    Hash se přepočítává jen tehdy, když se od posledního otisku změnila velikost
+    nebo čas změny souboru (jinak se použije uložený, případně hash ověřený při
+    stahování). Nový otisk se uloží do metadat; hash se počítá mimo zámek metadat.
+    """
+    stat = dump_path.stat()
+    fingerprint = known_dump_fingerprint(dump_path)
+    if fingerprint is None:
+        print(f"[extract] Počítám otisk dumpu {dump_path.name}...")
+        fingerprint = save_dump_fingerprint(dump_path, stat, hash_dump_content(dump_path))
+    return fingerprint
+
+
+def begin_dump_scan(dump_path: Path, fingerprint: Optional[Dict[str, Any]]) -> Optional[DumpScan]:
+    """
+    Připraví DumpScan pro extrakci, pokud dumpu chybí otisk nebo Bloom filtr IČO.
+    
+    Hash a IČO se pak počítají z bajtů, které čte parser, místo samostatných
+    průchodů dumpem před a po extrakci. Vrací None, pokud není co počítat.
+    """
+    collect_icos = load_ico_bloom(dump_path) is None
+    if fingerprint is not None and not collect_icos:
+        return None
+    return DumpScan(collect_icos=collect_icos)
+
+
+def finish_dump_scan(
+    dump_path: Path,
+    stat: os.stat_result,
+    scan: Optional[DumpScan],
+    fingerprint: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Po extrakci uloží otisk dumpu a Bloom filtr IČO spočítané přes DumpScan.
+    
+    Čtení přes mmap (index, shardy, předfiltr) ani přeskočení dumpu podle Bloom
+    filtru nečte dump sekvenčně celý; pak se hash i IČO spočítají jedním
+    společným průchodem.
+    
+    Returns:
+        Otisk dumpu
+    """
+    if scan is None:
+        return fingerprint
+    
+    if not scan.complete:
+        print(f"[extract] Počítám otisk a Bloom filtr dumpu {dump_path.name}...")
+        scan.scan_file(dump_path)
+    
+    if fingerprint is None:
+        fingerprint = save_dump_fingerprint(dump_path, stat, scan.hexdigest())
+    if scan.collect_icos:
+        bloom = scan.bloom()
+        save_ico_bloom(dump_path, bloom)
+        print(f"[extract] Bloom filtr uložen pro {dump_path.name} ({bloom.count} IČO)")
+    return fingerprint
+
+
+def extraction_filter(filter_ico: Optional[IcoFilter]) -> Optional[List[str]]:
+    """Filtr IČO v podobě ukládané do metadat (seřazený seznam, None = bez filtru)."""
+    filter_icos = normalize_ico_filter(filter_ico)
+    return sorted(filter_icos) if filter_icos else None
+
+
+def _recorded_outputs(dump_name: str, filter_ico: Optional[str]) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+    """Existující výstupy dumpu se záznamem v metadatech pro daný filtr IČO a verzi extraktoru."""
+    extractions = load_metadata().get("extractions", {})
+    expected_filter = extraction_filter(filter_ico)
+    
+    for output_format in OUTPUT_FORMATS:
+        path = extracted_output_path(dump_name, filter_ico, output_format)
+        entry = extractions.get(path.name)
+        if (
+            entry is not None
+            and path.exists()
+            and entry.get("filter") == expected_filter
+            and entry.get("extractor_version") == EXTRACTOR_VERSION
+        ):
+            yield path, entry
+
+
+def find_current_output(
+    dump_name: str,
+    filter_ico: Optional[str],
+    dump_sha256: Optional[str]
+) -> Optional[Path]:
+    """
+    Najde výstup extrakce, který odpovídá obsahu dumpu, filtru IČO a verzi extraktoru.
+    
+    Výstup bez záznamu v metadatech (např. z přerušeného nebo staršího běhu) se
+    nepovažuje za aktuální.
+    """
+    if not dump_sha256:
+        return None
+    
+    for path, entry in _recorded_outputs(dump_name, filter_ico):
+        if entry.get("dump_sha256") == dump_sha256:
+            return path
+    return None
+
+
+def has_recorded_output(dump_name: str, filter_ico: Optional[str]) -> bool:
+    """
+    Zda má dump pro filtr IČO zaznamenaný výstup (bez ohledu na otisk dumpu).
+    
+    Jen tehdy má smysl spočítat hash dumpu ještě před extrakcí - bez takového
+    výstupu se dump extrahuje v každém případě.
+    """
+    return next(_recorded_outputs(dump_name, filter_ico), None) is not None
+
+
+def normalize_ico_filter(filter_ico: Optional[IcoFilter]) -> Optional[FrozenSet[str]]:
+    """
+    Převede filtr (jedno IČO nebo kolekci IČO) na množinu normalizovaných IČO.
+    
+    Vrací None, pokud filtr není zadán.
+    """
+    if not filter_ico:
+        return None
+    
+    if isinstance(filter_ico, str):
+        filter_ico = [filter_ico]
+    
+    icos = frozenset(ico for ico in (normalize_ico(i) for i in filter_ico) if ico)
+    return icos or None
+
+
+def format_ico_filter(icos: Iterable[str]) -> str:
+    """Zkrácený popis filtru IČO pro výpisy."""
+    icos = sorted(icos)
+    if len(icos) <= 5:
+        return ", ".join(icos)
+    return f"{len(icos)} IČO"
+
+
+def load_ico_file(path: Path) -> List[str]:
+    """
+    Načte seznam IČO ze souboru (jedno IČO na řádek, # uvozuje komentář).
+    """
+    icos = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                icos.append(line)
+    return icos
+
+
+def resolve_parser(parser: Optional[str] = None) -> str:
+    """
+    Vrátí skutečně použitý parser ("lxml" nebo "stdlib").
+    
+    Bez zadání se použije XML_PARSER; "auto" zvolí lxml, pokud je nainstalováno.
+    """
+    parser = parser or XML_PARSER
+    if parser not in XML_PARSERS:
+        raise ValueError(f"Neznámý parser XML: {parser} (povoleno: {', '.join(XML_PARSERS)})")
+    if parser == "auto":
+        return "lxml" if lxml_etree is not None else "stdlib"
+    if parser == "lxml" and lxml_etree is None:
+        raise ImportError("Pro parser lxml nainstalujte: pip install lxml")
+    return parser
+
+
+def _children(elem: ET.Element) -> Dict[str, ET.Element]:
+    """
+    Jeden průchod přímými potomky elementu: {tag: první potomek s tímto tagem}.
+    
+    Odpovídá elem.find(tag) pro všechny tagy najednou (bez opakovaného procházení).
+    """
+    children = {}
+    for child in elem:
+        children.setdefault(child.tag, child)
+    return children
+
+
+def _text(children: Dict[str, ET.Element], tag: str) -> Optional[str]:
+    """Stejné jako findtext: None, pokud element chybí, "" pokud nemá text."""
+    child = children.get(tag)
+    if child is None:
+        return None
+    return child.text or ""
+
+
+def _party_from_element(elem: ET.Element) -> Party:
+    """Smluvní strana z elementu <subjekt> nebo <smluvniStrana>."""
+    fields = _children(elem)
+    return Party.create(
+        normalize_ico(_text(fields, TAG_ICO)),
+        _text(fields, TAG_NAZEV) or "",
+        _text(fields, TAG_ADRESA) or "",
+        _text(fields, TAG_DATOVA_SCHRANKA) or "",
+        _text(fields, TAG_UTVAR) or ""
+    )
+
+
+def _parse_value(text: Optional[str]) -> Optional[float]:
+    """Převede hodnotu smlouvy na číslo (neplatná nebo chybějící hodnota = None)."""
+    try:
+        return float(text) if text else None
+    except (ValueError, TypeError):
+        return None
+
+
+def extract_contract_from_zaznam(zaznam: ET.Element) -> Optional[Contract]:
+    """
+    Extrahuje informace o smlouvě z XML elementu <zaznam>.
+    
+    Funguje pro elementy z xml.etree i z lxml. Potomci každého elementu se
+    projdou jen jednou (viz _children), výsledek je shodný s findtext.
+    
+    Vrací záznam Contract (na slovník se převádí až při zápisu) nebo None,
+    pokud není platný záznam.
+    """
+    fields = _children(zaznam)
+    
+    # Zkontrolovat, zda je záznam platný
+    if _text(fields, TAG_PLATNY_ZAZNAM) != "1":
+        return None
+    
+    # Identifikátory
+    identifikator = fields.get(TAG_IDENTIFIKATOR)
+    if identifikator is None:
+        return None
+    
+    identifiers = _children(identifikator)
+    
+    # Smlouva
+    smlouva = fields.get(TAG_SMLOUVA)
+    if smlouva is None:
+        return None
+    
+    details = _children(smlouva)
+    
+    # Zadavatel (subjekt) a dodavatel (smluvniStrana)
+    subjekt = details.get(TAG_SUBJEKT)
+    smluvni_strana = details.get(TAG_SMLUVNI_STRANA)
+    
+    # Přílohy
+    attachments = []
+    prilohy = details.get(TAG_PRILOHY)
+    if prilohy is not None:
+        for priloha in prilohy:
+            if priloha.tag != TAG_PRILOHA:
+                continue
+            attachment_fields = _children(priloha)
+            attachments.append(Attachment(
+                _text(attachment_fields, TAG_NAZEV_SOUBORU) or "",
+                _text(attachment_fields, TAG_HASH) or "",
+                _text(attachment_fields, TAG_ODKAZ) or ""
+            ))
+    
+    # Sestavit výsledný záznam
+    return Contract(
+        contract_id=_text(identifiers, TAG_ID_SMLOUVY),
+        version_id=_text(identifiers, TAG_ID_VERZE),
+        url=_text(fields, TAG_ODKAZ),
+        published_date=_text(fields, TAG_CAS_ZVEREJNENI),
+        authority=_party_from_element(subjekt) if subjekt is not None else None,
+        contractor=_party_from_element(smluvni_strana) if smluvni_strana is not None else None,
+        subject=_text(details, TAG_PREDMET) or "",
+        contract_date=_text(details, TAG_DATUM_UZAVRENI) or "",
+        contract_number=_text(details, TAG_CISLO_SMLOUVY) or "",
+        approved_by=_text(details, TAG_SCHVALIL) or "",
+        value_with_vat=_parse_value(_text(details, TAG_HODNOTA_VCETNE_DPH)),
+        value_without_vat=_parse_value(_text(details, TAG_HODNOTA_BEZ_DPH)),
+        attachments=tuple(attachments),
+        source="smlouvy_gov"
+    )
+
+
+def iter_zaznam_elements(
+    xml_path: Path,
+    parser: Optional[str] = None,
+    scan: Optional[DumpScan] = None
+) -> Iterator[ET.Element]:
+    """
+    Postupně vrací elementy <zaznam> z XML dumpu (streamovaně přes iterparse).
+
+    Každý záznam je po zpracování vyčištěn a odpojen od rodiče, takže
+    v paměti nikdy nezůstává celý strom - spotřeba paměti nezávisí
+    na velikosti dumpu. Se zadaným scan se z čtených bajtů zároveň
+    počítá hash a IČO pro Bloom filtr.
+    """
+    if resolve_parser(parser) == "lxml":
+        yield from _iter_zaznam_elements_lxml(xml_path, scan)
+        return
+    
+    with open_dump(xml_path, scan) as f:
+        yield from iter_zaznam_from_events(ET.iterparse(f, events=("start", "end")))
+
+
+def _iter_zaznam_elements_lxml(xml_path: Path, scan: Optional[DumpScan] = None) -> Iterator[ET.Element]:
+    """
+    Varianta iter_zaznam_elements přes lxml.
+
+    Parser sám vybírá jen konce elementů <zaznam> (bez události pro každý
+    element v Pythonu); zpracované záznamy se mažou z rodiče.
+    """
+    try:
+        with open_dump(xml_path, scan) as f:
+            for _, elem in lxml_etree.iterparse(f, events=("end",), tag=ZAZNAM_TAG, huge_tree=True):
+                yield elem
+                
+                # Uvolnit zpracovaný záznam i dříve zpracované sourozence
+                elem.clear(keep_tail=True)
+                parent = elem.getparent()
+                while elem.getprevious() is not None:
+                    del parent[0]
+    except lxml_etree.XMLSyntaxError as e:
+        raise ValueError(f"Chyba při parsování XML: {e}")
+
+
+def iter_pull_events(chunks: Iterable[bytes], parser: Optional[str] = None) -> Iterator[Tuple[str, ET.Element]]:
+    """
+    Vrací události ("start"/"end", element) z proudu bajtů XML (XMLPullParser).
+
+    Umožňuje parsovat dump po částech tak, jak přicházejí (např. ze stahování).
+    """
+    if resolve_parser(parser) == "lxml":
+        parser = lxml_etree.XMLPullParser(events=("start", "end"), huge_tree=True)
+    else:
+        parser = ET.XMLPullParser(events=("start", "end"))
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def iter_zaznam_from_events(events: Iterable[Tuple[str, ET.Element]]) -> Iterator[ET.Element]:
+    """
+    Vrací elementy <zaznam> z proudu událostí parseru; zpracované záznamy uvolňuje.
+    """
+    parents: List[ET.Element] = []
+    
+    try:
+        for event, elem in events:
+            if event == "start":
+                parents.append(elem)
+                continue
+            
+            parents.pop()
+            if elem.tag != ZAZNAM_TAG:
+                continue
+            
+            yield elem
+            
+            # Uvolnit zpracovaný záznam
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+    except PARSE_ERRORS as e:
+        raise ValueError(f"Chyba při parsování XML: {e}")
+
+
+def iter_contracts_from_xml(
+    xml_path: Path,
+    filter_ico: Optional[IcoFilter] = None,
+    parser: Optional[str] = None,
+    scan: Optional[DumpScan] = None
+) -> Iterator[Contract]:
+    """
+    Streamovaná varianta extract_contracts_from_xml - vrací smlouvy po jedné.
+    
+    Args:
+        xml_path: Cesta k XML dump souboru
+        filter_ico: Volitelné IČO (nebo kolekce IČO) pro filtrování
+        parser: Parser XML ("auto", "lxml", "stdlib"; výchozí XML_PARSER)
+        scan: Volitelný DumpScan, kterému se předávají čtené bajty dumpu
+    
+    Yields:
+        Záznamy Contract (ve stejném pořadí jako v dumpu)
+    """
+    print(f"[extract] Streamuji XML soubor: {xml_path.name}")
+    return iter_contracts_from_zaznamy(iter_zaznam_elements(xml_path, parser, scan), filter_ico)
+
+
+def iter_contracts_from_zaznamy(
+    zaznamy: Iterable[ET.Element],
+    filter_ico: Optional[IcoFilter] = None
+) -> Iterator[Contract]:
+    """Převádí proud elementů <zaznam> na smlouvy (volitelně filtrované podle IČO)."""
+    filter_icos = normalize_ico_filter(filter_ico)
+    extracted = 0
+    
+    for i, zaznam in enumerate(zaznamy):
+        if (i + 1) % 1000 == 0:
+            print(f"[extract] Zpracováno {i + 1} záznamů...")
+        
+        contract = extract_contract_from_zaznam(zaznam)
+        
+        if contract is None:
+            continue
+        
+        if filter_icos and not matching_icos(contract, filter_icos):
+            continue
+        
+        extracted += 1
+        yield contract
+    
+    print(f"[extract] Extrahováno {extracted} smluv")
+    if filter_icos:
+        print(f"[extract] Filtrováno podle IČO: {format_ico_filter(filter_icos)}")
+
+
+def matching_icos(contract: Contract, icos: FrozenSet[str]) -> Set[str]:
+    """Vrátí ta IČO z množiny, která jsou u smlouvy zadavatelem nebo dodavatelem."""
+    return {contract.authority_ico, contract.contractor_ico} & icos
+
+
+def extract_contracts_from_xml(
+    xml_path: Path,
+    filter_ico: Optional[IcoFilter] = None,
+    streaming: bool = False,
+    parser: Optional[str] = None,
+    scan: Optional[DumpScan] = None
+) -> List[Contract]:
+    """
+    Extrahuje všechny smlouvy z XML souboru.
+    
+    Args:
+        xml_path: Cesta k XML dump souboru
+        filter_ico: Volitelné IČO nebo kolekce IČO pro filtrování (zobrazí pouze smlouvy, kde je některé z nich zadavatel nebo dodavatel)
+        streaming: Pokud True, parsuje se přes iterparse místo načtení celého DOM
+        parser: Parser XML ("auto", "lxml", "stdlib"; výchozí XML_PARSER)
+        scan: Volitelný DumpScan, kterému se předávají čtené bajty dumpu
+    
+    Returns:
+        Seznam záznamů Contract
+    """
+    if streaming:
+        return list(iter_contracts_from_xml(xml_path, filter_ico=filter_ico, parser=parser, scan=scan))
+    
+    print(f"[extract] Parsuji XML soubor: {xml_path.name}")
+    
+    try:
+        with open_dump(xml_path, scan) as f:
+            if resolve_parser(parser) == "lxml":
+                tree = lxml_etree.parse(f, lxml_etree.XMLParser(huge_tree=True))
+            else:
+                tree = ET.parse(f)
+        root = tree.getroot()
+    except PARSE_ERRORS as e:
+        raise ValueError(f"Chyba při parsování XML: {e}")
+    
+    contracts = []
+    filter_icos = normalize_ico_filter(filter_ico)
+    
+    # Najít všechny <zaznam> elementy (s namespace)
+    # XML struktura: <daily> -> <den> -> <zaznam>
+    zaznamy = root.findall(f".//{ZAZNAM_TAG}")
+    print(f"[extract] Nalezeno {len(zaznamy)} záznamů v XML")
+    
+    for i, zaznam in enumerate(zaznamy):
+        if (i + 1) % 1000 == 0:
+            print(f"[extract] Zpracováno {i + 1}/{len(zaznamy)} záznamů...")
+        
+        contract = extract_contract_from_zaznam(zaznam)
+        
+        if contract is None:
+            continue
+        
+        # Filtrování podle IČO
+        if filter_icos and not matching_icos(contract, filter_icos):
+            continue
+        
+        contracts.append(contract)
+    
+    print(f"[extract] Extrahováno {len(contracts)} smluv")
+    if filter_icos:
+        print(f"[extract] Filtrováno podle IČO: {format_ico_filter(filter_icos)}")
+    
+    return contracts
+
+
+def parse_zaznam_bytes(data: bytes, parser: Optional[str] = None) -> ET.Element:
+    """
+    Naparsuje jeden záznam vyříznutý z dumpu (bajty <zaznam>...</zaznam>).
+
+    Vyříznutý záznam nemá deklaraci výchozího namespace (ta je na kořenovém
+    elementu dumpu), proto se doplní do jeho otevírací značky.
+    """
+    data = _ZAZNAM_OPEN_NS + data[len(ZAZNAM_OPEN):]
+    if resolve_parser(parser) == "lxml":
+        return lxml_etree.fromstring(data, _lxml_record_parser())
+    return ET.fromstring(data)
+
+
+_LXML_RECORD_PARSER = None
+
+
+def _lxml_record_parser():
+    """Sdílený lxml parser pro vyříznuté záznamy (vytváří se jednou na proces)."""
+    global _LXML_RECORD_PARSER
+    if _LXML_RECORD_PARSER is None:
+        _LXML_RECORD_PARSER = lxml_etree.XMLParser(huge_tree=True)
+    return _LXML_RECORD_PARSER
+
+
+def ico_prefilter(icos: FrozenSet[str]) -> Callable[[bytes], bool]:
+    """
+    Vytvoří predikát pro bajtový předfiltr - rozhoduje nad surovou hodnotou <ico>.
+    
+    Hodnota se dekóduje a normalizuje stejně jako při úplném parsování.
+    """
+    def is_target(raw: bytes) -> bool:
+        return normalize_ico(decode_ico_value(raw)) in icos
+    
+    return is_target
+
+
+def iter_contracts_in_range(
+    buf: bytes,
+    start: int,
+    end: int,
+    filter_icos: Optional[FrozenSet[str]] = None,
+    parser: Optional[str] = None
+) -> Iterator[Contract]:
+    """
+    Extrahuje smlouvy ze záznamů, které začínají v bajtovém úseku [start, end) dumpu.
+    
+    Při zadaném filtru se plně parsují jen záznamy, které projdou bajtovým
+    předfiltrem na hodnoty <ico>; výsledek je stejný jako při parsování všech.
+    """
+    if filter_icos:
+        spans = iter_candidate_spans(buf, ico_prefilter(filter_icos), start, end)
+    else:
+        spans = iter_record_spans(buf, start, end)
+    
+    for record_start, record_end in spans:
+        try:
+            zaznam = parse_zaznam_bytes(buf[record_start:record_end], parser)
+        except PARSE_ERRORS as e:
+            raise ValueError(f"Chyba při parsování XML na offsetu {record_start}: {e}")
+        
+        contract = extract_contract_from_zaznam(zaznam)
+        
+        if contract is None:
+            continue
+        
+        if filter_icos and not matching_icos(contract, filter_icos):
+            continue
+        
+        yield contract
+
+
+def iter_contracts_prefiltered(
+    xml_path: Path,
+    filter_ico: IcoFilter,
+    parser: Optional[str] = None
+) -> Iterator[Contract]:
+    """
+    Rychlá extrakce podle IČO nad memory-mapped dumpem.
+    
+    Místo parsování každého záznamu se nejdřív nad bajty vyhledají hodnoty
+    <ico> a plně se parsují jen záznamy, které mohou vyhovovat. Extrakce je tak
+    omezena hlavně rychlostí čtení souboru. Výstup je shodný s ostatními režimy.
+    """
+    filter_icos = normalize_ico_filter(filter_ico)
+    
+    print(f"[extract] Předfiltruji {xml_path.name} podle IČO: {format_ico_filter(filter_icos)}")
+    
+    extracted = 0
+    with open_dump_mmap(xml_path) as buf:
+        for contract in iter_contracts_in_range(buf, 0, len(buf), filter_icos, parser):
+            extracted += 1
+            yield contract
+    
+    print(f"[extract] Extrahováno {extracted} smluv")
+
+
+def iter_contracts_indexed(
+    xml_path: Path,
+    filter_ico: IcoFilter,
+    parser: Optional[str] = None
+) -> Iterator[Contract]:
+    """
+    Extrakce podle IČO přes perzistentní index IČO -> offsety záznamů.
+    
+    Index se pro dump postaví jednou (při prvním použití) a uloží vedle dumpu;
+    další dotazy pak čtou a parsují jen záznamy daných IČO.
+    """
+    filter_icos = normalize_ico_filter(filter_ico)
+    index = load_ico_index(xml_path)
+    spans = lookup_ico_spans(index, filter_icos)
+    
+    print(f"[extract] Index {xml_path.name}: {len(spans)} záznamů pro IČO {format_ico_filter(filter_icos)}")
+    
+    extracted = 0
+    with open_dump_mmap(xml_path) as buf:
+        for record_start, record_end in spans:
+            try:
+                zaznam = parse_zaznam_bytes(buf[record_start:record_end], parser)
+            except PARSE_ERRORS as e:
+                raise ValueError(f"Chyba při parsování XML na offsetu {record_start}: {e}")
+            
+            contract = extract_contract_from_zaznam(zaznam)
+            
+            if contract is None or not matching_icos(contract, filter_icos):
+                continue
+            
+            extracted += 1
+            yield contract
+    
+    print(f"[extract] Extrahováno {extracted} smluv")
+
+
+def _extract_shard(task: Tuple[str, int, int, Optional[FrozenSet[str]], str]) -> List[Contract]:
+    """
+    Worker pro paralelní extrakci - zpracuje záznamy jednoho shardu dumpu.
+    
+    Args:
+        task: (cesta k dumpu, začátek shardu, konec shardu, normalizovaná IČO filtru, parser XML)
+    """
+    dump_path, start, end, filter_icos, parser = task
+    
+    with open_dump_mmap(Path(dump_path)) as buf:
+        return list(iter_contracts_in_range(buf, start, end, filter_icos, parser))
+
+
+def iter_contracts_parallel(
+    xml_path: Path,
+    filter_ico: Optional[IcoFilter] = None,
+    workers: int = 2,
+    parser: Optional[str] = None
+) -> Iterator[Contract]:
+    """
+    Paralelní extrakce jednoho dumpu v process poolu.
+    
+    Dump se rozdělí na shardy zarovnané na hranice záznamů <zaznam>, každý
+    shard naparsuje jeden proces a výsledky se vrací v původním pořadí
+    záznamů (výstup je shodný se sekvenční extrakcí).
+    
+    Args:
+        xml_path: Cesta k XML dump souboru
+        filter_ico: Volitelné IČO (nebo kolekce IČO) pro filtrování
+        workers: Počet procesů
+        parser: Parser XML ("auto", "lxml", "stdlib"; výchozí XML_PARSER)
+    
+    Yields:
+        Záznamy Contract
+    """
+    filter_icos = normalize_ico_filter(filter_ico)
+    
+    with open_dump_mmap(xml_path) as buf:
+        shards = split_into_shards(buf, workers * SHARDS_PER_WORKER)
+    
+    print(f"[extract] Paralelně parsuji {xml_path.name}: {len(shards)} shardů, {workers} procesů")
+    
+    # Parser se předává explicitně - worker nemusí zdědit XML_PARSER (spawn/forkserver)
+    parser = resolve_parser(parser)
+    tasks = [(str(xml_path), start, end, filter_icos, parser) for start, end in shards]
+    extracted = 0
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Omezit počet rozpracovaných shardů, aby se hotové výsledky
+        # nehromadily v paměti, zatímco se čeká na pomalejší shard
+        pending = deque()
+        next_task = 0
+        
+        for done in range(len(tasks)):
+            while next_task < len(tasks) and len(pending) < workers * 2:
+                pending.append(executor.submit(_extract_shard, tasks[next_task]))
+                next_task += 1
+            
+            shard_contracts = pending.popleft().result()
+            extracted += len(shard_contracts)
+            print(f"[extract] Shard {done + 1}/{len(tasks)} hotov ({extracted} smluv)")
+            yield from shard_contracts
+    
+    print(f"[extract] Extrahováno {extracted} smluv")
+    if filter_icos:
+        print(f"[extract] Filtrováno podle IČO: {format_ico_filter(filter_icos)}")
+
+
+class ContractWriter:
+    """
+    Průběžný zápis smluv do výstupního souboru (formát podle přípony).
+    
+    - .jsonl / .jsonl.gz: jeden kompaktní JSON objekt na řádek (volitelně gzip)
+    - .json: JSON pole, znak po znaku shodné s json.dump(seznam, indent=2)
+    
+    Zapisuje se do dočasného souboru, který se přejmenuje až při úspěšném
+    zavření, aby přerušená extrakce nezanechala neúplný výstup.
+    """
+    
+    def __init__(self, output_path: Path):
+        self.output_path = Path(output_path)
+        self.output_format = output_format_of(self.output_path)
+        self.tmp_path = self.output_path.with_name(self.output_path.name + ".tmp")
+        self.count = 0
+        
+        if self.output_path.name.endswith(".gz"):
+            self._file = gzip.open(self.tmp_path, 'wt', encoding='utf-8')
+        else:
+            self._file = open(self.tmp_path, 'w', encoding='utf-8')
+    
+    def write(self, contract: Contract) -> None:
+        data = contract.to_dict()
+        if self.output_format == "json":
+            item = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+            self._file.write("[\n  " if self.count == 0 else ",\n  ")
+            self._file.write(item.replace("\n", "\n  "))
+        else:
+            self._file.write(json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str))
+            self._file.write("\n")
+        self.count += 1
+    
+    def close(self) -> None:
+        """Dokončí zápis a přejmenuje dočasný soubor na finální výstup."""
+        if self.output_format == "json":
+            self._file.write("\n]" if self.count else "[]")
+        self._file.close()
+        self.tmp_path.replace(self.output_path)
+    
+    def abort(self) -> None:
+        """Zahodí rozepsaný výstup."""
+        self._file.close()
+        self.tmp_path.unlink(missing_ok=True)
+    
+    def __enter__(self) -> "ContractWriter":
+        return self
+    
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def output_format_of(path: Path) -> str:
+    """Vrátí formát výstupního souboru se smlouvami podle přípony."""
+    name = Path(path).name
+    for output_format, suffix in sorted(OUTPUT_FORMATS.items(), key=lambda item: -len(item[1])):
+        if name.endswith(suffix):
+            return output_format
+    raise ValueError(f"Neznámý formát výstupu se smlouvami: {name}")
+
+
+def write_contracts(contracts: Iterable[Contract], output_path: Path) -> int:
+    """
+    Zapisuje smlouvy do výstupního souboru průběžně (bez držení celého seznamu v paměti).
+    
+    Returns:
+        Počet zapsaných smluv
+    """
+    with ContractWriter(output_path) as writer:
+        for contract in contracts:
+            writer.write(contract)
+    return writer.count
+
+
+def iter_extracted_dicts(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Streamovaně čte smlouvy z extrahovaného souboru (.jsonl, .jsonl.gz i starší .json)
+    jako slovníky tak, jak jsou uložené.
+    
+    JSON Lines se čtou po řádcích, v paměti je vždy jen jedna smlouva. Starší
+    výstupy ve formátu JSON pole se musí načíst celé.
+    """
+    path = Path(path)
+    output_format = output_format_of(path)
+    
+    if output_format == "json":
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+    
+    opener = gzip.open if output_format == "jsonl.gz" else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_extracted_contracts(path: Path) -> Iterator[Contract]:
+    """Streamovaně čte smlouvy z extrahovaného souboru jako záznamy Contract."""
+    return map(Contract.from_dict, iter_extracted_dicts(path))
+
+
+def list_extracted_files(directory: Path = EXTRACTED_DIR) -> List[Path]:
+    """Všechny extrahované soubory se smlouvami (ve všech formátech) seřazené podle názvu."""
+    if not directory.exists():
+        return []
+    
+    return sorted(
+        path for path in directory.glob("contracts_*")
+        if any(path.name.endswith(suffix) for suffix in OUTPUT_FORMATS.values())
+    )
+
+
+def extracted_stem(path: Path) -> str:
+    """Název extrahovaného souboru bez přípony formátu (contracts_dump_2025_11_01.jsonl.gz -> contracts_dump_2025_11_01)."""
+    name = Path(path).name
+    return name[:-len(OUTPUT_FORMATS[output_format_of(path)])]
 
 
-def normalize_ico(ico: Optional[str]) -> Optional[str]:
+def export_parquet(paths: Iterable[Path]) -> None:
+    """Vyexportuje extrahované soubory do Parquet datasetu (smlouvy se čtou průběžně)."""
+    for path in paths:
+        write_parquet_dataset(iter_extracted_contracts(path), extracted_stem(path))
+
+
+def iter_dump_contracts(
+    dump_path: Path,
+    filter_ico: Optional[IcoFilter] = None,
+    streaming: bool = True,
+    workers: int = 1,
+    prefilter: bool = True,
+    use_index: bool = True,
+    scan: Optional[DumpScan] = None,
+    parser: Optional[str] = None
+) -> Iterable[Contract]:
     """
-    Normalizuje IČO - odstraní mezery a převede na string.
+    Vybere způsob čtení dumpu (index / paralelně / předfiltr / streamovaně / DOM)
+    a vrátí smlouvy.
     
-    IČO může být v různých formátech:
-    - "70886288"
-    - "604 69 803" (s mezerami)
-    - "28.05.1955" (někdy je to datum narození místo IČO)
+    Paralelní režim při zadaném filtru předfiltruje i v jednotlivých shardech.
+    Komprimované dumpy nelze mapovat do paměti, čtou se vždy streamovaně (nebo DOM);
+    vyžádané paralelní čtení, předfiltr nebo index se u nich s varováním nepoužijí.
+    Zadaný scan dostává bajty jen při sekvenčním čtení (streamovaně / DOM).
     """
-    if not ico:
-        return None
-    
-    # Odstranit mezery
-    ico_clean = str(ico).replace(" ", "").replace(".", "")
-    
-    # Pokud vypadá jako datum (obsahuje tečky a je delší), vrátit None
-    if "." in str(ico) and len(str(ico)) > 10:
-        return None
-    
-    return ico_clean if ico_clean else None
+    if is_compressed(dump_path):
+        unavailable = []
+        if workers > 1:
+            unavailable.append(f"paralelní čtení (workers={workers})")
+        if normalize_ico_filter(filter_ico):
+            if prefilter:
+                unavailable.append("předfiltr")
+            if use_index:
+                unavailable.append("index IČO")
+        if unavailable:
+            print(f"[extract] ⚠ Dump {dump_path.name} je komprimovaný, nelze použít: {', '.join(unavailable)}; "
+                  f"čtu ho streamovaně (pro rychlejší extrakci ukládejte dumpy bez komprese)")
+        if streaming:
+            return iter_contracts_from_xml(dump_path, filter_ico=filter_ico, parser=parser, scan=scan)
+        return extract_contracts_from_xml(dump_path, filter_ico=filter_ico, parser=parser, scan=scan)
+    if use_index and normalize_ico_filter(filter_ico):
+        return iter_contracts_indexed(dump_path, filter_ico, parser)
+    if workers > 1:
+        return iter_contracts_parallel(dump_path, filter_ico=filter_ico, workers=workers, parser=parser)
+    if prefilter and normalize_ico_filter(filter_ico):
+        return iter_contracts_prefiltered(dump_path, filter_ico, parser)
+    if streaming:
+        return iter_contracts_from_xml(dump_path, filter_ico=filter_ico, parser=parser, scan=scan)
+    return extract_contracts_from_xml(dump_path, filter_ico=filter_ico, parser=parser, scan=scan)
 
 
-def extract_contract_from_zaznam(zaznam: ET.Element) -> Optional[Dict[str, Any]]:
+def record_extraction(
+    dump_name: str,
+    dump_sha256: str,
+    outputs: Dict[Path, Tuple[Optional[List[str]], int]]
+) -> None:
     """
-    Extrahuje informace o smlouvě z XML elementu <zaznam>.
+    Zapíše do metadat extrahovaný dump a otisk každého výstupu (jedním uložením).
     
-    Vrací slovník s informacemi o smlouvě nebo None, pokud není platný záznam.
-    """
-    # Zkontrolovat, zda je záznam platný
-    platny = zaznam.findtext(f"{{{XML_NS}}}platnyZaznam")
-    if platny != "1":
-        return None
+    Výstupy téhož dumpu a filtru v jiném formátu jsou po nové extrakci zastaralé
+    a smažou se.
     
-    # Identifikátory
-    identifikator = zaznam.find(f"{{{XML_NS}}}identifikator")
-    if identifikator is None:
-        return None
+    Args:
+        dump_name: Název dumpu bez přípony
+        dump_sha256: SHA-256 obsahu dumpu
+        outputs: {cesta k výstupu: (filtr IČO z extraction_filter, počet smluv)}
+    """
+    with update_metadata() as metadata:
+        key = dump_key(dump_name)
+        if key not in metadata["extracted_months"]:
+            metadata["extracted_months"].append(key)
+        
+        extractions = metadata.setdefault("extractions", {})
+        for output_path, (filter_icos, count) in outputs.items():
+            extractions[output_path.name] = {
+                "dump": dump_name,
+                "dump_sha256": dump_sha256,
+                "filter": filter_icos,
+                "extractor_version": EXTRACTOR_VERSION,
+                "contracts": count,
+                "extracted_at": datetime.now().isoformat(),
+            }
+            
+            stem = extracted_stem(output_path)
+            for suffix in OUTPUT_FORMATS.values():
+                stale_path = output_path.with_name(stem + suffix)
+                if stale_path != output_path and stale_path.exists():
+                    stale_path.unlink()
+                    extractions.pop(stale_path.name, None)
+                    print(f"[extract] Smazán zastaralý výstup: {stale_path.name}")
+            
+            for ico in filter_icos or []:
+                if ico not in metadata["processed_icos"]:
+                    metadata["processed_icos"].append(ico)
+
+
+def extracted_output_path(
+    dump_name: str,
+    filter_ico: Optional[str] = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> Path:
+    """Vrátí cestu k výstupnímu souboru pro dump (a případně IČO) v daném formátu."""
+    EXTRACTED_DIR.mkdir(parents=True, exist_ok=True)
     
-    contract_id = identifikator.findtext(f"{{{XML_NS}}}idSmlouvy")
-    version_id = identifikator.findtext(f"{{{XML_NS}}}idVerze")
-    url = zaznam.findtext(f"{{{XML_NS}}}odkaz")
-    published_date = zaznam.findtext(f"{{{XML_NS}}}casZverejneni")
+    if filter_ico:
+        output_stem = f"contracts_{dump_name}_ico_{filter_ico}"
+    else:
+        output_stem = f"contracts_{dump_name}"
     
-    # Smlouva
-    smlouva = zaznam.find(f"{{{XML_NS}}}smlouva")
-    if smlouva is None:
-        return None
+    return EXTRACTED_DIR / (output_stem + OUTPUT_FORMATS[output_format])
+
+
+def extract_dump_from_stream(
+    chunks: Iterable[bytes],
+    dump_name: str,
+    filter_ico: Optional[str] = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    scan: Optional[DumpScan] = None
+) -> Path:
+    """
+    Extrahuje smlouvy z proudu bajtů dumpu (např. přímo ze stahování) a uloží je.
     
-    # Zadavatel (subjekt)
-    subjekt = smlouva.find(f"{{{XML_NS}}}subjekt")
-    authority = {}
-    if subjekt is not None:
-        authority = {
-            "ico": normalize_ico(subjekt.findtext(f"{{{XML_NS}}}ico")),
-            "name": subjekt.findtext(f"{{{XML_NS}}}nazev") or "",
-            "address": subjekt.findtext(f"{{{XML_NS}}}adresa") or "",
-            "datova_schranka": subjekt.findtext(f"{{{XML_NS}}}datovaSchranka") or "",
-            "utvar": subjekt.findtext(f"{{{XML_NS}}}utvar") or ""
-        }
+    Výstupní soubor i zápis do metadat jsou stejné jako u extract_dump; SHA-256
+    obsahu dumpu (a s předaným DumpScan i IČO pro Bloom filtr) se spočítá průběžně
+    z proudu. Pokud proud skončí výjimkou (přerušené nebo neověřené stahování),
+    výstup se nepřejmenuje na finální jméno a do metadat se nic nezapíše.
     
-    # Dodavatel (smluvniStrana)
-    smluvni_strana = smlouva.find(f"{{{XML_NS}}}smluvniStrana")
-    contractor = {}
-    if smluvni_strana is not None:
-        contractor = {
-            "ico": normalize_ico(smluvni_strana.findtext(f"{{{XML_NS}}}ico")),
-            "name": smluvni_strana.findtext(f"{{{XML_NS}}}nazev") or "",
-            "address": smluvni_strana.findtext(f"{{{XML_NS}}}adresa") or "",
-            "datova_schranka": smluvni_strana.findtext(f"{{{XML_NS}}}datovaSchranka") or "",
-            "utvar": smluvni_strana.findtext(f"{{{XML_NS}}}utvar") or ""
-        }
+    Args:
+        chunks: Bajty dumpu v pořadí, v jakém přicházejí
+        dump_name: Název dumpu bez přípony (např. "dump_2025_11")
+        filter_ico: Volitelné IČO pro filtrování
+        output_format: Formát výstupu (viz OUTPUT_FORMATS)
+        scan: Volitelný DumpScan, kterým projdou všechny bajty proudu (po úspěšném
+              konci má complete=True); bez něj se počítá jen SHA-256
     
-    # Detaily smlouvy
-    subject = smlouva.findtext(f"{{{XML_NS}}}predmet") or ""
-    contract_date = smlouva.findtext(f"{{{XML_NS}}}datumUzavreni") or ""
-    contract_number = smlouva.findtext(f"{{{XML_NS}}}cisloSmlouvy") or ""
-    approved_by = smlouva.findtext(f"{{{XML_NS}}}schvalil") or ""
+    Returns:
+        Cesta k vytvořenému souboru
+    """
+    output_path = extracted_output_path(dump_name, filter_ico, output_format)
     
-    # Hodnoty
-    value_with_vat = smlouva.findtext(f"{{{XML_NS}}}hodnotaVcetneDph")
-    value_without_vat = smlouva.findtext(f"{{{XML_NS}}}hodnotaBezDph")
+    if scan is None:
+        scan = DumpScan(collect_icos=False)
     
-    # Převést na čísla
-    try:
-        value_with_vat = float(value_with_vat) if value_with_vat else None
-    except (ValueError, TypeError):
-        value_with_vat = None
+    def scanned_chunks() -> Iterator[bytes]:
+        for chunk in chunks:
+            scan.feed(chunk)
+            yield chunk
+        scan.complete = True
     
-    try:
-        value_without_vat = float(value_without_vat) if value_without_vat else None
-    except (ValueError, TypeError):
-        value_without_vat = None
+    print(f"[extract] Parsuji {dump_name} průběžně během stahování")
+    zaznamy = iter_zaznam_from_events(iter_pull_events(scanned_chunks()))
+    count = write_contracts(iter_contracts_from_zaznamy(zaznamy, filter_ico), output_path)
     
-    # Přílohy
-    attachments = []
-    prilohy = smlouva.find(f"{{{XML_NS}}}prilohy")
-    if prilohy is not None:
-        for priloha in prilohy.findall(f"{{{XML_NS}}}priloha"):
-            attachment = {
-                "filename": priloha.findtext(f"{{{XML_NS}}}nazevSouboru") or "",
-                "hash": priloha.findtext(f"{{{XML_NS}}}hash") or "",
-                "url": priloha.findtext(f"{{{XML_NS}}}odkaz") or ""
-            }
-            attachments.append(attachment)
-    
-    # Sestavit výsledný objekt
-    contract = {
-        "contract_id": contract_id,
-        "version_id": version_id,
-        "url": url,
-        "published_date": published_date,
-        "authority": authority,
-        "contractor": contractor,
-        "subject": subject,
-        "contract_date": contract_date,
-        "contract_number": contract_number,
-        "approved_by": approved_by,
-        "value_with_vat": value_with_vat,
-        "value_without_vat": value_without_vat,
-        "attachments": attachments,
-        "source": "smlouvy_gov"
-    }
+    print(f"[extract] Uloženo {count} smluv do: {output_path.name}")
+    record_extraction(dump_name, scan.hexdigest(), {output_path: (extraction_filter(filter_ico), count)})
     
-    return contract
+    return output_path
 
 
-def extract_contracts_from_xml(
-    xml_path: Path,
-    filter_ico: Optional[str] = None
-) -> List[Dict[str, Any]]:
+def extract_dump(
+    dump_path: Path,
+    filter_ico: Optional[str] = None,
+    incremental: bool = True,
+    streaming: bool = True,
+    workers: int = 1,
+    prefilter: bool = True,
+    use_index: bool = True,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> Path:
     """
-    Extrahuje všechny smlouvy z XML souboru.
+    Extrahuje smlouvy z XML dump souboru a uloží je (JSON Lines nebo JSON).
     
     Args:
-        xml_path: Cesta k XML dump souboru
-        filter_ico: Volitelné IČO pro filtrování (zobrazí pouze smlouvy, kde je toto IČO zadavatel nebo dodavatel)
+        dump_path: Cesta k XML dump souboru
+        filter_ico: Volitelné IČO pro filtrování
+        incremental: Pokud True, přeskočí dump, jehož výstup odpovídá otisku dumpu,
+                     filtru IČO a verzi extraktoru (viz find_current_output)
+        streaming: Pokud True, dump se čte přes iterparse a smlouvy se zapisují
+                   průběžně (paměť nezávisí na velikosti dumpu)
+        workers: Počet procesů; při více než 1 se dump parsuje paralelně po shardech
+        prefilter: Při filtru podle IČO parsovat jen záznamy, které projdou
+                   bajtovým předfiltrem nad memory-mapped dumpem
+        use_index: Při filtru podle IČO číst záznamy přes index IČO -> offsety
+                   (při prvním použití se index postaví)
+        output_format: Formát výstupu (viz OUTPUT_FORMATS)
     
     Returns:
-        Seznam slovníků s informacemi o smlouvách
+        Cesta k vytvořenému souboru
     """
-    print(f"[extract] Parsuji XML soubor: {xml_path.name}")
+    # Určit název výstupního souboru
+    dump_name = dump_stem(dump_path)  # např. "dump_2025_11_01"
+    output_path = extracted_output_path(dump_name, filter_ico, output_format)
     
-    try:
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
-    except ET.ParseError as e:
-        raise ValueError(f"Chyba při parsování XML: {e}")
+    # Zkontrolovat, zda je výstup (v libovolném formátu) aktuální vůči otisku dumpu;
+    # bez zaznamenaného výstupu se hash nepočítá předem, ale během extrakce
+    stat = dump_path.stat()
+    fingerprint = known_dump_fingerprint(dump_path)
+    if fingerprint is None and incremental and has_recorded_output(dump_name, filter_ico):
+        fingerprint = dump_fingerprint(dump_path)
+    current_path = find_current_output(dump_name, filter_ico, fingerprint and fingerprint["sha256"])
+    if incremental and current_path:
+        print(f"[extract] Výstup je aktuální, přeskakuji: {current_path.name}")
+        return current_path
     
-    contracts = []
-    filter_ico_normalized = normalize_ico(filter_ico) if filter_ico else None
+    scan = begin_dump_scan(dump_path, fingerprint)
     
-    # Najít všechny <zaznam> elementy (s namespace)
-    # XML struktura: <daily> -> <den> -> <zaznam>
-    zaznamy = root.findall(f".//{{{XML_NS}}}zaznam")
-    print(f"[extract] Nalezeno {len(zaznamy)} záznamů v XML")
+    # Extrahovat smlouvy a průběžně je zapsat
+    filter_icos = normalize_ico_filter(filter_ico)
+    if filter_icos and not dump_may_contain(dump_path, filter_icos):
+        # Bloom filtr: IČO v dumpu určitě není, dump se vůbec neotevírá
+        print(f"[extract] Dump {dump_path.name} podle Bloom filtru neobsahuje IČO {filter_ico}, přeskakuji parsování")
+        contracts = []
+    else:
+        contracts = iter_dump_contracts(
+            dump_path,
+            filter_ico=filter_ico,
+            streaming=streaming,
+            workers=workers,
+            prefilter=prefilter,
+            use_index=use_index,
+            scan=scan
+        )
+    count = write_contracts(contracts, output_path)
     
-    for i, zaznam in enumerate(zaznamy):
-        if (i + 1) % 1000 == 0:
-            print(f"[extract] Zpracováno {i + 1}/{len(zaznamy)} záznamů...")
-        
-        contract = extract_contract_from_zaznam(zaznam)
-        
-        if contract is None:
-            continue
-        
-        # Filtrování podle IČO
-        if filter_ico_normalized:
-            authority_ico = contract["authority"].get("ico")
-            contractor_ico = contract["contractor"].get("ico")
-            
-            if (authority_ico != filter_ico_normalized and 
-                contractor_ico != filter_ico_normalized):
-                continue
-        
-        contracts.append(contract)
+    print(f"[extract] Uloženo {count} smluv do: {output_path.name}")
     
-    print(f"[extract] Extrahováno {len(contracts)} smluv")
-    if filter_ico:
-        print(f"[extract] Filtrováno podle IČO: {filter_ico}")
+    # Aktualizovat otisk a Bloom filtr IČO dumpu (z průchodu parseru) a metadata
+    fingerprint = finish_dump_scan(dump_path, stat, scan, fingerprint)
+    record_extraction(dump_name, fingerprint["sha256"], {output_path: (extraction_filter(filter_ico), count)})
     
-    return contracts
+    return output_path
 
 
-def extract_dump(
+def extract_dump_for_icos(
     dump_path: Path,
-    filter_ico: Optional[str] = None,
-    incremental: bool = True
-) -> Path:
+    icos: Iterable[str],
+    incremental: bool = True,
+    streaming: bool = True,
+    workers: int = 1,
+    prefilter: bool = True,
+    use_index: bool = True,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> Dict[str, Path]:
     """
-    Extrahuje smlouvy z XML dump souboru a uloží je do JSON.
+    Extrahuje smlouvy pro celou sadu IČO jedním průchodem dumpem.
+    
+    Každá smlouva se hned zapíše do výstupu každého IČO, kterého se týká
+    (jako zadavatele nebo dodavatele), tj. do contracts_<dump>_ico_<IČO>.jsonl.
+    Metadata (otisky výstupů, processed_icos) se aktualizují najednou na konci.
     
     Args:
         dump_path: Cesta k XML dump souboru
-        filter_ico: Volitelné IČO pro filtrování
-        incremental: Pokud True, přeskočí, pokud už byl soubor zpracován
+        icos: IČO, pro která se mají smlouvy extrahovat
+        incremental: Pokud True, přeskočí IČO, jejichž výstup je aktuální vůči otisku dumpu
+        streaming: Pokud True, dump se čte přes iterparse
+        workers: Počet procesů pro paralelní parsování
+        prefilter: Parsovat jen záznamy, které projdou bajtovým předfiltrem
+        use_index: Číst záznamy přes index IČO -> offsety
+        output_format: Formát výstupu (viz OUTPUT_FORMATS)
     
     Returns:
-        Cesta k vytvořenému JSON souboru
+        Slovník {normalizované IČO: cesta k výstupnímu souboru}
     """
-    EXTRACTED_DIR.mkdir(parents=True, exist_ok=True)
-    
-    # Určit název výstupního souboru
-    dump_name = dump_path.stem  # např. "dump_2025_11_01"
+    dump_name = dump_stem(dump_path)
+    target_icos = normalize_ico_filter(list(icos)) or frozenset()
+    output_paths = {
+        ico: extracted_output_path(dump_name, ico, output_format)
+        for ico in sorted(target_icos)
+    }
     
-    if filter_ico:
-        output_filename = f"contracts_{dump_name}_ico_{filter_ico}.json"
-    else:
-        output_filename = f"contracts_{dump_name}.json"
+    stat = dump_path.stat()
+    fingerprint = known_dump_fingerprint(dump_path)
+    if fingerprint is None and incremental and any(has_recorded_output(dump_name, ico) for ico in target_icos):
+        fingerprint = dump_fingerprint(dump_path)
+    pending = set(target_icos)
+    if incremental:
+        for ico in sorted(target_icos):
+            current_path = find_current_output(dump_name, ico, fingerprint and fingerprint["sha256"])
+            if current_path:
+                output_paths[ico] = current_path
+                pending.discard(ico)
+    pending = frozenset(pending)
+    skipped = len(target_icos) - len(pending)
+    if skipped:
+        print(f"[extract] {skipped} IČO už má aktuální výstup, přeskakuji je")
     
-    output_path = EXTRACTED_DIR / output_filename
+    if not pending:
+        return output_paths
     
-    # Zkontrolovat, zda už není zpracováno (inkrementální režim)
-    if incremental and output_path.exists():
-        print(f"[extract] Soubor už existuje, přeskakuji: {output_path.name}")
-        return output_path
+    scan = begin_dump_scan(dump_path, fingerprint)
     
-    # Extrahovat smlouvy
-    contracts = extract_contracts_from_xml(dump_path, filter_ico=filter_ico)
+    # IČO, která podle Bloom filtru v dumpu nejsou, dostanou prázdný výstup
+    candidates = frozenset(ico for ico in pending if dump_may_contain(dump_path, [ico]))
+    if len(candidates) < len(pending):
+        print(f"[extract] Bloom filtr vyřadil {len(pending) - len(candidates)} IČO bez smluv v {dump_path.name}")
     
-    # Uložit do JSON
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(contracts, f, indent=2, ensure_ascii=False, default=str)
+    # Jeden průchod dumpem, smlouvy se rovnou zapisují do výstupů podle IČO
+    writers = {ico: ContractWriter(output_paths[ico]) for ico in sorted(pending)}
+    try:
+        if candidates:
+            contracts = iter_dump_contracts(
+                dump_path,
+                filter_ico=candidates,
+                streaming=streaming,
+                workers=workers,
+                prefilter=prefilter,
+                use_index=use_index,
+                scan=scan
+            )
+            
+            for contract in contracts:
+                for ico in matching_icos(contract, candidates):
+                    writers[ico].write(contract)
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
     
-    print(f"[extract] Uloženo {len(contracts)} smluv do: {output_path.name}")
+    for ico, writer in writers.items():
+        writer.close()
+        print(f"[extract] IČO {ico}: uloženo {writer.count} smluv do {output_paths[ico].name}")
     
-    # Aktualizovat metadata
-    metadata = load_metadata()
-    month_key = dump_name.replace("dump_", "").replace("_01", "")  # "2025_11_01" -> "2025_11"
-    if month_key not in metadata["extracted_months"]:
-        metadata["extracted_months"].append(month_key)
-    if filter_ico:
-        ico_normalized = normalize_ico(filter_ico)
-        if ico_normalized and ico_normalized not in metadata["processed_icos"]:
-            metadata["processed_icos"].append(ico_normalized)
-    save_metadata(metadata)
+    fingerprint = finish_dump_scan(dump_path, stat, scan, fingerprint)
+    record_extraction(dump_name, fingerprint["sha256"], {
+        output_paths[ico]: ([ico], writer.count) for ico, writer in writers.items()
+    })
     
-    return output_path
+    return output_paths
 
 
-def extract_latest_dump(
-    filter_ico: Optional[str] = None,
-    incremental: bool = True
-) -> Path:
-    """
-    Extrahuje smlouvy z nejnovějšího staženého dumpu.
-    """
-    # Najít nejnovější XML soubor
-    xml_files = sorted(RAW_DIR.glob("dump_*.xml"), reverse=True)
+def find_latest_dump() -> Path:
+    """Najde nejnovější stažený XML dump."""
+    xml_files = sorted(glob_dumps(RAW_DIR), reverse=True)
     
     if not xml_files:
         raise FileNotFoundError(f"Nenalezen žádný XML dump v {RAW_DIR}")
     
     latest_dump = xml_files[0]
     print(f"[extract] Používám nejnovější dump: {latest_dump.name}")
-    
-    return extract_dump(latest_dump, filter_ico=filter_ico, incremental=incremental)
+    return latest_dump
 
 
-def extract_dump_for_month(
-    year: int,
-    month: int,
-    filter_ico: Optional[str] = None,
-    incremental: bool = True
-) -> Path:
+def find_dump_for_month(year: int, month: int) -> Path:
     """
-    Extrahuje smlouvy z dumpu pro konkrétní měsíc.
+    Najde stažený XML dump pro konkrétní měsíc.
+    
+    Přednost má dokončený měsíční dump (dump_RRRR_MM), jinak nejnovější denní dump z měsíce.
     """
-    # Najít odpovídající XML soubor
-    pattern = f"dump_{year}_{month:02d}_*.xml"
-    xml_files = list(RAW_DIR.glob(pattern))
+    monthly_dump = find_stored_dump(RAW_DIR, f"dump_{year}_{month:02d}")
+    if monthly_dump is not None:
+        return monthly_dump
+    
+    pattern = f"dump_{year}_{month:02d}_*"
+    xml_files = glob_dumps(RAW_DIR, pattern)
     
     if not xml_files:
         raise FileNotFoundError(f"Nenalezen dump pro {year}-{month:02d} v {RAW_DIR}")
@@ -337,7 +1445,230 @@ def extract_dump_for_month(
     else:
         dump_path = xml_files[0]
     
-    return extract_dump(dump_path, filter_ico=filter_ico, incremental=incremental)
+    return dump_path
+
+
+def extract_latest_dump(
+    filter_ico: Optional[str] = None,
+    incremental: bool = True,
+    streaming: bool = True,
+    workers: int = 1
+) -> Path:
+    """
+    Extrahuje smlouvy z nejnovějšího staženého dumpu.
+    """
+    latest_dump = find_latest_dump()
+    
+    return extract_dump(
+        latest_dump,
+        filter_ico=filter_ico,
+        incremental=incremental,
+        streaming=streaming,
+        workers=workers
+    )
+
+
+def extract_dump_for_month(
+    year: int,
+    month: int,
+    filter_ico: Optional[str] = None,
+    incremental: bool = True,
+    streaming: bool = True,
+    workers: int = 1
+) -> Path:
+    """
+    Extrahuje smlouvy z dumpu pro konkrétní měsíc.
+    """
+    dump_path = find_dump_for_month(year, month)
+    
+    return extract_dump(
+        dump_path,
+        filter_ico=filter_ico,
+        incremental=incremental,
+        streaming=streaming,
+        workers=workers
+    )
+
+
+def _extract_month_dump(task: Tuple[str, Optional[str], bool, bool, bool, bool, str, str]) -> Tuple[str, int]:
+    """
+    Worker pro extrakci rozsahu měsíců - zpracuje jeden dump (sekvenčně).
+    
+    Args:
+        task: (cesta k dumpu, IČO filtru, incremental, streaming, prefilter,
+               use_index, formát výstupu, parser XML)
+    
+    Returns:
+        (cesta k výstupu, počet smluv ve výstupu)
+    """
+    global XML_PARSER
+    dump_path, filter_ico, incremental, streaming, prefilter, use_index, output_format, parser = task
+    XML_PARSER = parser
+    
+    output_path = extract_dump(
+        Path(dump_path),
+        filter_ico=filter_ico,
+        incremental=incremental,
+        streaming=streaming,
+        prefilter=prefilter,
+        use_index=use_index,
+        output_format=output_format
+    )
+    count = load_metadata().get("extractions", {}).get(output_path.name, {}).get("contracts", 0)
+    return str(output_path), count
+
+
+def extract_month_range(
+    start: Tuple[int, int],
+    end: Tuple[int, int],
+    filter_ico: Optional[str] = None,
+    incremental: bool = True,
+    streaming: bool = True,
+    workers: int = 1,
+    prefilter: bool = True,
+    use_index: bool = True,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> Dict[Tuple[int, int], Path]:
+    """
+    Extrahuje dumpy pro rozsah měsíců (backfill), více dumpů souběžně v process poolu.
+    
+    Každý dump zpracuje jeden proces celý (paralelizuje se přes dumpy, ne uvnitř
+    dumpu). Zápisy do metadat jsou chráněné zámkem (viz update_metadata).
+    Průběžně se vypisuje dokončení každého dumpu, na konci souhrn smluv po
+    měsících; měsíce bez staženého dumpu a neúspěšné dumpy se vypíšou v souhrnu.
+    
+    Returns:
+        Slovník (rok, měsíc) -> cesta k výstupu extrakce
+    """
+    selected = {}
+    missing = []
+    for year, month in iter_months(start, end):
+        try:
+            selected[(year, month)] = find_dump_for_month(year, month)
+        except FileNotFoundError:
+            missing.append((year, month))
+    
+    workers = max(1, min(workers, len(selected)))
+    print(f"[extract] Backfill {start[0]}-{start[1]:02d} až {end[0]}-{end[1]:02d}: "
+          f"{len(selected)} dumpů, {workers} procesů")
+    
+    parser = resolve_parser()
+    outputs = {}
+    counts = {}
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_extract_month_dump, (
+                str(dump_path), filter_ico, incremental, streaming,
+                prefilter, use_index, output_format, parser
+            )): key
+            for key, dump_path in selected.items()
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            year, month = futures[future]
+            try:
+                output_path, count = future.result()
+            except Exception as e:
+                print(f"[extract] [{done}/{len(futures)}] ❌ {year}-{month:02d}: {e}")
+                failed.append((year, month))
+                continue
+            outputs[(year, month)] = Path(output_path)
+            counts[(year, month)] = count
+            print(f"[extract] [{done}/{len(futures)}] {year}-{month:02d}: {count} smluv ({Path(output_path).name})")
+    
+    print("\n[extract] Souhrn po měsících:")
+    for key in sorted(counts):
+        print(f"  {key[0]}-{key[1]:02d}  {counts[key]:>10}  {outputs[key].name}")
+    print(f"  {'celkem':<7}  {sum(counts.values()):>10}")
+    if missing:
+        print(f"[extract] ⚠ Chybí stažený dump: {', '.join(f'{y}-{m:02d}' for y, m in missing)}")
+    if failed:
+        print(f"[extract] ⚠ Extrakce selhala: {', '.join(f'{y}-{m:02d}' for y, m in sorted(failed))}")
+    
+    return dict(sorted(outputs.items()))
+
+
+def list_raw_dumps() -> List[Path]:
+    """Všechny stažené XML dumpy (i komprimované) seřazené chronologicky podle názvu."""
+    return glob_dumps(RAW_DIR)
+
+
+def iter_contracts_for_ico(
+    ico: IcoFilter,
+    dumps: Optional[Iterable[Path]] = None
+) -> Iterator[Contract]:
+    """
+    Dotaz "všechny smlouvy IČO přes všechny měsíce".
+    
+    Dumpy, které podle Bloom filtru IČO neobsahují, se přeskočí bez otevření;
+    v ostatních se přes index IČO čtou jen záznamy daného IČO - cena dotazu
+    odpovídá počtu nalezených smluv, ne velikosti dumpů.
+    """
+    filter_icos = normalize_ico_filter(ico)
+    for dump_path in (dumps if dumps is not None else list_raw_dumps()):
+        if not dump_may_contain(dump_path, filter_icos):
+            continue
+        yield from iter_dump_contracts(dump_path, ico)
+
+
+def extract_ico_from_all_dumps(
+    ico: str,
+    incremental: bool = True,
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> List[Path]:
+    """
+    Extrahuje smlouvy jednoho IČO ze všech stažených dumpů (přes index IČO).
+    
+    Pro každý dump vznikne běžný výstup contracts_<dump>_ico_<IČO>.jsonl,
+    takže nové IČO lze doplnit bez přeparsování celých dumpů.
+    """
+    dumps = list_raw_dumps()
+    if not dumps:
+        raise FileNotFoundError(f"Nenalezen žádný XML dump v {RAW_DIR}")
+    
+    print(f"[extract] Hledám IČO {ico} v {len(dumps)} dumpech")
+    
+    return [
+        extract_dump(dump_path, filter_ico=ico, incremental=incremental, output_format=output_format)
+        for dump_path in dumps
+    ]
+
+
+def available_parsers() -> List[str]:
+    """Parsery XML použitelné v tomto prostředí."""
+    return ["lxml", "stdlib"] if lxml_etree is not None else ["stdlib"]
+
+
+def benchmark_parsers(dump_path: Path, repeat: int = 3) -> Dict[str, float]:
+    """
+    Změří rychlost streamované extrakce dumpu pro každý dostupný parser.
+    
+    Každý parser se spustí repeat-krát a bere se nejlepší čas; výsledky
+    všech parserů se zároveň porovnají (musí být shodné).
+    
+    Returns:
+        Slovník {parser: záznamů za sekundu}
+    """
+    results = {}
+    reference = None
+    
+    for parser in available_parsers():
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            contracts = list(iter_contracts_from_zaznamy(iter_zaznam_elements(dump_path, parser)))
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        
+        if reference is None:
+            reference = contracts
+        elif contracts != reference:
+            raise ValueError(f"Parser {parser} vrací jiné smlouvy než {available_parsers()[0]}")
+        
+        results[parser] = len(contracts) / best if best else 0.0
+        print(f"[benchmark] {parser}: {len(contracts)} smluv za {best:.3f} s ({results[parser]:.0f} záznamů/s)")
+    
+    return results
 
 
 def parse_args() -> argparse.Namespace:
@@ -364,10 +1695,31 @@ def parse_args() -> argparse.Namespace:
         help="Měsíc dumpu (1-12, použije se spolu s --year)"
     )
     
+    parser.add_argument(
+        "--from",
+        dest="date_from",
+        type=parse_year_month,
+        help="Začátek rozsahu měsíců pro backfill (YYYY-MM); dumpy se extrahují souběžně (--workers)"
+    )
+    
+    parser.add_argument(
+        "--to",
+        dest="date_to",
+        type=parse_year_month,
+        help="Konec rozsahu měsíců pro backfill (YYYY-MM, včetně)"
+    )
+    
     parser.add_argument(
         "--ico",
         type=str,
-        help="Filtrovat podle IČO (zobrazí pouze smlouvy s tímto IČO jako zadavatel nebo dodavatel)"
+        action="append",
+        help="Filtrovat podle IČO (zobrazí pouze smlouvy s tímto IČO jako zadavatel nebo dodavatel); lze zadat vícekrát"
+    )
+    
+    parser.add_argument(
+        "--ico-file",
+        type=str,
+        help="Soubor se seznamem IČO (jedno na řádek) - dump se projde jen jednou pro všechna IČO"
     )
     
     parser.add_argument(
@@ -376,37 +1728,164 @@ def parse_args() -> argparse.Namespace:
         help="Přeprocessovat i když už soubor existuje"
     )
     
+    parser.add_argument(
+        "--no-streaming",
+        action="store_true",
+        help="Načíst celý dump do paměti (DOM) místo streamovaného parsování"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Počet procesů pro paralelní parsování dumpu, s --from/--to počet souběžně extrahovaných dumpů (výchozí: 1)"
+    )
+    
+    parser.add_argument(
+        "--no-prefilter",
+        action="store_true",
+        help="Při filtrování podle IČO parsovat všechny záznamy (vypne bajtový předfiltr)"
+    )
+    
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Při filtrování podle IČO nepoužívat index IČO -> offsety záznamů"
+    )
+    
+    parser.add_argument(
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default=DEFAULT_OUTPUT_FORMAT,
+        help=f"Formát výstupu (výchozí: {DEFAULT_OUTPUT_FORMAT} - jedna smlouva na řádek)"
+    )
+    
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Výstup navíc vyexportovat do Parquet datasetu (vyžaduje pyarrow)"
+    )
+    
+    parser.add_argument(
+        "--parser",
+        choices=XML_PARSERS,
+        default=XML_PARSER,
+        help=f"Parser XML (výchozí: {XML_PARSER}; auto = lxml, pokud je nainstalováno)"
+    )
+    
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Změřit rychlost extrakce dumpu pro dostupné parsery (nic nezapisuje)"
+    )
+    
+    parser.add_argument(
+        "--all-dumps",
+        action="store_true",
+        help="Extrahovat smlouvy zadaného IČO ze všech stažených dumpů (přes index IČO)"
+    )
+    
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
     
+    XML_PARSER = args.parser
+    
     incremental = not args.no_incremental
+    streaming = not args.no_streaming
+    
+    icos = list(args.ico or [])
+    if args.ico_file:
+        icos.extend(load_ico_file(Path(args.ico_file)))
+    filter_ico = icos[0] if len(icos) == 1 else None
     
     try:
+        if args.all_dumps:
+            if len(icos) != 1:
+                print("Chyba: --all-dumps vyžaduje právě jedno --ico")
+                exit(1)
+            output_paths = extract_ico_from_all_dumps(
+                icos[0],
+                incremental=incremental,
+                output_format=args.format
+            )
+            if args.parquet:
+                export_parquet(output_paths)
+            print(f"\n✓ Extrakce dokončena: {len(output_paths)} souborů v {EXTRACTED_DIR}")
+            exit(0)
+        
+        if args.date_from or args.date_to:
+            if not (args.date_from and args.date_to):
+                print("Chyba: Zadej oba parametry --from a --to")
+                exit(1)
+            if len(icos) > 1:
+                print("Chyba: --from/--to podporuje nejvýše jedno --ico")
+                exit(1)
+            output_paths = extract_month_range(
+                args.date_from,
+                args.date_to,
+                filter_ico=filter_ico,
+                incremental=incremental,
+                streaming=streaming,
+                workers=args.workers,
+                prefilter=not args.no_prefilter,
+                use_index=not args.no_index,
+                output_format=args.format
+            )
+            if args.parquet:
+                export_parquet(output_paths.values())
+            print(f"\n✓ Extrakce dokončena: {len(output_paths)} souborů v {EXTRACTED_DIR}")
+            exit(0)
+        
         if args.dump:
             dump_path = Path(args.dump)
             if not dump_path.is_absolute():
                 dump_path = RAW_DIR / dump_path
-            output_path = extract_dump(dump_path, filter_ico=args.ico, incremental=incremental)
         
         elif args.year and args.month:
             if not (1 <= args.month <= 12):
                 print(f"Chyba: Měsíc musí být v rozsahu 1-12, zadáno: {args.month}")
                 exit(1)
-            output_path = extract_dump_for_month(
-                args.year, args.month,
-                filter_ico=args.ico,
-                incremental=incremental
-            )
+            dump_path = find_dump_for_month(args.year, args.month)
         
         else:
-            output_path = extract_latest_dump(filter_ico=args.ico, incremental=incremental)
+            dump_path = find_latest_dump()
+        
+        if args.benchmark:
+            benchmark_parsers(dump_path)
+            exit(0)
         
-        print(f"\n✓ Extrakce dokončena: {output_path}")
+        if len(icos) > 1:
+            output_paths = extract_dump_for_icos(
+                dump_path,
+                icos,
+                incremental=incremental,
+                streaming=streaming,
+                workers=args.workers,
+                prefilter=not args.no_prefilter,
+                use_index=not args.no_index,
+                output_format=args.format
+            )
+            if args.parquet:
+                export_parquet(output_paths.values())
+            print(f"\n✓ Extrakce dokončena: {len(output_paths)} souborů v {EXTRACTED_DIR}")
+        else:
+            output_path = extract_dump(
+                dump_path,
+                filter_ico=filter_ico,
+                incremental=incremental,
+                streaming=streaming,
+                workers=args.workers,
+                prefilter=not args.no_prefilter,
+                use_index=not args.no_index,
+                output_format=args.format
+            )
+            if args.parquet:
+                export_parquet([output_path])
+            print(f"\n✓ Extrakce dokončena: {output_path}")
         
     except Exception as e:
         print(f"\n✗ Chyba: {e}")
         exit(1)
-
@@ -0,0 +1,421 @@
+"""
+generate_synthetic_dumps.py
+
+Generátor syntetických vstupních dat pro měření výkonu extrakce bez stahování
+skutečných dumpů.
+
+Funkce:
+- generuje XML dump Registru smluv ve schématu ISRS 1.2 (namespace, <zaznam>,
+  <identifikator>, <smlouva>, <subjekt>, <smluvniStrana>, <prilohy>, ...)
+- generuje odpověď RZP na VerejnyWebDotaz (seznam podnikatelů s živnostmi,
+  statutárními orgány a společníky + detail firmy se členy statutárního orgánu)
+- škáluje od tisíců po miliony záznamů (10k, 1M, 10M) - zapisuje se průběžně,
+  paměť nezávisí na počtu záznamů
+- výstup je deterministický (stejné --seed = stejný soubor), volitelně gzip
+
+Data mají realistickou strukturu pro extraktory: opakující se zadavatelé a
+dodavatelé, více verzí téže smlouvy, neplatné záznamy, chybějící hodnoty,
+znaky vyžadující escapování v XML.
+"""
+
+from pathlib import Path
+from datetime import date, timedelta
+from typing import IO, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+import argparse
+import gzip
+import random
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.extract_smlouvy_contracts import XML_NS
+from scripts.extract_rzp import RZP_NS
+
+BASE_DIR = Path(__file__).parent.parent
+SYNTHETIC_DIR = BASE_DIR / "data" / "benchmarks" / "synthetic"
+
+DEFAULT_SEED = 42
+
+# Počet záznamů zapsaných najednou (jeden zápis do souboru)
+WRITE_BATCH = 1000
+
+# Podíl záznamů, které jsou novou verzí už zveřejněné smlouvy / neplatné
+NEW_VERSION_RATE = 0.1
+INVALID_RATE = 0.02
+
+# Podíl podnikatelů RZP, kteří mají statutární orgán / společníky
+RZP_STATUTORY_RATE = 0.3
+RZP_PARTNER_RATE = 0.2
+
+FIRST_NAMES = [
+    "Jan", "Petr", "Jiří", "Pavel", "Martin", "Tomáš", "Jaroslav", "Miroslav", "Zdeněk", "Václav",
+    "Jana", "Marie", "Eva", "Hana", "Anna", "Lenka", "Kateřina", "Lucie", "Věra", "Alena",
+]
+LAST_NAMES = [
+    "Novák", "Svoboda", "Novotný", "Dvořák", "Černý", "Procházka", "Kučera", "Veselý", "Horák", "Němec",
+    "Marek", "Pospíšil", "Pokorný", "Hájek", "Král", "Jelínek", "Růžička", "Beneš", "Fiala", "Sedláček",
+]
+TITLES = ["", "", "", "Ing. ", "Mgr. ", "Bc. ", "MUDr. "]
+COMPANY_WORDS = [
+    "Stavby", "Technika", "Servis", "Energo", "Dopravní", "Lékárenský", "Komunikace", "Projekt",
+    "Zdravotní", "Systémy", "Inženýring", "Obchod", "Vodárny", "Tisk", "Úklid", "Software",
+]
+COMPANY_FORMS = ["s.r.o.", "a.s.", "spol. s r.o.", "k.s.", "v.o.s."]
+AUTHORITY_KINDS = [
+    "Ministerstvo", "Město", "Obec", "Krajský úřad", "Nemocnice", "Základní škola", "Správa", "Úřad",
+]
+AUTHORITY_PLACES = [
+    "Praha", "Brno", "Ostrava", "Plzeň", "Liberec", "Olomouc", "Zlín", "Jihlava", "Kolín", "Tábor",
+]
+STREETS = ["Hlavní", "Nádražní", "Školní", "Masarykova", "Palackého", "Husova", "Komenského", "Polní"]
+SUBJECTS = [
+    "Dodávka zdravotnického materiálu", "Oprava komunikace", "Servis výpočetní techniky",
+    "Nákup kancelářských potřeb", "Rekonstrukce budovy", "Poskytování právních služeb",
+    "Objednávka č.", "Dodatek ke smlouvě", "Pronájem nebytových prostor", "Dodávka elektřiny",
+]
+DATA_BOX_CHARS = "abcdefghijkmnpqrstuvwxyz23456789"
+TRADES = [
+    "Výroba, obchod a služby neuvedené v přílohách 1 až 3 živnostenského zákona",
+    "Hostinská činnost", "Silniční motorová doprava", "Provádění staveb, jejich změn a odstraňování",
+    "Montáž, opravy, revize a zkoušky elektrických zařízení", "Účetní poradci, vedení účetnictví",
+]
+
+
+def parse_scale(value: str) -> int:
+    """Převede počet záznamů s volitelnou příponou k/M ("10k", "1M", "2500") na číslo."""
+    text = value.strip().lower()
+    multiplier = 1
+    if text.endswith("k"):
+        multiplier, text = 1_000, text[:-1]
+    elif text.endswith("m"):
+        multiplier, text = 1_000_000, text[:-1]
+
+    try:
+        scale = int(float(text) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Neplatný počet záznamů: {value}")
+    if scale <= 0:
+        raise argparse.ArgumentTypeError(f"Počet záznamů musí být kladný: {value}")
+    return scale
+
+
+def format_scale(scale: int) -> str:
+    """Zkrácený zápis počtu záznamů pro názvy souborů ("10000" -> "10k")."""
+    if scale % 1_000_000 == 0:
+        return f"{scale // 1_000_000}M"
+    if scale % 1_000 == 0:
+        return f"{scale // 1_000}k"
+    return str(scale)
+
+
+def _open_output(path: Path, encoding: str) -> IO[str]:
+    """Otevře výstupní soubor pro zápis textu (gzip, pokud název končí .gz)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".gz":
+        return gzip.open(path, "wt", encoding=encoding, compresslevel=6)
+    return open(path, "w", encoding=encoding)
+
+
+def _ico(rng: random.Random) -> str:
+    return f"{rng.randrange(10 ** 8):08d}"
+
+
+def _person_name(rng: random.Random) -> Tuple[str, str]:
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+def _address(rng: random.Random) -> str:
+    return (
+        f"{rng.choice(STREETS)} {rng.randint(1, 2500)}/{rng.randint(1, 60)}, "
+        f"{rng.randint(100, 799)} {rng.randint(0, 99):02d} {rng.choice(AUTHORITY_PLACES)}"
+    )
+
+
+def _company_name(rng: random.Random) -> str:
+    if rng.random() < 0.3:
+        # Jména firem podle společníků (s ampersandem - escapování v XML)
+        return f"{rng.choice(LAST_NAMES)} & {rng.choice(LAST_NAMES)} {rng.choice(COMPANY_FORMS)}"
+    return f"{rng.choice(COMPANY_WORDS)} {rng.choice(AUTHORITY_PLACES)} {rng.choice(COMPANY_FORMS)}"
+
+
+def _party_pool(rng: random.Random, size: int, authority: bool) -> List[str]:
+    """Předem vyrenderované smluvní strany (opakují se napříč smlouvami jako v reálných dumpech)."""
+    parties = []
+    for _ in range(size):
+        if authority:
+            name = f"{rng.choice(AUTHORITY_KINDS)} {rng.choice(AUTHORITY_PLACES)}"
+        else:
+            name = _company_name(rng)
+        fields = []
+        if rng.random() < 0.8:
+            fields.append(f"<datovaSchranka>{''.join(rng.choices(DATA_BOX_CHARS, k=7))}</datovaSchranka>")
+        fields.append(f"<nazev>{escape(name)}</nazev>")
+        if rng.random() < 0.97:
+            fields.append(f"<ico>{_ico(rng)}</ico>")
+        fields.append(f"<adresa>{escape(_address(rng))}</adresa>")
+        if authority and rng.random() < 0.2:
+            fields.append(f"<utvar>Odbor {rng.choice(COMPANY_WORDS).lower()}</utvar>")
+        parties.append("".join(fields))
+    return parties
+
+
+def iter_smlouvy_records(records: int, seed: int, year: int, month: int) -> Iterator[str]:
+    """Vrací záznamy <zaznam>...</zaznam> syntetického dumpu jako řetězce."""
+    rng = random.Random(seed)
+    authorities = _party_pool(rng, max(10, records // 1000), authority=True)
+    contractors = _party_pool(rng, max(50, records // 50), authority=False)
+
+    first_day = date(year, month, 1)
+    days_in_month = ((first_day.replace(day=28) + timedelta(days=4)).replace(day=1) - first_day).days
+
+    first_contract_id = next_contract_id = 10_000_000 + seed * 1000
+    next_version_id = 30_000_000 + seed * 1000
+    next_file_id = 40_000_000 + seed * 1000
+
+    for _ in range(records):
+        next_version_id += 1
+        if next_contract_id > first_contract_id and rng.random() < NEW_VERSION_RATE:
+            contract_id = rng.randint(first_contract_id + 1, next_contract_id)
+        else:
+            next_contract_id += 1
+            contract_id = next_contract_id
+
+        published = first_day + timedelta(days=rng.randrange(days_in_month))
+        published_at = f"{published.isoformat()}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}+01:00"
+        concluded = published - timedelta(days=rng.randrange(60))
+
+        authority = rng.choice(authorities)
+        contractor = rng.choice(contractors)
+        subject = f"{rng.choice(SUBJECTS)} {rng.randint(1, 99999)}/{published.year}"
+        number = f"{rng.randint(1, 9999)}/{published.year}"
+
+        values = []
+        if rng.random() < 0.9:
+            value = round(rng.lognormvariate(11, 2), 2)
+            values.append(f"<hodnotaBezDph>{value}</hodnotaBezDph>")
+            if rng.random() < 0.7:
+                values.append(f"<hodnotaVcetneDph>{round(value * 1.21, 2)}</hodnotaVcetneDph>")
+
+        schvalil = f"<schvalil>{' '.join(_person_name(rng))}</schvalil>" if rng.random() < 0.3 else ""
+
+        attachments = []
+        for _ in range(rng.choice((0, 1, 1, 1, 2, 3))):
+            next_file_id += 1
+            filename = f"smlouva_{contract_id}_{next_file_id}.pdf"
+            attachments.append(
+                f"<priloha><nazevSouboru>{filename}</nazevSouboru>"
+                f'<hash algoritmus="sha256">{rng.getrandbits(256):064x}</hash>'
+                f"<odkaz>https://smlouvy.gov.cz/smlouva/soubor/{next_file_id}/{filename}</odkaz></priloha>"
+            )
+        prilohy = f"<prilohy>{''.join(attachments)}</prilohy>" if attachments else ""
+
+        platny = "0" if rng.random() < INVALID_RATE else "1"
+
+        yield (
+            f"<zaznam><identifikator><idSmlouvy>{contract_id}</idSmlouvy><idVerze>{next_version_id}</idVerze></identifikator>"
+            f"<odkaz>https://smlouvy.gov.cz/smlouva/{next_version_id}</odkaz>"
+            f"<casZverejneni>{published_at}</casZverejneni>"
+            f"<smlouva><subjekt>{authority}</subjekt><smluvniStrana>{contractor}</smluvniStrana>"
+            f"<predmet>{escape(subject)}</predmet><datumUzavreni>{concluded.isoformat()}</datumUzavreni>"
+            f"<cisloSmlouvy>{number}</cisloSmlouvy>{schvalil}{''.join(values)}</smlouva>"
+            f"{prilohy}<platnyZaznam>{platny}</platnyZaznam></zaznam>\n"
+        )
+
+
+def generate_smlouvy_dump(
+    output_path: Path,
+    records: int,
+    seed: int = DEFAULT_SEED,
+    year: int = 2025,
+    month: int = 1
+) -> Path:
+    """
+    Zapíše syntetický měsíční dump Registru smluv (schéma ISRS 1.2).
+
+    Args:
+        output_path: Cílový soubor (.xml, nebo .xml.gz pro gzip)
+        records: Počet záznamů <zaznam>
+        seed: Semínko generátoru (stejné semínko = stejný dump)
+        year, month: Měsíc dumpu (data zveřejnění spadají do něj)
+
+    Returns:
+        Cesta k vytvořenému souboru
+    """
+    with _open_output(output_path, "utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<dump xmlns="{XML_NS}"><mesic>{month:02d}</mesic><rok>{year}</rok>'
+                f'<casGenerovani>{year}-{month:02d}-01T00:00:00+01:00</casGenerovani><dokoncenyMesic>1</dokoncenyMesic>\n')
+
+        batch = []
+        for record in iter_smlouvy_records(records, seed, year, month):
+            batch.append(record)
+            if len(batch) >= WRITE_BATCH:
+                f.write("".join(batch))
+                batch.clear()
+        f.write("".join(batch))
+
+        f.write("</dump>\n")
+
+    print(f"[synthetic] Dump {output_path.name}: {records} záznamů")
+    return output_path
+
+
+def _rzp_date(rng: random.Random) -> str:
+    day = date(1995, 1, 1) + timedelta(days=rng.randrange(11000))
+    return day.strftime("%d.%m.%Y")
+
+
+def iter_rzp_podnikatele(records: int, seed: int) -> Iterator[str]:
+    """Vrací elementy <PodnikatelSeznam> odpovědi RZP jako řetězce."""
+    rng = random.Random(seed)
+    company_icos = [_ico(rng) for _ in range(max(20, records // 20))]
+
+    for _ in range(records):
+        jmeno, prijmeni = _person_name(rng)
+
+        parts = [
+            f"<IdentifikacniCisloSeznam>{_ico(rng)}</IdentifikacniCisloSeznam>",
+            f"<ObchodniJmenoSeznam>{jmeno} {prijmeni}</ObchodniJmenoSeznam>",
+            f"<AdresaPodnikaniSeznam>{escape(_address(rng))}</AdresaPodnikaniSeznam>",
+            f"<DatumNarozeni>{_rzp_date(rng)}</DatumNarozeni>",
+        ]
+
+        for _ in range(rng.randint(1, 3)):
+            parts.append(f"<Zivnost><Predmet>{escape(rng.choice(TRADES))}</Predmet></Zivnost>")
+
+        if rng.random() < RZP_STATUTORY_RATE:
+            members = []
+            for _ in range(rng.randint(1, 3)):
+                member_jmeno, member_prijmeni = _person_name(rng)
+                members.append(
+                    f"<Clen><Jmeno>{member_jmeno}</Jmeno><Prijmeni>{member_prijmeni}</Prijmeni>"
+                    f"<VznikFunkce>{_rzp_date(rng)}</VznikFunkce></Clen>"
+                )
+            parts.append(
+                f"<StatutarniOrgan><IdentifikacniCislo>{rng.choice(company_icos)}</IdentifikacniCislo>"
+                f"{''.join(members)}</StatutarniOrgan>"
+            )
+
+        if rng.random() < RZP_PARTNER_RATE:
+            parts.append(
+                f"<Spolecnik><IdentifikacniCislo>{rng.choice(company_icos)}</IdentifikacniCislo>"
+                f"<Podil>{rng.randint(1, 100)} %</Podil><PlatnostOd>{_rzp_date(rng)}</PlatnostOd></Spolecnik>"
+            )
+
+        yield f"    <PodnikatelSeznam>{''.join(parts)}</PodnikatelSeznam>\n"
+
+
+def iter_rzp_zapsane_osoby(count: int, seed: int) -> Iterator[str]:
+    """Vrací elementy <ZapsanaOsoba> (členové statutárního orgánu v detailu firmy)."""
+    rng = random.Random(seed + 1)
+    for index in range(count):
+        jmeno, prijmeni = _person_name(rng)
+        ukoncen = f"<Ukoncen>{_rzp_date(rng)}</Ukoncen>" if rng.random() < 0.5 else ""
+        yield (
+            f"<ZapsanaOsoba><OsobaPoradoveCislo>{count - index}</OsobaPoradoveCislo>"
+            f"<OsobaJmenoPrijmeni>{rng.choice(TITLES)}{jmeno} {prijmeni}</OsobaJmenoPrijmeni>"
+            f"<Zapsano><VeFunkci><Ustanoven>{_rzp_date(rng)}</Ustanoven>{ukoncen}</VeFunkci>"
+            f"<DatumZapisuOd>{_rzp_date(rng)}</DatumZapisuOd></Zapsano></ZapsanaOsoba>\n"
+        )
+
+
+def generate_rzp_response(
+    output_path: Path,
+    records: int,
+    seed: int = DEFAULT_SEED,
+    detail_members: Optional[int] = None
+) -> Path:
+    """
+    Zapíše syntetickou odpověď RZP na VerejnyWebDotaz (kódování ISO-8859-2 jako RZP).
+
+    Odpověď obsahuje records podnikatelů (PodnikatelSeznam) a detail jedné firmy
+    se členy statutárního orgánu (StatutarniOrganClen/ZapsanaOsoba).
+
+    Args:
+        output_path: Cílový soubor (.xml, nebo .xml.gz pro gzip)
+        records: Počet podnikatelů
+        seed: Semínko generátoru
+        detail_members: Počet členů statutárního orgánu v detailu (výchozí records // 10)
+
+    Returns:
+        Cesta k vytvořenému souboru
+    """
+    if detail_members is None:
+        detail_members = max(1, records // 10)
+
+    with _open_output(output_path, "iso-8859-2") as f:
+        f.write('<?xml version="1.0" encoding="ISO-8859-2" standalone="yes"?>\n')
+        f.write(f'<VerejnyWebOdpoved xmlns="{RZP_NS}" version="3.1">\n')
+        f.write(f"  <PodnikatelDetail><IdentifikacniCislo>{_ico(random.Random(seed))}</IdentifikacniCislo>"
+                f"<ObchodniJmeno>Syntetická firma {seed}, a.s.</ObchodniJmeno><StatutarniOrganClen>\n")
+        batch = []
+        for element in iter_rzp_zapsane_osoby(detail_members, seed):
+            batch.append(element)
+            if len(batch) >= WRITE_BATCH:
+                f.write("".join(batch))
+                batch.clear()
+        f.write("".join(batch))
+        f.write("  </StatutarniOrganClen></PodnikatelDetail>\n")
+
+        batch = []
+        for element in iter_rzp_podnikatele(records, seed):
+            batch.append(element)
+            if len(batch) >= WRITE_BATCH:
+                f.write("".join(batch))
+                batch.clear()
+        f.write("".join(batch))
+
+        f.write("</VerejnyWebOdpoved>\n")
+
+    print(f"[synthetic] Odpověď RZP {output_path.name}: {records} podnikatelů, {detail_members} členů statutárního orgánu")
+    return output_path
+
+
+def synthetic_paths(records: int, seed: int = DEFAULT_SEED, compress: bool = False) -> Tuple[Path, Path]:
+    """Cesty syntetického dumpu a odpovědi RZP pro daný počet záznamů a semínko."""
+    suffix = ".xml.gz" if compress else ".xml"
+    label = f"{format_scale(records)}_s{seed}"
+    return (
+        SYNTHETIC_DIR / f"dump_synthetic_{label}{suffix}",
+        SYNTHETIC_DIR / f"rzp_synthetic_{label}{suffix}",
+    )
+
+
+def ensure_synthetic_data(records: int, seed: int = DEFAULT_SEED, compress: bool = False) -> Tuple[Path, Path]:
+    """Vrátí syntetický dump a odpověď RZP; chybějící soubory vygeneruje (data jsou deterministická)."""
+    dump_path, rzp_path = synthetic_paths(records, seed, compress)
+    if not dump_path.exists():
+        generate_smlouvy_dump(dump_path, records, seed)
+    if not rzp_path.exists():
+        generate_rzp_response(rzp_path, records, seed)
+    return dump_path, rzp_path
+
+
+def parse_args() -> argparse.Namespace:
+    """CLI argumenty pro samostatné použití."""
+    parser = argparse.ArgumentParser(
+        description="Generování syntetických dumpů Registru smluv a odpovědí RZP pro benchmarky."
+    )
+    parser.add_argument("--records", type=parse_scale, action="append",
+                        help="Počet záznamů (např. 10k, 1M, 10M); lze zadat vícekrát (výchozí: 10k)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help=f"Semínko generátoru (výchozí: {DEFAULT_SEED})")
+    parser.add_argument("--gzip", action="store_true", help="Ukládat komprimované (.xml.gz)")
+    parser.add_argument("--only", choices=["smlouvy", "rzp"], help="Generovat jen jeden typ dat")
+    parser.add_argument("--force", action="store_true", help="Přegenerovat i existující soubory")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    for records in args.records or [10_000]:
+        dump_path, rzp_path = synthetic_paths(records, args.seed, args.gzip)
+        if args.only != "rzp" and (args.force or not dump_path.exists()):
+            generate_smlouvy_dump(dump_path, records, args.seed)
+        if args.only != "smlouvy" and (args.force or not rzp_path.exists()):
+            generate_rzp_response(rzp_path, records, args.seed)
+
+    print(f"\n✓ Syntetická data v {SYNTHETIC_DIR}")
@@ -12,6 +12,7 @@ import sys
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import TRANSFORMED_DIR, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+from scripts.transform_state import mark_snapshot_loaded, pending_snapshots
 
 class Neo4jLoader:
     """Loads data into Neo4j graph database using Czech schema."""
@@ -278,9 +279,19 @@ class Neo4jLoader:
         return total_nodes, total_rels
     
     def load_all(self, clear_first=False):
-        """Load all transformed data files."""
+        """
+        Load transformed data snapshots.
+
+        Loads every snapshot not yet loaded since the last full one, in the order
+        they were written (incremental and daily deltas accumulate until loaded),
+        and marks each one as loaded. Without pending snapshots the most recent
+        file is loaded again.
+
+        Returns True only if the data was loaded (False when Neo4j is unreachable
+        or there is nothing to load); errors during loading are raised.
+        """
         if not self.connect():
-            return
+            return False
         
         try:
             # Create constraints
@@ -290,23 +301,32 @@ class Neo4jLoader:
             if clear_first:
                 self.clear_database(confirm=True)
             
-            # Find all transformed data files
-            data_files = glob.glob(os.path.join(TRANSFORMED_DIR, "neo4j_data_*.json"))
-            
-            if not data_files:
-                print(f"No transformed data files found in {TRANSFORMED_DIR}")
-                print("Run transform_to_neo4j.py first to create transformed data files.")
-                return
+            # Snapshots not loaded yet, otherwise the most recent transformed data file
+            files_to_load = pending_snapshots()
+            if not files_to_load:
+                data_files = glob.glob(os.path.join(TRANSFORMED_DIR, "neo4j_data_*.json"))
+                
+                if not data_files:
+                    print(f"No transformed data files found in {TRANSFORMED_DIR}")
+                    print("Run transform_to_neo4j.py first to create transformed data files.")
+                    return False
+                
+                files_to_load = [max(data_files, key=os.path.getctime)]
             
-            # Load most recent file
-            latest_file = max(data_files, key=os.path.getctime)
-            print(f"Loading from: {os.path.basename(latest_file)}")
+            print(f"Loading from: {', '.join(os.path.basename(str(f)) for f in files_to_load)}")
             
-            total_nodes, total_rels = self.load_from_file(latest_file)
+            total_nodes = 0
+            total_rels = 0
+            for data_file in files_to_load:
+                nodes, rels = self.load_from_file(str(data_file))
+                mark_snapshot_loaded(data_file)
+                total_nodes += nodes
+                total_rels += rels
             
             print(f"\n✓ Load complete!")
             print(f"  Total nodes: {total_nodes}")
             print(f"  Total relationships: {total_rels}")
+            return True
             
         finally:
             self.close()
@@ -319,4 +339,5 @@ if __name__ == "__main__":
     args = parser.parse_args()
     
     loader = Neo4jLoader()
-    loader.load_all(clear_first=args.clear)
+    if not loader.load_all(clear_first=args.clear):
+        sys.exit(1)
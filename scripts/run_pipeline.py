@@ -11,18 +11,33 @@ Verze 0.2:
 - podporuje kompletní pipeline: download → extract → transform → load
 - podporuje filtrování podle IČO
 - podporuje inkrementální aktualizace
+- podporuje denní inkrementální režim (--daily): aplikuje jen nové denní dumpy jako delty
+- umí parsovat dump už během stahování (--stream-extract)
 """
 
 import argparse
+import queue
 import sys
+import threading
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from scripts.download_smlouvy_gov import get_latest_dump_path, get_dump_for_year_month, RAW_DIR
-from scripts.extract_smlouvy_contracts import extract_dump, extract_latest_dump, extract_dump_for_month
+from scripts.download_smlouvy_gov import (
+    get_latest_dump_path, get_dump_for_year_month, load_dump_index, download_selected_dump,
+    select_latest_finished_dump, select_month_dump, select_daily_dumps_after, RAW_DIR
+)
+from scripts.extract_smlouvy_contracts import (
+    extract_dump, extract_latest_dump, extract_dump_for_month, extract_dump_for_icos, load_ico_file,
+    get_applied_daily_dumps, mark_daily_dumps_applied, extract_dump_from_stream, find_current_output
+)
 from scripts.transform_to_neo4j import Neo4jTransformer
+from scripts.smlouvy_store import ContractStore
+from scripts.smlouvy_dump import DumpScan, dump_stem, find_stored_dump, glob_dumps, save_ico_bloom
+
+# Max. počet bloků (po 1 MB) mezi stahováním a parserem při --stream-extract
+STREAM_QUEUE_SIZE = 16
 
 # Lazy import for Neo4j (optional dependency)
 try:
@@ -53,30 +68,134 @@ def step_1_download_dump(year=None, month=None):
 
 
 
-def step_2_extract_contracts(dump_path: Path, ico=None, incremental=True) -> Path:
+def step_2_extract_contracts(dump_path: Path, ico=None, incremental=True, workers=1):
     """
     KROK 2: Extrakce smluv z XML dumpu.
 
-    - parsuje XML dump
+    - parsuje XML dump (při workers > 1 paralelně ve více procesech)
     - extrahuje informace o smlouvách (zadavatel, dodavatel, hodnota, datum)
-    - volitelně filtruje podle IČO
+    - volitelně filtruje podle IČO (pro seznam IČO stačí jeden průchod dumpem)
     - ukládá do strukturovaného JSON formátu
+    - načte extrahované smlouvy do úložiště posledních verzí (jeden řádek na smlouvu)
     """
     print(f"[KROK 2] Extrahuji smlouvy z {dump_path.name}...")
     
+    if isinstance(ico, (list, tuple, set)):
+        print(f"[KROK 2] Filtruji podle {len(ico)} IČO (jeden průchod dumpem)")
+        extracted_paths = extract_dump_for_icos(dump_path, ico, incremental=incremental, workers=workers)
+        print(f"[KROK 2] ✓ Extrahováno do {len(extracted_paths)} souborů")
+        ingest_to_store(extracted_paths.values())
+        return list(extracted_paths.values())
+    
     if ico:
         print(f"[KROK 2] Filtruji podle IČO: {ico}")
     
-    extracted_path = extract_dump(dump_path, filter_ico=ico, incremental=incremental)
+    extracted_path = extract_dump(dump_path, filter_ico=ico, incremental=incremental, workers=workers)
     print(f"[KROK 2] ✓ Extrahováno do: {extracted_path.name}")
+    ingest_to_store([extracted_path])
     return extracted_path
 
 
+def ingest_to_store(extracted_paths):
+    """Načte extrahované soubory do úložiště posledních verzí smluv."""
+    with ContractStore() as store:
+        changed = sum(store.ingest_file(path) for path in extracted_paths)
+        print(f"[KROK 2] ✓ Úložiště smluv: {changed} nových/aktualizovaných, celkem {store.count()} smluv")
+
+
+def step_1_2_download_and_extract(year=None, month=None, ico=None, incremental=True):
+    """
+    KROK 1+2: Stažení dumpu a současná extrakce smluv.
+
+    - stahovaná data se zapisují do raw souboru a zároveň předávají streamovanému parseru
+    - smlouvy jsou hotové ve chvíli, kdy doběhne stahování (a ověření dumpu)
+    - Bloom filtr IČO se sestaví z bajtů, které viděl parser (dump se znovu nečte)
+    - pokud je dump už stažený, výstup je aktuální nebo je zadáno více IČO,
+      použije se běžný postup KROK 1 → KROK 2
+    """
+    dump_index = load_dump_index()
+    if year is not None and month is not None:
+        selected = select_month_dump(dump_index, year, month)
+    else:
+        selected = select_latest_finished_dump(dump_index)
+    
+    dump_name = Path(selected["url"].split("/")[-1]).stem
+    multiple_icos = isinstance(ico, (list, tuple, set))
+    # Hash obsahu dumpu z indexu - podle něj se pozná aktuální výstup ještě před stažením
+    index_sha256 = selected.get("hash") if selected.get("hash_algorithm") == "sha256" else None
+    if (
+        find_stored_dump(RAW_DIR, dump_name) is not None
+        or multiple_icos
+        or (incremental and find_current_output(dump_name, ico, index_sha256) is not None)
+    ):
+        dump_path = download_selected_dump(selected)
+        print(f"[KROK 1] ✓ Stažený dump Registru smluv: {dump_path.name}")
+        return dump_path, step_2_extract_contracts(dump_path, ico=ico, incremental=incremental)
+    
+    print(f"[KROK 1+2] Stahuji a zároveň extrahuji {dump_name}...")
+    
+    chunks = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    cancelled = threading.Event()
+    outcome = {}
+    
+    def feed(chunk):
+        while not cancelled.is_set():
+            try:
+                chunks.put(chunk, timeout=1)
+                return
+            except queue.Full:
+                continue
+        raise InterruptedError("Extrakce selhala, stahování přerušeno")
+    
+    def download():
+        try:
+            outcome["path"] = download_selected_dump(selected, on_chunk=feed)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            while True:
+                try:
+                    chunks.put(None, timeout=1)
+                    break
+                except queue.Full:
+                    if cancelled.is_set():
+                        break
+    
+    def iter_chunks():
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+        # Smlouvy se zapíšou, jen pokud stahování prošlo ověřením
+        thread.join()
+        if "error" in outcome:
+            raise outcome["error"]
+    
+    thread = threading.Thread(target=download, daemon=True)
+    thread.start()
+    scan = DumpScan()
+    try:
+        extracted_path = extract_dump_from_stream(iter_chunks(), dump_name, filter_ico=ico, scan=scan)
+    except BaseException:
+        cancelled.set()
+        thread.join()
+        raise
+    
+    dump_path = outcome["path"]
+    bloom = scan.bloom()
+    save_ico_bloom(dump_path, bloom)
+    print(f"[KROK 1+2] Bloom filtr uložen pro {dump_path.name} ({bloom.count} IČO)")
+    print(f"[KROK 1+2] ✓ Stažený dump: {dump_path.name}, extrahováno do: {extracted_path.name}")
+    ingest_to_store([extracted_path])
+    return dump_path, extracted_path
+
+
 def step_3_transform_to_neo4j(ico=None):
     """
     KROK 3: Transformace dat do Neo4j formátu.
 
-    - načte extrahované smlouvy
+    - načte smlouvy z úložiště posledních verzí (každou smlouvu jednou)
     - vytvoří Company nodes (z authority a contractor)
     - vytvoří Contract/Tender nodes
     - vytvoří relationships (CONTRACTED_WITH, PUBLISHED_CONTRACT, WON_CONTRACT)
@@ -89,6 +208,18 @@ def step_3_transform_to_neo4j(ico=None):
     print("[KROK 3] ✓ Transformace dokončena")
 
 
+def step_3_transform_delta(extracted_paths, ico=None):
+    """
+    KROK 3 (denní režim): Transformace jen smluv z nově extrahovaných souborů.
+    """
+    print(f"[KROK 3] Transformuji deltu ({len(extracted_paths)} souborů) do Neo4j formátu...")
+    
+    transformer = Neo4jTransformer()
+    transformer.transform_delta([str(path) for path in extracted_paths], filter_ico=ico)
+    
+    print("[KROK 3] ✓ Transformace delty dokončena")
+
+
 def step_4_load_to_neo4j(clear_first=False):
     """
     KROK 4: Načtení dat do Neo4j databáze.
@@ -97,21 +228,27 @@ def step_4_load_to_neo4j(clear_first=False):
     - vytvoří constraints/indexy
     - načte nodes a relationships z transformovaných dat
     - použije MERGE pro inkrementální aktualizace
+
+    Returns:
+        True, pokud se data do Neo4j skutečně načetla
     """
     if not NEO4J_AVAILABLE:
         print("[KROK 4] ⚠ Neo4j není dostupný (modul neo4j není nainstalován)")
         print("[KROK 4]   Pro načtení dat do Neo4j nainstalujte: pip install neo4j")
-        return
+        return False
     
     print("[KROK 4] Načítám data do Neo4j...")
     
     loader = Neo4jLoader()
-    loader.load_all(clear_first=clear_first)
+    if not loader.load_all(clear_first=clear_first):
+        print("[KROK 4] ✗ Data se do Neo4j nenačetla")
+        return False
     
     print("[KROK 4] ✓ Data načtena do Neo4j")
+    return True
 
 
-def run_for_authority_ico(ico, year=None, month=None, incremental=True, skip_download=False, skip_extract=False, skip_transform=False, skip_load=False, clear_neo4j=False):
+def run_for_authority_ico(ico, year=None, month=None, incremental=True, skip_download=False, skip_extract=False, skip_transform=False, skip_load=False, clear_neo4j=False, workers=1, stream_extract=False):
     """
     Spustí kompletní pipeline pro vybraného zadavatele (IČO):
     
@@ -121,7 +258,7 @@ def run_for_authority_ico(ico, year=None, month=None, incremental=True, skip_dow
     4. Load: Načte data do Neo4j databáze
     
     Args:
-        ico: IČO zadavatele (pro filtrování)
+        ico: IČO zadavatele (pro filtrování), případně seznam IČO
         year: Rok dumpu (volitelné)
         month: Měsíc dumpu (volitelné)
         incremental: Použít inkrementální režim (přeskočit existující soubory)
@@ -130,30 +267,41 @@ def run_for_authority_ico(ico, year=None, month=None, incremental=True, skip_dow
         skip_transform: Přeskočit transform (použít existující transformace)
         skip_load: Přeskočit load do Neo4j
         clear_neo4j: Vymazat Neo4j databázi před načtením
+        workers: Počet procesů pro paralelní extrakci dumpu
+        stream_extract: Extrahovat smlouvy už během stahování dumpu
     """
     print(f"═══════════════════════════════════════════════════════════")
-    print(f"Spouštím pipeline pro zadavatele s IČO: {ico}")
+    if isinstance(ico, (list, tuple, set)):
+        print(f"Spouštím pipeline pro {len(ico)} zadavatelů/dodavatelů podle IČO")
+    else:
+        print(f"Spouštím pipeline pro zadavatele s IČO: {ico}")
     if year and month:
         print(f"Pro období: {year}-{month:02d}")
     print(f"═══════════════════════════════════════════════════════════\n")
     
-    # KROK 1: Download
-    if not skip_download:
-        dump_path = step_1_download_dump(year=year, month=month)
-    else:
-        # Najít nejnovější dump
-        dump_files = sorted(RAW_DIR.glob("dump_*.xml"), reverse=True)
-        if not dump_files:
-            print("❌ Chyba: Nenalezen žádný dump. Spusťte bez --skip-download.")
-            return
-        dump_path = dump_files[0]
-        print(f"[KROK 1] ⏭ Přeskakuji download, používám: {dump_path.name}")
-    
-    # KROK 2: Extract
-    if not skip_extract:
-        extracted_path = step_2_extract_contracts(dump_path, ico=ico, incremental=incremental)
+    if stream_extract and not skip_download and not skip_extract:
+        # KROK 1+2: Download a extract současně
+        dump_path, extracted_path = step_1_2_download_and_extract(
+            year=year, month=month, ico=ico, incremental=incremental
+        )
     else:
-        print("[KROK 2] ⏭ Přeskakuji extract")
+        # KROK 1: Download
+        if not skip_download:
+            dump_path = step_1_download_dump(year=year, month=month)
+        else:
+            # Najít nejnovější dump
+            dump_files = sorted(glob_dumps(RAW_DIR), reverse=True)
+            if not dump_files:
+                print("❌ Chyba: Nenalezen žádný dump. Spusťte bez --skip-download.")
+                return
+            dump_path = dump_files[0]
+            print(f"[KROK 1] ⏭ Přeskakuji download, používám: {dump_path.name}")
+        
+        # KROK 2: Extract
+        if not skip_extract:
+            extracted_path = step_2_extract_contracts(dump_path, ico=ico, incremental=incremental, workers=workers)
+        else:
+            print("[KROK 2] ⏭ Přeskakuji extract")
     
     # KROK 3: Transform
     if not skip_transform:
@@ -173,6 +321,72 @@ def run_for_authority_ico(ico, year=None, month=None, incremental=True, skip_dow
 
 
 
+def run_daily_incremental(ico=None, incremental=True, skip_load=False, workers=1):
+    """
+    Denní inkrementální režim: stáhne a zpracuje jen denní dumpy, které ještě
+    nebyly aplikovány, a do Neo4j je načte jako deltu.
+    
+    Aplikované denní dumpy se evidují v metadatech (applied_daily_dumps). Při prvním
+    spuštění se začíná dny po posledním dokončeném měsíčním dumpu.
+    
+    Args:
+        ico: Volitelné IČO (nebo seznam IČO) pro filtrování smluv
+        incremental: Použít inkrementální režim extrakce
+        skip_load: Přeskočit load do Neo4j (denní dumpy se pak neoznačí jako aplikované)
+        workers: Počet procesů pro paralelní extrakci dumpu
+    """
+    print(f"═══════════════════════════════════════════════════════════")
+    print(f"Spouštím denní inkrementální pipeline")
+    print(f"═══════════════════════════════════════════════════════════\n")
+    
+    # KROK 1: Download (jen nové dny)
+    print("[KROK 1] Načítám index dumpů...")
+    dump_index = load_dump_index()
+    applied = set(get_applied_daily_dumps())
+    
+    if applied:
+        last = max(applied).replace("dump_", "").split("_")
+        after = tuple(int(part) for part in last[:3])
+    else:
+        latest = select_latest_finished_dump(dump_index)
+        after = (latest["rok"], latest["mesic"], 31)
+    
+    new_dumps = [
+        d for d in select_daily_dumps_after(dump_index, after)
+        if Path(d["url"].split("/")[-1]).stem not in applied
+    ]
+    if not new_dumps:
+        print("[KROK 1] ✓ Žádné nové denní dumpy, vše je aktuální")
+        return
+    
+    print(f"[KROK 1] Nové denní dumpy: {len(new_dumps)}")
+    dump_paths = []
+    for dump in new_dumps:
+        dump_paths.append(download_selected_dump(dump))
+    print(f"[KROK 1] ✓ Staženo {len(dump_paths)} denních dumpů")
+    
+    # KROK 2: Extract (každý den zvlášť, ingest do úložiště posledních verzí)
+    extracted_paths = []
+    for dump_path in dump_paths:
+        result = step_2_extract_contracts(dump_path, ico=ico, incremental=incremental, workers=workers)
+        extracted_paths.extend(result if isinstance(result, list) else [result])
+    
+    # KROK 3: Transform delty
+    step_3_transform_delta(extracted_paths, ico=ico)
+    
+    # KROK 4: Load delty
+    if skip_load:
+        print("[KROK 4] ⏭ Přeskakuji load do Neo4j (denní dumpy nebudou označeny jako aplikované)")
+    elif step_4_load_to_neo4j():
+        mark_daily_dumps_applied(dump_stem(path) for path in dump_paths)
+    else:
+        print("[KROK 4] ⚠ Denní dumpy nebudou označeny jako aplikované (load neproběhl)")
+    
+    print("\n" + "="*55)
+    print(f"✓ Denní pipeline dokončena ({len(dump_paths)} dnů)")
+    print("="*55)
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Datová pipeline pro sběr a obohacování dat o veřejných zakázkách.",
@@ -191,13 +405,33 @@ Příklady použití:
 
   # Vymazat Neo4j před načtením
   python3 scripts/run_pipeline.py --ico 70886288 --clear-neo4j
+
+  # Více IČO najednou (dump se projde jen jednou)
+  python3 scripts/run_pipeline.py --ico-file ica.txt --year 2025 --month 11
+
+  # Paralelní extrakce dumpu ve 4 procesech
+  python3 scripts/run_pipeline.py --ico 70886288 --workers 4
+
+  # Stažení a extrakce nového měsíce současně
+  python3 scripts/run_pipeline.py --ico 70886288 --year 2025 --month 11 --stream-extract
+
+  # Denní inkrementální režim (jen nové denní dumpy jako delta)
+  python3 scripts/run_pipeline.py --daily
+  python3 scripts/run_pipeline.py --daily --ico 70886288
         """
     )
 
     parser.add_argument(
         "--ico",
         type=str,
-        help="IČO zadavatele/dodavatele pro filtrování smluv.",
+        action="append",
+        help="IČO zadavatele/dodavatele pro filtrování smluv (lze zadat vícekrát).",
+    )
+
+    parser.add_argument(
+        "--ico-file",
+        type=str,
+        help="Soubor se seznamem IČO (jedno na řádek); dump se projde jen jednou pro všechna IČO.",
     )
 
     parser.add_argument(
@@ -248,6 +482,25 @@ Příklady použití:
         help="Vymazat Neo4j databázi před načtením (POZOR: smaže všechna data!)."
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Počet procesů pro paralelní extrakci dumpu (výchozí: 1).",
+    )
+
+    parser.add_argument(
+        "--stream-extract",
+        action="store_true",
+        help="Extrahovat smlouvy už během stahování dumpu (parser čte stahovaná data průběžně).",
+    )
+
+    parser.add_argument(
+        "--daily",
+        action="store_true",
+        help="Denní inkrementální režim: zpracovat jen dosud neaplikované denní dumpy jako deltu.",
+    )
+
     return parser.parse_args()
 
 
@@ -260,9 +513,20 @@ def main() -> None:
         print("❌ Chyba: Prosím zadej buď oba parametry --year a --month, nebo žádný.")
         return
 
-    if args.ico:
+    icos = list(args.ico or [])
+    if args.ico_file:
+        icos.extend(load_ico_file(Path(args.ico_file)))
+
+    if args.daily:
+        run_daily_incremental(
+            ico=(icos[0] if len(icos) == 1 else icos) or None,
+            incremental=not args.no_incremental,
+            skip_load=args.skip_load,
+            workers=args.workers
+        )
+    elif icos:
         run_for_authority_ico(
-            args.ico,
+            icos[0] if len(icos) == 1 else icos,
             year=args.year,
             month=args.month,
             incremental=not args.no_incremental,
@@ -270,7 +534,9 @@ def main() -> None:
             skip_extract=args.skip_extract,
             skip_transform=args.skip_transform,
             skip_load=args.skip_load,
-            clear_neo4j=args.clear_neo4j
+            clear_neo4j=args.clear_neo4j,
+            workers=args.workers,
+            stream_extract=args.stream_extract
         )
     else:
         print("❌ Nebyl zadán parametr --ico")
@@ -0,0 +1,774 @@
+"""
+smlouvy_dump.py
+
+Nízkoúrovňový přístup k surovým XML dumpům z Registru smluv (smlouvy.gov.cz).
+
+Funkce:
+- mapuje dump do paměti (mmap), takže se nic nenačítá celé do RAM
+- hledá bajtové hranice záznamů <zaznam>...</zaznam>
+- rozděluje dump na shardy (úseky) pro paralelní zpracování
+- předfiltruje záznamy podle hodnot <ico> přímo nad bajty (bez XML parsování)
+- udržuje perzistentní index IČO -> bajtové offsety záznamů (sidecar soubor u dumpu)
+- udržuje Bloom filtr IČO pro každý dump (sidecar soubor u dumpu, rychlé vyřazení
+  dumpů bez hledaného IČO);
+  filtr i hash dumpu lze počítat z bajtů, které právě čte parser (DumpScan)
+- ukládá dumpy komprimované (gzip, volitelně zstd) a čte je s průběžnou dekompresí
+
+Bajtové operace nad mmap (shardy, předfiltr, index IČO) fungují jen nad
+nekomprimovanými dumpy; komprimované dumpy se čtou streamovaně.
+
+Předpokládá se, že dumpy používají výchozí namespace deklarovaný na kořenovém
+elementu (tak jak je publikuje smlouvy.gov.cz), tj. záznamy jsou v souboru
+zapsány jako <zaznam> bez prefixu.
+"""
+
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import argparse
+import base64
+import gzip
+import hashlib
+import html
+import json
+import math
+import mmap
+import re
+import shutil
+
+try:
+    import zstandard
+except ImportError:  # volitelná závislost (pip install zstandard)
+    zstandard = None
+
+ZAZNAM_OPEN = b"<zaznam"
+ZAZNAM_CLOSE = b"</zaznam>"
+
+# Hodnota elementu <ico> (i s případnou CDATA sekcí uvnitř)
+ICO_VALUE_RE = re.compile(rb"<ico>(.*?)</ico>", re.S)
+
+# Znaky, které mohou následovat za názvem elementu v otevírací značce
+_TAG_NAME_END = (b">", b" ", b"\t", b"\r", b"\n")
+
+# Verze formátu indexu IČO -> offsety (při změně se indexy přestaví)
+ICO_INDEX_VERSION = 1
+ICO_INDEX_SUFFIX = ".idx.json.gz"
+
+# Bloom filtr IČO se ukládá vedle dumpu (jako index IČO)
+ICO_BLOOM_SUFFIX = ".bloom.json"
+
+# Cílová pravděpodobnost falešně pozitivní odpovědi Bloom filtru
+BLOOM_FALSE_POSITIVE_RATE = 0.001
+
+# Uložené varianty dumpu (v pořadí preference) a přípony kompresí
+DUMP_SUFFIXES = (".xml", ".xml.gz", ".xml.zst")
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Velikost bloku při (de)kompresi a streamovaném čtení
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def normalize_ico(ico: Optional[str]) -> Optional[str]:
+    """
+    Normalizuje IČO - odstraní mezery a převede na string.
+
+    IČO může být v různých formátech:
+    - "70886288"
+    - "604 69 803" (s mezerami)
+    - "28.05.1955" (někdy je to datum narození místo IČO)
+    """
+    if not ico:
+        return None
+
+    # Odstranit mezery
+    ico_clean = str(ico).replace(" ", "").replace(".", "")
+
+    # Pokud vypadá jako datum (obsahuje tečky a je delší), vrátit None
+    if "." in str(ico) and len(str(ico)) > 10:
+        return None
+
+    return ico_clean if ico_clean else None
+
+
+def decode_ico_value(raw: bytes) -> str:
+    """
+    Dekóduje surovou hodnotu elementu <ico> na text, jak by ho vrátil XML parser
+    (rozbalí CDATA sekce a nahradí entity).
+    """
+    text = raw.decode("utf-8", errors="replace")
+    if "<![CDATA[" in text:
+        text = re.sub(r"<!\[CDATA\[(.*?)\]\]>", lambda m: m.group(1).replace("&", "&amp;"), text, flags=re.S)
+    if "&" in text:
+        text = html.unescape(text)
+    return text
+
+
+def is_compressed(dump_path: Path) -> bool:
+    """Zda je dump uložen komprimovaně (.gz / .zst)."""
+    return Path(dump_path).suffix in (".gz", ".zst")
+
+
+def dump_stem(dump_path: Path) -> str:
+    """Název dumpu bez přípon .xml/.gz/.zst (např. "dump_2025_11_01")."""
+    name = Path(dump_path).name
+    for suffix in (".gz", ".zst"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name[:-len(".xml")] if name.endswith(".xml") else Path(name).stem
+
+
+def parse_year_month(value: str) -> Tuple[int, int]:
+    """Převede "YYYY-MM" na dvojici (rok, měsíc)."""
+    try:
+        year, month = (int(part) for part in value.split("-"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Očekáván formát YYYY-MM, zadáno: {value}")
+    if not (1 <= month <= 12):
+        raise argparse.ArgumentTypeError(f"Měsíc musí být v rozsahu 1-12, zadáno: {value}")
+    return year, month
+
+
+def iter_months(start: Tuple[int, int], end: Tuple[int, int]) -> Iterator[Tuple[int, int]]:
+    """Vrací měsíce (rok, měsíc) od start do end včetně."""
+    year, month = start
+    while (year, month) <= end:
+        yield year, month
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def glob_dumps(directory: Path, pattern: str = "dump_*") -> List[Path]:
+    """
+    Najde dumpy podle vzoru názvu bez přípony - nekomprimované i komprimované.
+
+    Pokud je stejný dump uložen ve více variantách (např. během komprese),
+    vrátí se jen první podle pořadí DUMP_SUFFIXES. Výsledek je seřazený podle názvu.
+    """
+    found: Dict[str, Path] = {}
+    for suffix in DUMP_SUFFIXES:
+        for path in Path(directory).glob(pattern + suffix):
+            found.setdefault(dump_stem(path), path)
+    return sorted(found.values())
+
+
+def find_stored_dump(directory: Path, stem: str) -> Optional[Path]:
+    """Vrátí uložený dump s daným názvem (v libovolné variantě), nebo None."""
+    for suffix in DUMP_SUFFIXES:
+        path = Path(directory) / f"{stem}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise ImportError("Pro dumpy komprimované zstd nainstalujte: pip install zstandard")
+
+
+def open_dump(dump_path: Path, scan: Optional["DumpScan"] = None) -> BinaryIO:
+    """
+    Otevře dump pro čtení jako binární proud; komprimované dumpy průběžně dekomprimuje.
+
+    Vrácený objekt je context manager (lze použít ve with). Se zadaným scan se
+    přečtené bajty zároveň předávají do DumpScan (hash a IČO pro Bloom filtr).
+    """
+    dump_path = Path(dump_path)
+    if dump_path.suffix == ".gz":
+        f = gzip.open(dump_path, "rb")
+    elif dump_path.suffix == ".zst":
+        _require_zstandard()
+        f = zstandard.ZstdDecompressor().stream_reader(open(dump_path, "rb"), closefd=True)
+    else:
+        f = open(dump_path, "rb")
+    return _ScanReader(f, scan) if scan is not None else f
+
+
+def compress_dump(dump_path: Path, method: str = "gzip") -> Path:
+    """
+    Zkomprimuje nekomprimovaný dump (gzip nebo zstd) a původní soubor smaže.
+
+    Bloom filtr dumpu se přenese na komprimovaný soubor; index IČO (bajtové
+    offsety do nekomprimovaného souboru) se smaže, protože už neplatí.
+
+    Returns:
+        Cesta ke komprimovanému dumpu
+    """
+    dump_path = Path(dump_path)
+    if method not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Neznámá komprese: {method} (podporováno: {', '.join(COMPRESSION_SUFFIXES)})")
+
+    target_path = dump_path.with_name(dump_path.name + COMPRESSION_SUFFIXES[method])
+    tmp_path = target_path.with_name(target_path.name + ".tmp")
+
+    with open(dump_path, "rb") as src:
+        if method == "gzip":
+            dst = gzip.open(tmp_path, "wb", compresslevel=6)
+        else:
+            _require_zstandard()
+            dst = zstandard.ZstdCompressor(level=10).stream_writer(open(tmp_path, "wb"))
+        with dst:
+            shutil.copyfileobj(src, dst, STREAM_CHUNK_SIZE)
+    tmp_path.replace(target_path)
+
+    bloom = load_ico_bloom(dump_path)
+    if bloom is not None:
+        save_ico_bloom(target_path, bloom)
+    ico_bloom_path(dump_path).unlink(missing_ok=True)
+    ico_index_path(dump_path).unlink(missing_ok=True)
+    dump_path.unlink()
+
+    print(f"[smlouvy_dump] Dump zkomprimován ({method}): {target_path.name} "
+          f"({target_path.stat().st_size} B)")
+    return target_path
+
+
+@contextmanager
+def open_dump_mmap(dump_path: Path) -> Iterator[bytes]:
+    """
+    Otevře dump jako read-only mmap.
+
+    Prázdný soubor nelze namapovat, proto se pro něj vrací prázdné bytes.
+    Komprimovaný dump namapovat nelze (vyhodí ValueError).
+    """
+    if is_compressed(dump_path):
+        raise ValueError(f"Komprimovaný dump {Path(dump_path).name} nelze číst přes mmap")
+
+    with open(dump_path, "rb") as f:
+        if Path(dump_path).stat().st_size == 0:
+            yield b""
+            return
+
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield buf
+        finally:
+            buf.close()
+
+
+def find_record_start(buf: bytes, pos: int, end: Optional[int] = None) -> int:
+    """
+    Najde začátek dalšího záznamu <zaznam> od pozice pos.
+
+    Returns:
+        Bajtový offset otevírací značky nebo -1, pokud už žádný záznam není
+    """
+    if end is None:
+        end = len(buf)
+
+    while True:
+        pos = buf.find(ZAZNAM_OPEN, pos, end)
+        if pos == -1:
+            return -1
+
+        # Vyloučit elementy, jejichž název jen začíná na "zaznam"
+        # (např. <zaznamy>)
+        next_char = buf[pos + len(ZAZNAM_OPEN):pos + len(ZAZNAM_OPEN) + 1]
+        if next_char in _TAG_NAME_END:
+            return pos
+        pos += len(ZAZNAM_OPEN)
+
+
+def find_record_start_before(buf: bytes, pos: int) -> int:
+    """
+    Najde začátek posledního záznamu <zaznam>, který začíná před pozicí pos.
+
+    Returns:
+        Bajtový offset otevírací značky nebo -1
+    """
+    while pos > 0:
+        pos = buf.rfind(ZAZNAM_OPEN, 0, pos)
+        if pos == -1:
+            return -1
+
+        next_char = buf[pos + len(ZAZNAM_OPEN):pos + len(ZAZNAM_OPEN) + 1]
+        if next_char in _TAG_NAME_END:
+            return pos
+
+    return -1
+
+
+def iter_record_spans(
+    buf: bytes,
+    start: int = 0,
+    end: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """
+    Vrací bajtové rozsahy (začátek, konec) všech záznamů <zaznam>,
+    které začínají v intervalu [start, end).
+
+    Konec rozsahu ukazuje za uzavírací značku </zaznam>, takže
+    buf[začátek:konec] je kompletní XML element.
+    """
+    if end is None:
+        end = len(buf)
+
+    pos = start
+    while pos < end:
+        record_start = find_record_start(buf, pos, end)
+        if record_start == -1:
+            return
+
+        close = buf.find(ZAZNAM_CLOSE, record_start)
+        if close == -1:
+            raise ValueError(f"Neuzavřený záznam <zaznam> na offsetu {record_start}")
+
+        record_end = close + len(ZAZNAM_CLOSE)
+        yield record_start, record_end
+        pos = record_end
+
+
+def split_into_shards(buf: bytes, shard_count: int) -> List[Tuple[int, int]]:
+    """
+    Rozdělí dump na přibližně stejně velké úseky zarovnané na začátky záznamů.
+
+    Každý úsek (začátek, konec) začíná přesně na otevírací značce <zaznam>
+    a končí na začátku prvního záznamu dalšího úseku (poslední končí na konci
+    souboru). Úseky se tedy nepřekrývají a dohromady pokrývají všechny
+    záznamy v původním pořadí.
+    """
+    size = len(buf)
+    first = find_record_start(buf, 0)
+    if first == -1:
+        return []
+
+    shard_count = max(1, shard_count)
+    boundaries = [first]
+
+    for i in range(1, shard_count):
+        target = max(first + (size - first) * i // shard_count, boundaries[-1] + 1)
+        boundary = find_record_start(buf, target)
+        if boundary == -1:
+            break
+        if boundary > boundaries[-1]:
+            boundaries.append(boundary)
+
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def iter_candidate_spans(
+    buf: bytes,
+    is_target: Callable[[bytes], bool],
+    start: int = 0,
+    end: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """
+    Vrací rozsahy záznamů, v nichž se vyskytuje hledaná hodnota <ico>.
+
+    Prochází jen hodnoty elementů <ico> (regulárním výrazem nad bajty) a pro
+    každou vyhovující najde obklopující záznam. Záznamy bez shody se vůbec
+    neparsují. Předfiltr je konzervativní - může propustit záznam navíc
+    (např. shoda v jiné smluvní straně), nikdy ale nevynechá záznam,
+    který by úplné parsování vybralo.
+
+    Args:
+        buf: Obsah dumpu (typicky mmap)
+        is_target: Predikát nad surovou hodnotou elementu <ico>
+        start: Začátek prohledávaného úseku (mělo by jít o začátek záznamu)
+        end: Konec prohledávaného úseku
+
+    Yields:
+        (začátek, konec) záznamu ve stejném pořadí jako v dumpu, bez duplicit
+    """
+    if end is None:
+        end = len(buf)
+
+    last_end = start
+    for match in ICO_VALUE_RE.finditer(buf, start, end):
+        # Záznam s touto hodnotou už byl vrácen
+        if match.start() < last_end:
+            continue
+
+        if not is_target(match.group(1)):
+            continue
+
+        record_start = find_record_start_before(buf, match.start())
+        if record_start == -1 or record_start < start:
+            continue
+
+        close = buf.find(ZAZNAM_CLOSE, record_start)
+        if close == -1 or close < match.start():
+            # <ico> mimo záznam (např. v hlavičce dumpu)
+            continue
+
+        last_end = close + len(ZAZNAM_CLOSE)
+        yield record_start, last_end
+
+
+def ico_index_path(dump_path: Path) -> Path:
+    """Cesta k sidecar indexu IČO pro daný dump (vedle dumpu)."""
+    dump_path = Path(dump_path)
+    return dump_path.with_name(dump_path.name + ICO_INDEX_SUFFIX)
+
+
+def build_ico_index(dump_path: Path) -> Dict[str, Any]:
+    """
+    Projde dump (jedním průchodem nad bajty) a sestaví index
+    normalizované IČO -> bajtové rozsahy záznamů <zaznam>, v nichž se vyskytuje
+    (jako zadavatel i jako smluvní strana). Index uloží vedle dumpu.
+
+    Returns:
+        Slovník indexu (viz load_ico_index)
+    """
+    dump_path = Path(dump_path)
+    stat = dump_path.stat()
+    icos: Dict[str, List[List[int]]] = {}
+    records = 0
+
+    print(f"[smlouvy_dump] Stavím index IČO pro {dump_path.name}...")
+
+    with open_dump_mmap(dump_path) as buf:
+        for record_start, record_end in iter_record_spans(buf):
+            records += 1
+            seen = set()
+            for match in ICO_VALUE_RE.finditer(buf, record_start, record_end):
+                ico = normalize_ico(decode_ico_value(match.group(1)))
+                if ico and ico not in seen:
+                    seen.add(ico)
+                    icos.setdefault(ico, []).append([record_start, record_end])
+
+    index = {
+        "version": ICO_INDEX_VERSION,
+        "dump": dump_path.name,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "records": records,
+        "icos": icos,
+    }
+
+    index_path = ico_index_path(dump_path)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    tmp_path.replace(index_path)
+
+    print(f"[smlouvy_dump] Index uložen: {index_path.name} ({records} záznamů, {len(icos)} IČO)")
+
+    # Bloom filtr je z indexu zadarmo
+    save_ico_bloom(dump_path, IcoBloomFilter.from_icos(icos.keys()))
+
+    return index
+
+
+def load_ico_index(dump_path: Path, build: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Načte index IČO pro dump. Pokud neexistuje nebo neodpovídá dumpu
+    (jiná velikost/čas změny/verze formátu), postaví ho znovu.
+
+    Args:
+        dump_path: Cesta k dumpu
+        build: Pokud False, chybějící nebo zastaralý index se nestaví a vrátí se None
+
+    Returns:
+        Slovník s klíči version, dump, size, mtime, records, icos
+        (icos: {IČO: [[začátek, konec], ...]}); pro komprimovaný dump None
+    """
+    dump_path = Path(dump_path)
+    if is_compressed(dump_path):
+        # Offsety záznamů mají smysl jen v nekomprimovaném souboru
+        return None
+
+    index_path = ico_index_path(dump_path)
+
+    if index_path.exists():
+        try:
+            with gzip.open(index_path, "rt", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+
+        stat = dump_path.stat()
+        if (index and index.get("version") == ICO_INDEX_VERSION
+                and index.get("size") == stat.st_size
+                and index.get("mtime") == stat.st_mtime):
+            return index
+
+        print(f"[smlouvy_dump] Index {index_path.name} je zastaralý")
+
+    if not build:
+        return None
+
+    return build_ico_index(dump_path)
+
+
+def lookup_ico_spans(index: Dict[str, Any], icos: Iterable[str]) -> List[Tuple[int, int]]:
+    """
+    Vrátí rozsahy záznamů pro daná (normalizovaná) IČO, seřazené podle pozice
+    v dumpu a bez duplicit (smlouva mezi dvěma hledanými IČO je jen jednou).
+    """
+    spans = set()
+    for ico in icos:
+        for record_start, record_end in index["icos"].get(ico, ()):
+            spans.add((record_start, record_end))
+    return sorted(spans)
+
+
+def iter_dump_icos(dump_path: Path) -> Iterator[str]:
+    """Vrací normalizovaná IČO všech výskytů elementu <ico> v dumpu (s opakováním)."""
+    if is_compressed(dump_path):
+        with open_dump(dump_path) as f:
+            values = iter_stream_ico_values(f)
+            yield from (ico for ico in (normalize_ico(decode_ico_value(v)) for v in values) if ico)
+        return
+
+    with open_dump_mmap(dump_path) as buf:
+        for match in ICO_VALUE_RE.finditer(buf):
+            ico = normalize_ico(decode_ico_value(match.group(1)))
+            if ico:
+                yield ico
+
+
+def iter_stream_ico_values(f: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Vrací surové hodnoty elementů <ico> z binárního proudu (po blocích).
+
+    Nedokončený element na konci bloku se přenese do dalšího bloku.
+    """
+    tail = b""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+
+        buf = tail + chunk
+        last_end = 0
+        for match in ICO_VALUE_RE.finditer(buf):
+            yield match.group(1)
+            last_end = match.end()
+        tail = _ico_scan_tail(buf, last_end)
+
+
+def _ico_scan_tail(buf: bytes, last_end: int) -> bytes:
+    """Konec bloku, který se musí přenést do dalšího bloku (nedokončený element <ico>)."""
+    cut = buf.find(b"<ico>", last_end)
+    # Bez otevřeného <ico> stačí ponechat konec, v němž může začínat další značka
+    return buf[cut:] if cut != -1 else buf[max(last_end, len(buf) - 4):]
+
+
+class DumpScan:
+    """
+    Průchod bajty dumpu pro jeho otisk a Bloom filtr: SHA-256 obsahu a (volitelně)
+    množina IČO ze všech elementů <ico>.
+
+    Bajty se předávají přes feed() v pořadí, v jakém je čte parser (viz open_dump),
+    takže se dump kvůli hashi ani Bloom filtru nemusí číst znovu. Příznak complete
+    říká, zda scan viděl celý dump až do konce.
+    """
+
+    def __init__(self, collect_icos: bool = True):
+        self.collect_icos = collect_icos
+        self._reset()
+
+    def _reset(self) -> None:
+        self.digest = hashlib.sha256()
+        self.complete = False
+        self._values: Set[bytes] = set()
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> None:
+        self.digest.update(chunk)
+        if not self.collect_icos:
+            return
+
+        buf = self._tail + chunk
+        values = ICO_VALUE_RE.findall(buf)
+        if values:
+            # Surové hodnoty se normalizují až na konci (každá jen jednou)
+            self._values.update(values)
+            last_end = buf.rfind(b"</ico>") + len(b"</ico>")
+        else:
+            last_end = 0
+        self._tail = _ico_scan_tail(buf, last_end)
+
+    @property
+    def icos(self) -> Set[str]:
+        """Normalizovaná IČO ze všech dosud předaných bajtů."""
+        return {ico for ico in (normalize_ico(decode_ico_value(v)) for v in self._values) if ico}
+
+    def scan_file(self, dump_path: Path) -> None:
+        """Projde celý dump znovu od začátku (když ho parser nečetl sekvenčně)."""
+        self._reset()
+        with open_dump(dump_path) as f:
+            for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+                self.feed(chunk)
+        self.complete = True
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+    def bloom(self) -> "IcoBloomFilter":
+        return IcoBloomFilter.from_icos(self.icos)
+
+
+class _ScanReader:
+    """Binární proud, který přečtené bajty předává do DumpScan."""
+
+    def __init__(self, f: BinaryIO, scan: DumpScan):
+        self._f = f
+        self._scan = scan
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        if data:
+            self._scan.feed(data)
+        elif size != 0:
+            self._scan.complete = True
+        return data
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "_ScanReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class IcoBloomFilter:
+    """
+    Kompaktní Bloom filtr nad množinou IČO jednoho dumpu.
+
+    Odpověď "není v dumpu" je vždy správná, odpověď "může být v dumpu"
+    je s malou pravděpodobností falešně pozitivní.
+    """
+
+    def __init__(self, bit_count: int, hash_count: int, bits: Optional[bytearray] = None, count: int = 0):
+        self.bit_count = max(8, bit_count)
+        self.hash_count = max(1, hash_count)
+        self.bits = bits if bits is not None else bytearray((self.bit_count + 7) // 8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float = BLOOM_FALSE_POSITIVE_RATE) -> "IcoBloomFilter":
+        """Vytvoří prázdný filtr dimenzovaný na daný počet IČO."""
+        capacity = max(1, capacity)
+        bit_count = math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))
+        hash_count = round(bit_count / capacity * math.log(2))
+        return cls(bit_count, hash_count)
+
+    @classmethod
+    def from_icos(cls, icos: Iterable[str]) -> "IcoBloomFilter":
+        """Vytvoří filtr obsahující daná IČO."""
+        icos = set(icos)
+        bloom = cls.for_capacity(len(icos))
+        for ico in icos:
+            bloom.add(ico)
+        return bloom
+
+    def _positions(self, ico: str) -> Iterator[int]:
+        # Double hashing ze dvou 64bitových polovin jednoho digestu
+        digest = hashlib.blake2b(ico.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, ico: str) -> None:
+        for pos in self._positions(ico):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, ico: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(ico))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bit_count": self.bit_count,
+            "hash_count": self.hash_count,
+            "count": self.count,
+            "bits": base64.b64encode(bytes(self.bits)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IcoBloomFilter":
+        return cls(
+            data["bit_count"],
+            data["hash_count"],
+            bytearray(base64.b64decode(data["bits"])),
+            data.get("count", 0),
+        )
+
+
+def ico_bloom_path(dump_path: Path) -> Path:
+    """Cesta k sidecar Bloom filtru IČO pro daný dump (vedle dumpu)."""
+    dump_path = Path(dump_path)
+    return dump_path.with_name(dump_path.name + ICO_BLOOM_SUFFIX)
+
+
+def save_ico_bloom(dump_path: Path, bloom: IcoBloomFilter) -> Path:
+    """Uloží Bloom filtr dumpu spolu s velikostí a časem změny dumpu."""
+    dump_path = Path(dump_path)
+    stat = dump_path.stat()
+
+    data = {
+        "dump": dump_path.name,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        **bloom.to_dict(),
+    }
+
+    bloom_path = ico_bloom_path(dump_path)
+    with open(bloom_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    return bloom_path
+
+
+def build_ico_bloom(dump_path: Path) -> IcoBloomFilter:
+    """
+    Sestaví a uloží Bloom filtr IČO dumpu jedním průchodem nad bajty.
+
+    Pokud už pro dump existuje aktuální index IČO, použije se jeho seznam IČO.
+    """
+    index = load_ico_index(dump_path, build=False) if ico_index_path(dump_path).exists() else None
+    if index is not None:
+        icos = index["icos"].keys()
+    else:
+        icos = set(iter_dump_icos(dump_path))
+
+    bloom = IcoBloomFilter.from_icos(icos)
+    save_ico_bloom(dump_path, bloom)
+    print(f"[smlouvy_dump] Bloom filtr uložen pro {Path(dump_path).name} ({bloom.count} IČO)")
+    return bloom
+
+
+def load_ico_bloom(dump_path: Path) -> Optional[IcoBloomFilter]:
+    """
+    Načte Bloom filtr dumpu. Vrací None, pokud filtr chybí nebo neodpovídá
+    aktuálnímu souboru dumpu (jiná velikost nebo čas změny).
+    """
+    dump_path = Path(dump_path)
+    bloom_path = ico_bloom_path(dump_path)
+    if not bloom_path.exists():
+        return None
+
+    try:
+        with open(bloom_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if dump_path.exists():
+        stat = dump_path.stat()
+        if data.get("size") != stat.st_size or data.get("mtime") != stat.st_mtime:
+            return None
+
+    return IcoBloomFilter.from_dict(data)
+
+
+def ensure_ico_bloom(dump_path: Path) -> IcoBloomFilter:
+    """Vrátí aktuální Bloom filtr dumpu, případně ho nejdřív postaví."""
+    return load_ico_bloom(dump_path) or build_ico_bloom(dump_path)
+
+
+def dump_may_contain(dump_path: Path, icos: Iterable[str]) -> bool:
+    """
+    Zjistí z Bloom filtru, zda dump může obsahovat některé z daných
+    (normalizovaných) IČO. Bez filtru vrací True - dump je nutné projít.
+    """
+    bloom = load_ico_bloom(dump_path)
+    if bloom is None:
+        return True
+    return any(ico in bloom for ico in icos)
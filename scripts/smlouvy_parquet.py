@@ -0,0 +1,473 @@
+"""
+smlouvy_parquet.py
+
+Sloupcový Parquet dataset smluv z Registru smluv (volitelný výstup extrakce).
+
+Funkce:
+- zplošťuje smlouvy (authority_* / contractor_* sloupce), přílohy ukládá do samostatné tabulky
+- zapisuje dataset rozdělený podle roku a měsíce zveřejnění (year=YYYY/month=M)
+- čte jen potřebné sloupce a partitions s filtrem na IČO a datum (predicate pushdown)
+- pro transformaci vrací poslední verze smluv jako záznamy Contract
+
+Vyžaduje pyarrow (pip install pyarrow).
+"""
+
+from pathlib import Path
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import argparse
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.smlouvy_records import Contract, version_number
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # volitelná závislost (pip install pyarrow)
+    pa = None
+    ds = None
+
+BASE_DIR = Path(__file__).parent.parent
+PARQUET_DIR = BASE_DIR / "data" / "tenders" / "parquet" / "smlouvy_gov"
+CONTRACTS_TABLE = "contracts"
+ATTACHMENTS_TABLE = "attachments"
+
+# Počet smluv zapsaných najednou (jedna dávka = jeden soubor v každé partition)
+PARQUET_BATCH_SIZE = 50_000
+
+PARTY_FIELDS = ("ico", "name", "address", "datova_schranka", "utvar")
+
+# Sloupce tabulky smluv (bez partition sloupců year/month)
+CONTRACT_COLUMNS: List[Tuple[str, str]] = [
+    ("contract_id", "string"),
+    ("version_id", "string"),
+    ("version_num", "int64"),
+    ("url", "string"),
+    ("published_date", "string"),
+    ("contract_date", "string"),
+    *[(f"authority_{field}", "string") for field in PARTY_FIELDS],
+    *[(f"contractor_{field}", "string") for field in PARTY_FIELDS],
+    ("subject", "string"),
+    ("contract_number", "string"),
+    ("approved_by", "string"),
+    ("value_with_vat", "float64"),
+    ("value_without_vat", "float64"),
+    ("attachment_count", "int32"),
+    ("source", "string"),
+    ("source_file", "string"),
+]
+
+ATTACHMENT_COLUMNS: List[Tuple[str, str]] = [
+    ("contract_id", "string"),
+    ("version_id", "string"),
+    ("position", "int32"),
+    ("filename", "string"),
+    ("hash", "string"),
+    ("url", "string"),
+    ("source_file", "string"),
+]
+
+PARTITION_COLUMNS: List[Tuple[str, str]] = [
+    ("year", "int16"),
+    ("month", "int8"),
+]
+
+# Sloupce, podle kterých se vybírá poslední verze smlouvy
+VERSION_COLUMNS = ("contract_id", "version_num", "published_date")
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Pro Parquet výstup nainstalujte: pip install pyarrow")
+
+
+def _schema(columns: Sequence[Tuple[str, str]]) -> "pa.Schema":
+    return pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in columns])
+
+
+def _partitioning() -> "ds.Partitioning":
+    return ds.partitioning(_schema(PARTITION_COLUMNS), flavor="hive")
+
+
+def partition_of(contract: Contract) -> Tuple[int, int]:
+    """
+    Rok a měsíc zveřejnění smlouvy (záložně datum uzavření).
+
+    Smlouvy bez použitelného data spadnou do partition year=0/month=0.
+    """
+    for value in (contract.published_date, contract.contract_date):
+        if value and len(value) >= 7:
+            try:
+                return int(value[:4]), int(value[5:7])
+            except ValueError:
+                continue
+    return 0, 0
+
+
+def flatten_contract(
+    contract: Contract,
+    source_file: str = ""
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Převede smlouvu na řádek tabulky smluv a řádky tabulky příloh.
+
+    Returns:
+        (řádek smlouvy, seznam řádků příloh)
+    """
+    year, month = partition_of(contract)
+
+    row = {
+        "contract_id": contract.contract_id,
+        "version_id": contract.version_id,
+        "version_num": version_number(contract.version_id),
+        "url": contract.url,
+        "published_date": contract.published_date,
+        "contract_date": contract.contract_date,
+        "subject": contract.subject,
+        "contract_number": contract.contract_number,
+        "approved_by": contract.approved_by,
+        "value_with_vat": contract.value_with_vat,
+        "value_without_vat": contract.value_without_vat,
+        "attachment_count": len(contract.attachments),
+        "source": contract.source,
+        "source_file": source_file,
+        "year": year,
+        "month": month,
+    }
+    for field in PARTY_FIELDS:
+        row[f"authority_{field}"] = getattr(contract.authority, field) if contract.authority else None
+        row[f"contractor_{field}"] = getattr(contract.contractor, field) if contract.contractor else None
+
+    attachment_rows = [
+        {
+            "contract_id": row["contract_id"],
+            "version_id": row["version_id"],
+            "position": position,
+            "filename": attachment.filename,
+            "hash": attachment.hash,
+            "url": attachment.url,
+            "source_file": source_file,
+            "year": year,
+            "month": month,
+        }
+        for position, attachment in enumerate(contract.attachments)
+    ]
+
+    return row, attachment_rows
+
+
+def unflatten_contract(row: Dict[str, Any]) -> Contract:
+    """
+    Složí řádek tabulky smluv zpět do záznamu Contract.
+
+    Nenačtené sloupce mají výchozí hodnoty záznamu, sloupce navíc (version_num,
+    source_file, partitions) se ignorují.
+    """
+    contract: Dict[str, Any] = {}
+    authority: Dict[str, Any] = {}
+    contractor: Dict[str, Any] = {}
+
+    for column, value in row.items():
+        if column.startswith("authority_"):
+            authority[column[len("authority_"):]] = value
+        elif column.startswith("contractor_"):
+            contractor[column[len("contractor_"):]] = value
+        else:
+            contract[column] = value
+
+    if authority:
+        contract["authority"] = authority
+    if contractor:
+        contract["contractor"] = contractor
+    return Contract.from_dict(contract)
+
+
+def _remove_source_parts(table_dir: Path, source_name: str) -> None:
+    """Smaže soubory dříve zapsané z téhož extrahovaného souboru (přepis při opakovaném exportu)."""
+    if table_dir.exists():
+        for part in table_dir.glob(f"year=*/month=*/{source_name}-*.parquet"):
+            part.unlink()
+
+
+def _write_table(rows: List[Dict[str, Any]], columns, table_dir: Path, basename: str) -> None:
+    table = pa.Table.from_pylist(rows, schema=_schema(list(columns) + PARTITION_COLUMNS))
+    ds.write_dataset(
+        table,
+        str(table_dir),
+        format="parquet",
+        partitioning=_partitioning(),
+        basename_template=f"{basename}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def write_parquet_dataset(
+    contracts: Iterable[Contract],
+    source_name: str,
+    output_dir: Path = PARQUET_DIR,
+    batch_size: int = PARQUET_BATCH_SIZE
+) -> Tuple[int, int]:
+    """
+    Zapíše smlouvy do Parquet datasetu (tabulky contracts a attachments).
+
+    Smlouvy se zapisují po dávkách, celý soubor se nedrží v paměti. Soubory
+    nesou v názvu source_name, takže opakovaný export téhož extrahovaného
+    souboru nahradí jeho předchozí data a ostatní soubory nechá beze změny.
+
+    Args:
+        contracts: Smlouvy (např. z iter_extracted_contracts)
+        source_name: Název zdrojového souboru bez přípony (např. "contracts_dump_2025_11_01")
+        output_dir: Kořen datasetu
+        batch_size: Počet smluv v jedné dávce
+
+    Returns:
+        (počet smluv, počet příloh)
+    """
+    _require_pyarrow()
+
+    contracts_dir = output_dir / CONTRACTS_TABLE
+    attachments_dir = output_dir / ATTACHMENTS_TABLE
+    _remove_source_parts(contracts_dir, source_name)
+    _remove_source_parts(attachments_dir, source_name)
+
+    contract_rows: List[Dict[str, Any]] = []
+    attachment_rows: List[Dict[str, Any]] = []
+    total_contracts = 0
+    total_attachments = 0
+    batch_no = 0
+
+    def flush() -> None:
+        nonlocal batch_no
+        if contract_rows:
+            _write_table(contract_rows, CONTRACT_COLUMNS, contracts_dir, f"{source_name}-{batch_no}")
+        if attachment_rows:
+            _write_table(attachment_rows, ATTACHMENT_COLUMNS, attachments_dir, f"{source_name}-{batch_no}")
+        contract_rows.clear()
+        attachment_rows.clear()
+        batch_no += 1
+
+    for contract in contracts:
+        row, attachments = flatten_contract(contract, source_name)
+        contract_rows.append(row)
+        attachment_rows.extend(attachments)
+        total_contracts += 1
+        total_attachments += len(attachments)
+        if len(contract_rows) >= batch_size:
+            flush()
+    flush()
+
+    print(f"[parquet] {source_name}: {total_contracts} smluv, {total_attachments} příloh -> {output_dir}")
+    return total_contracts, total_attachments
+
+
+def open_table(table: str = CONTRACTS_TABLE, output_dir: Path = PARQUET_DIR) -> "ds.Dataset":
+    """Otevře tabulku datasetu (contracts nebo attachments) s partitions year/month."""
+    _require_pyarrow()
+
+    table_dir = output_dir / table
+    if not table_dir.exists():
+        raise FileNotFoundError(f"Parquet tabulka neexistuje: {table_dir}")
+
+    return ds.dataset(str(table_dir), format="parquet", partitioning=_partitioning())
+
+
+def _combine(conditions: Iterable[Optional["ds.Expression"]]) -> Optional["ds.Expression"]:
+    expression = None
+    for condition in conditions:
+        if condition is not None:
+            expression = condition if expression is None else expression & condition
+    return expression
+
+
+def partition_filter(date_from: Optional[str] = None, date_to: Optional[str] = None) -> Optional["ds.Expression"]:
+    """Podmínka nad partitions year/month pro rozsah dat (YYYY-MM-DD) - nevybrané partitions se nečtou."""
+    conditions = []
+    year, month = ds.field("year"), ds.field("month")
+
+    if date_from:
+        y, m = int(date_from[:4]), int(date_from[5:7])
+        conditions.append((year > y) | ((year == y) & (month >= m)))
+    if date_to:
+        y, m = int(date_to[:4]), int(date_to[5:7])
+        conditions.append((year < y) | ((year == y) & (month <= m)))
+
+    return _combine(conditions)
+
+
+def build_filter(
+    icos: Optional[Iterable[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+) -> Optional["ds.Expression"]:
+    """
+    Sestaví filtr pro čtení tabulky smluv.
+
+    Rozsah dat (YYYY-MM-DD, včetně obou mezí) omezí partitions i published_date,
+    IČO se hledá mezi zadavateli i dodavateli (využijí se statistiky row groups).
+    """
+    conditions = [partition_filter(date_from, date_to)]
+
+    if icos:
+        values = sorted(set(icos))
+        conditions.append(ds.field("authority_ico").isin(values) | ds.field("contractor_ico").isin(values))
+    if date_from:
+        conditions.append(ds.field("published_date") >= date_from)
+    if date_to:
+        day_after = (date.fromisoformat(date_to[:10]) + timedelta(days=1)).isoformat()
+        conditions.append(ds.field("published_date") < day_after)
+
+    return _combine(conditions)
+
+
+def read_contracts_frame(
+    columns: Optional[Sequence[str]] = None,
+    icos: Optional[Iterable[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    latest_only: bool = False,
+    output_dir: Path = PARQUET_DIR
+):
+    """
+    Načte smlouvy z datasetu jako pandas DataFrame.
+
+    Args:
+        columns: Načtené sloupce (None = všechny)
+        icos: Jen smlouvy, kde je některé IČO zadavatelem nebo dodavatelem
+        date_from: Datum zveřejnění od (YYYY-MM-DD)
+        date_to: Datum zveřejnění do (YYYY-MM-DD, včetně)
+        latest_only: Ponechat jen poslední verzi každé smlouvy
+                     (smlouva se může opakovat ve více dumpech)
+    """
+    dataset = open_table(CONTRACTS_TABLE, output_dir)
+
+    read_columns = list(columns) if columns is not None else None
+    if latest_only and read_columns is not None:
+        for column in VERSION_COLUMNS:
+            if column not in read_columns:
+                read_columns.append(column)
+
+    frame = dataset.to_table(
+        columns=read_columns,
+        filter=build_filter(icos, date_from, date_to)
+    ).to_pandas()
+
+    if latest_only:
+        # Stejné pořadí verzí jako v úložišti smluv: idVerze, pak čas zveřejnění
+        frame = (
+            frame.sort_values(["version_num", "published_date"], kind="stable")
+            .drop_duplicates("contract_id", keep="last")
+            .sort_values("contract_id", kind="stable")
+            .reset_index(drop=True)
+        )
+        if columns is not None:
+            frame = frame[list(columns)]
+
+    return frame
+
+
+def read_attachments_frame(
+    contract_ids: Optional[Iterable[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    output_dir: Path = PARQUET_DIR
+):
+    """
+    Načte přílohy jako pandas DataFrame (volitelně jen pro dané smlouvy).
+
+    Tabulka příloh je rozdělená stejně jako tabulka smluv, rozsah dat proto
+    omezí jen čtené partitions.
+    """
+    _require_pyarrow()
+    if not (output_dir / ATTACHMENTS_TABLE).exists():
+        # Žádná exportovaná smlouva zatím neměla přílohy
+        return _schema(ATTACHMENT_COLUMNS + PARTITION_COLUMNS).empty_table().to_pandas()
+
+    dataset = open_table(ATTACHMENTS_TABLE, output_dir)
+
+    conditions = [partition_filter(date_from, date_to)]
+    if contract_ids is not None:
+        conditions.append(ds.field("contract_id").isin(sorted(set(contract_ids))))
+
+    return dataset.to_table(filter=_combine(conditions)).to_pandas()
+
+
+def iter_parquet_contracts(
+    columns: Optional[Sequence[str]] = None,
+    icos: Optional[Iterable[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    output_dir: Path = PARQUET_DIR
+) -> Iterator[Contract]:
+    """
+    Vrací poslední verze smluv z datasetu jako záznamy Contract.
+
+    Načítají se jen zadané sloupce a partitions, a to po dávkách (bez pandas a bez
+    načtení celé tabulky). První průchod čte jen sloupce verzí a určí poslední
+    verzi každé smlouvy (stejně jako úložiště smluv: vyšší idVerze, při shodě
+    pozdější zveřejnění, jinak první výskyt); druhý průchod vrací její řádky
+    v pořadí datasetu.
+    """
+    dataset = open_table(CONTRACTS_TABLE, output_dir)
+    expression = build_filter(icos, date_from, date_to)
+
+    latest: Dict[str, Tuple[int, Optional[str]]] = {}
+    for batch in dataset.to_batches(columns=list(VERSION_COLUMNS), filter=expression):
+        for contract_id, version_num, published_date in zip(*(batch.column(c).to_pylist() for c in VERSION_COLUMNS)):
+            current = latest.get(contract_id)
+            if (
+                current is None
+                or version_num > current[0]
+                or (version_num == current[0] and published_date and current[1] and published_date > current[1])
+            ):
+                latest[contract_id] = (version_num, published_date)
+
+    read_columns = None
+    if columns is not None:
+        read_columns = list(columns) + [c for c in VERSION_COLUMNS if c not in columns]
+
+    for batch in dataset.to_batches(columns=read_columns, filter=expression):
+        for row in batch.to_pylist():
+            contract_id = row["contract_id"]
+            if latest.get(contract_id) != (row["version_num"], row["published_date"]):
+                continue
+            # Vrátit jen jednou (shodné verze téže smlouvy z více dumpů)
+            del latest[contract_id]
+            if columns is not None:
+                row = {column: row[column] for column in columns}
+            yield unflatten_contract(row)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Dotaz do Parquet datasetu smluv z Registru smluv"
+    )
+    parser.add_argument("--ico", action="append", help="IČO zadavatele nebo dodavatele (lze opakovat)")
+    parser.add_argument("--from", dest="date_from", help="Datum zveřejnění od (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="Datum zveřejnění do (YYYY-MM-DD, včetně)")
+    parser.add_argument("--columns", help="Čárkou oddělené sloupce (výchozí: všechny)")
+    parser.add_argument("--latest", action="store_true", help="Jen poslední verze smluv")
+    parser.add_argument("--output", help="Uložit výsledek do CSV souboru")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    columns = args.columns.split(",") if args.columns else None
+    frame = read_contracts_frame(
+        columns=columns,
+        icos=args.ico,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        latest_only=args.latest
+    )
+
+    if args.output:
+        frame.to_csv(args.output, index=False)
+        print(f"✓ Uloženo {len(frame)} smluv do {args.output}")
+    else:
+        print(frame)
+        print(f"\n{len(frame)} smluv")
@@ -0,0 +1,145 @@
+"""
+smlouvy_records.py
+
+Kompaktní záznamy smluv z Registru smluv.
+
+Smlouvy se mezi extrakcí, úložištěm a transformací předávají jako n-tice
+(NamedTuple) místo vnořených slovníků - bez opakovaných klíčů v každé smlouvě.
+Opakující se řetězce smluvních stran (IČO, názvy, adresy, datové schránky,
+útvary) se internují, takže tisíce smluv téhož zadavatele sdílejí jednu kopii.
+
+Na slovníky (formát extrahovaných souborů) se smlouvy převádějí jen při
+zápisu a čtení (to_dict / from_dict).
+"""
+
+import sys
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+def intern_text(value: Optional[str]) -> Optional[str]:
+    """Internuje neprázdný řetězec (None a "" vrací beze změny)."""
+    return sys.intern(value) if value else value
+
+
+def version_number(version_id: Optional[str]) -> int:
+    """Převede idVerze na číslo pro porovnání (nečíselné verze = 0)."""
+    try:
+        return int(version_id)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Party(NamedTuple):
+    """Smluvní strana (zadavatel = subjekt, dodavatel = smluvniStrana)."""
+    ico: Optional[str] = None
+    name: str = ""
+    address: str = ""
+    datova_schranka: str = ""
+    utvar: str = ""
+
+    @classmethod
+    def create(
+        cls,
+        ico: Optional[str],
+        name: str = "",
+        address: str = "",
+        datova_schranka: str = "",
+        utvar: str = ""
+    ) -> "Party":
+        """Vytvoří stranu s internovanými řetězci."""
+        return cls(
+            intern_text(ico),
+            intern_text(name),
+            intern_text(address),
+            intern_text(datova_schranka),
+            intern_text(utvar),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["Party"]:
+        """Prázdný slovník (strana v záznamu chybí) se převede na None."""
+        if not data:
+            return None
+        return cls.create(
+            data.get("ico"),
+            data.get("name", ""),
+            data.get("address", ""),
+            data.get("datova_schranka", ""),
+            data.get("utvar", ""),
+        )
+
+
+class Attachment(NamedTuple):
+    """Příloha smlouvy."""
+    filename: str = ""
+    hash: str = ""
+    url: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Attachment":
+        return cls(data.get("filename", ""), data.get("hash", ""), data.get("url", ""))
+
+
+class Contract(NamedTuple):
+    """
+    Smlouva z Registru smluv.
+
+    Pořadí polí odpovídá pořadí klíčů v extrahovaných souborech, to_dict()
+    tedy vrací stejný slovník jako dřívější extrakce.
+    """
+    contract_id: Optional[str] = None
+    version_id: Optional[str] = None
+    url: Optional[str] = None
+    published_date: Optional[str] = None
+    authority: Optional[Party] = None
+    contractor: Optional[Party] = None
+    subject: str = ""
+    contract_date: str = ""
+    contract_number: str = ""
+    approved_by: str = ""
+    value_with_vat: Optional[float] = None
+    value_without_vat: Optional[float] = None
+    attachments: Tuple[Attachment, ...] = ()
+    source: str = "smlouvy_gov"
+
+    @property
+    def authority_ico(self) -> Optional[str]:
+        return self.authority.ico if self.authority else None
+
+    @property
+    def contractor_ico(self) -> Optional[str]:
+        return self.contractor.ico if self.contractor else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Slovník ve formátu extrahovaných souborů (chybějící strana = {})."""
+        data = self._asdict()
+        data["authority"] = self.authority.to_dict() if self.authority else {}
+        data["contractor"] = self.contractor.to_dict() if self.contractor else {}
+        data["attachments"] = [attachment.to_dict() for attachment in self.attachments]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Contract":
+        """Převede slovník (z extrahovaného souboru, úložiště, Parquet) na záznam; chybějící klíče mají výchozí hodnoty."""
+        return cls(
+            contract_id=data.get("contract_id"),
+            version_id=data.get("version_id"),
+            url=data.get("url"),
+            published_date=data.get("published_date"),
+            authority=Party.from_dict(data.get("authority")),
+            contractor=Party.from_dict(data.get("contractor")),
+            subject=data.get("subject", ""),
+            contract_date=data.get("contract_date", ""),
+            contract_number=data.get("contract_number", ""),
+            approved_by=data.get("approved_by", ""),
+            value_with_vat=data.get("value_with_vat"),
+            value_without_vat=data.get("value_without_vat"),
+            attachments=tuple(Attachment.from_dict(item) for item in data.get("attachments") or ()),
+            source=data.get("source", "smlouvy_gov"),
+        )
@@ -0,0 +1,255 @@
+"""
+smlouvy_store.py
+
+Inkrementální úložiště smluv z Registru smluv - vždy jen poslední verze smlouvy.
+
+Funkce:
+- ukládá smlouvy do SQLite (data/tenders/store/) s klíčem idSmlouvy
+- při ingestu ponechá jen nejnovější idVerze (smlouva z více dumpů = jeden řádek)
+- pamatuje si, které extrahované soubory už byly načteny (inkrementální ingest)
+- poskytuje streamované čtení smluv pro transformaci (volitelně filtrované podle IČO)
+- dělí smlouvy na souvislé rozsahy idSmlouvy pro paralelní transformaci
+"""
+
+from pathlib import Path
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+import argparse
+import json
+import sqlite3
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.extract_smlouvy_contracts import EXTRACTED_DIR, iter_extracted_contracts, list_extracted_files
+from scripts.smlouvy_records import Contract, version_number
+
+BASE_DIR = Path(__file__).parent.parent
+STORE_DIR = BASE_DIR / "data" / "tenders" / "store"
+STORE_FILE = STORE_DIR / "smlouvy_gov_contracts.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contracts (
+    contract_id TEXT PRIMARY KEY,
+    version_id TEXT,
+    version_num INTEGER NOT NULL,
+    published_date TEXT NOT NULL,
+    authority_ico TEXT,
+    contractor_ico TEXT,
+    data TEXT NOT NULL,
+    source_file TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contracts_authority_ico ON contracts (authority_ico);
+CREATE INDEX IF NOT EXISTS contracts_contractor_ico ON contracts (contractor_ico);
+
+CREATE TABLE IF NOT EXISTS ingested_files (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    contracts INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+"""
+
+# Novější verze přepíše uloženou; při shodném idVerze rozhoduje čas zveřejnění
+UPSERT_SQL = """
+INSERT INTO contracts (
+    contract_id, version_id, version_num, published_date,
+    authority_ico, contractor_ico, data, source_file, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (contract_id) DO UPDATE SET
+    version_id = excluded.version_id,
+    version_num = excluded.version_num,
+    published_date = excluded.published_date,
+    authority_ico = excluded.authority_ico,
+    contractor_ico = excluded.contractor_ico,
+    data = excluded.data,
+    source_file = excluded.source_file,
+    updated_at = excluded.updated_at
+WHERE excluded.version_num > contracts.version_num
+   OR (excluded.version_num = contracts.version_num
+       AND excluded.published_date > contracts.published_date)
+"""
+
+
+class ContractStore:
+    """SQLite úložiště smluv, které drží jen poslední verzi každé smlouvy."""
+
+    def __init__(self, path: Path = STORE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ContractStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def upsert_contracts(self, contracts: Iterable[Contract], source_file: str = "") -> Tuple[int, int]:
+        """
+        Vloží smlouvy; existující smlouvu přepíše jen novější verzí.
+
+        Returns:
+            (počet smluv na vstupu, počet vložených nebo aktualizovaných řádků)
+        """
+        seen = 0
+        changed = 0
+        skipped = 0
+        now = datetime.now().isoformat()
+
+        with self.conn:
+            for contract in contracts:
+                seen += 1
+                if not contract.contract_id:
+                    skipped += 1
+                    continue
+
+                cursor = self.conn.execute(UPSERT_SQL, (
+                    contract.contract_id,
+                    contract.version_id,
+                    version_number(contract.version_id),
+                    contract.published_date or "",
+                    contract.authority_ico,
+                    contract.contractor_ico,
+                    json.dumps(contract.to_dict(), ensure_ascii=False, default=str),
+                    source_file,
+                    now,
+                ))
+                changed += cursor.rowcount
+
+        if skipped:
+            print(f"[store] Přeskočeno {skipped} smluv bez idSmlouvy")
+
+        return seen, changed
+
+    def is_ingested(self, path: Path) -> bool:
+        """Zda už byl soubor (se stejnou velikostí a časem změny) načten."""
+        stat = path.stat()
+        row = self.conn.execute(
+            "SELECT size, mtime FROM ingested_files WHERE name = ?", (path.name,)
+        ).fetchone()
+        return row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime
+
+    def ingest_file(self, path: Path, force: bool = False) -> int:
+        """
+        Načte extrahovaný soubor se smlouvami (.jsonl, .jsonl.gz, .json) do úložiště.
+        
+        Smlouvy se čtou a ukládají průběžně, soubor se nenačítá celý do paměti.
+
+        Returns:
+            Počet vložených nebo aktualizovaných smluv
+        """
+        path = Path(path)
+        if not force and self.is_ingested(path):
+            return 0
+
+        seen, changed = self.upsert_contracts(iter_extracted_contracts(path), source_file=path.name)
+
+        stat = path.stat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ingested_files (name, size, mtime, contracts, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (path.name, stat.st_size, stat.st_mtime, seen, datetime.now().isoformat())
+            )
+
+        print(f"[store] {path.name}: {seen} smluv, {changed} nových/aktualizovaných")
+        return changed
+
+    def ingest_directory(self, directory: Path = EXTRACTED_DIR, force: bool = False) -> int:
+        """Načte všechny dosud nenačtené extrahované soubory contracts_* z adresáře."""
+        changed = 0
+        for path in list_extracted_files(directory):
+            changed += self.ingest_file(path, force=force)
+        return changed
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM contracts").fetchone()[0]
+
+    def contract_id_ranges(self, parts: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Rozdělí smlouvy na nejvýše parts souvislých rozsahů idSmlouvy s podobným počtem smluv.
+
+        Returns:
+            Seznam (od včetně, do vyjma) v pořadí idSmlouvy; None = bez omezení
+        """
+        total = self.count()
+        step = max(1, -(-total // max(1, parts)))
+        bounds = [
+            self.conn.execute(
+                "SELECT contract_id FROM contracts ORDER BY contract_id LIMIT 1 OFFSET ?", (offset,)
+            ).fetchone()[0]
+            for offset in range(step, total, step)
+        ]
+        return list(zip([None] + bounds, bounds + [None]))
+
+    def iter_contracts(
+        self,
+        filter_icos: Optional[Iterable[str]] = None,
+        source_files: Optional[Iterable[str]] = None,
+        contract_range: Optional[Tuple[Optional[str], Optional[str]]] = None
+    ) -> Iterator[Contract]:
+        """
+        Streamovaně vrací uložené smlouvy (každou smlouvu jednou, v poslední verzi).
+
+        Args:
+            filter_icos: Volitelně jen smlouvy, kde je některé IČO zadavatelem nebo dodavatelem
+            source_files: Volitelně jen smlouvy, jejichž poslední verze pochází z daných
+                          extrahovaných souborů (delta po ingestu nových dumpů)
+            contract_range: Volitelně jen smlouvy s idSmlouvy v rozsahu (od včetně, do vyjma),
+                            viz contract_id_ranges
+        """
+        conditions = []
+        params: List[str] = []
+
+        if contract_range is not None:
+            id_from, id_to = contract_range
+            if id_from is not None:
+                conditions.append("contract_id >= ?")
+                params.append(id_from)
+            if id_to is not None:
+                conditions.append("contract_id < ?")
+                params.append(id_to)
+
+        if filter_icos:
+            icos = list(filter_icos)
+            placeholders = ",".join("?" * len(icos))
+            conditions.append(f"(authority_ico IN ({placeholders}) OR contractor_ico IN ({placeholders}))")
+            params.extend(icos + icos)
+
+        if source_files is not None:
+            names = [Path(name).name for name in source_files]
+            if not names:
+                return
+            placeholders = ",".join("?" * len(names))
+            conditions.append(f"source_file IN ({placeholders})")
+            params.extend(names)
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        cursor = self.conn.execute(f"SELECT data FROM contracts {where}ORDER BY contract_id", params)
+
+        for (data,) in cursor:
+            yield Contract.from_dict(json.loads(data))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Úložiště posledních verzí smluv z Registru smluv"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Znovu načíst i soubory, které už byly načteny"
+    )
+    args = parser.parse_args()
+
+    with ContractStore() as store:
+        changed = store.ingest_directory(force=args.force)
+        print(f"✓ Načteno {changed} nových/aktualizovaných smluv, v úložišti je {store.count()} smluv")
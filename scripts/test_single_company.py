@@ -132,6 +132,7 @@ def test_single_company(ico):
     
     transformer = Neo4jTransformer()
     transformer.transform_companies(test_file)
+    transformer.finalize_pochazi_z()
     
     # Save transformed data
     os.makedirs(TRANSFORMED_DIR, exist_ok=True)
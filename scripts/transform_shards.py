@@ -0,0 +1,165 @@
+"""
+transform_shards.py
+
+Průběžný zápis transformovaných dat pro streamovanou transformaci (omezená paměť).
+
+Funkce:
+- JsonArrayShard: append-only shard jednoho typu node / relationship se stejným rozhraním
+  jako seznam (append, len); položky se zapisují rovnou zakódované jako prvky JSON pole
+  výsledného snapshotu, při dokončení snapshotu se shard jen zkopíruje
+- slučování shardů paralelní transformace: připojení kopírováním obsahu, nebo čtení
+  po jednotlivých položkách (deduplikace nodes)
+- zápis JSON snapshotu ze shardů i seznamů bez načtení všech položek do paměti
+  (výstup je shodný s json.dump(..., indent=2))
+"""
+
+from pathlib import Path
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, Optional
+import json
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+JSON_INDENT = "  "
+
+# Počet položek kódovaných najednou při zápisu JSON pole ze seznamu
+WRITE_BATCH_SIZE = 1000
+
+# Velikost bloku při kopírování shardu do snapshotu
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Stejné volby jako json.dump(..., indent=2, ensure_ascii=False, default=str) při ukládání snapshotu
+_INDENTED_ENCODER = json.JSONEncoder(indent=len(JSON_INDENT), ensure_ascii=False, default=str)
+
+
+class JsonArrayShard:
+    """
+    Append-only soubor s položkami jednoho typu, zakódovanými jako prvky JSON pole.
+
+    Obsah shardu je tělo pole na nejvyšší úrovni (bez hranatých závorek), takže se do
+    snapshotu jen zkopíruje, případně s větším odsazením. Soubor se otevře až při
+    prvním zápisu. Zavřený shard lze předat do jiného procesu (pickle) a číst dál.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.count = 0
+        self._file: Optional[IO[str]] = None
+
+    def _open(self) -> IO[str]:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a' if self.count else 'w', encoding='utf-8')
+        return self._file
+
+    def append(self, item: Dict[str, Any]) -> None:
+        f = self._open()
+        f.write(",\n" + JSON_INDENT if self.count else JSON_INDENT)
+        f.write(_INDENTED_ENCODER.encode(item).replace("\n", "\n" + JSON_INDENT))
+        self.count += 1
+
+    def extend(self, items: Iterable[Dict[str, Any]]) -> None:
+        """Připojí položky; obsah jiného shardu se jen zkopíruje (bez dekódování)."""
+        if not isinstance(items, JsonArrayShard):
+            for item in items:
+                self.append(item)
+            return
+        if not items.count:
+            return
+        f = self._open()
+        if self.count:
+            f.write(",\n")
+        items.copy_to(f)
+        self.count += items.count
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Čte položky shardu jednu po druhé.
+
+        Položka začíná řádkem s odsazením první úrovně (kódované řetězce neobsahují
+        zalomení řádku, hlubší obsah je odsazený víc).
+        """
+        if not self.count:
+            return
+        if self._file is not None:
+            self._file.flush()
+        with open(self.path, 'r', encoding='utf-8') as shard:
+            lines = []
+            for line in shard:
+                if lines and line.startswith(JSON_INDENT) and line[len(JSON_INDENT)] not in " }]":
+                    yield json.loads("".join(lines).rstrip().rstrip(","))
+                    lines = []
+                lines.append(line)
+            if lines:
+                yield json.loads("".join(lines))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def copy_to(self, f: IO[str], level: int = 0) -> None:
+        """Zapíše tělo pole do f, odsazené na úroveň level."""
+        if not self.count:
+            return
+        if self._file is not None:
+            self._file.flush()
+        indent = JSON_INDENT * level
+        with open(self.path, 'r', encoding='utf-8') as shard:
+            if level:
+                f.write(indent)
+            for chunk in iter(lambda: shard.read(COPY_CHUNK_SIZE), ""):
+                f.write(chunk.replace("\n", "\n" + indent) if level else chunk)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def write_json_array(f: IO[str], items: Iterable[Any], level: int = 0) -> None:
+    """
+    Zapíše položky (seznam nebo JsonArrayShard) jako JSON pole zanořené na úrovni level.
+
+    Seznam se kóduje po dávkách WRITE_BATCH_SIZE; výstup odpovídá json.dump(list(items), indent=2).
+    """
+    indent = JSON_INDENT * level
+    if not items:
+        f.write("[]")
+        return
+
+    f.write("[\n")
+    if isinstance(items, JsonArrayShard):
+        items.copy_to(f, level)
+    else:
+        items = iter(items)
+        first = True
+        while True:
+            batch = list(islice(items, WRITE_BATCH_SIZE))
+            if not batch:
+                break
+            # "[\n  {...},\n  {...}\n]" -> položky bez hranatých závorek, odsazené na úroveň level
+            body = _INDENTED_ENCODER.encode(batch)[2:-2]
+            if level:
+                body = indent + body.replace("\n", "\n" + indent)
+            if not first:
+                f.write(",\n")
+            f.write(body)
+            first = False
+    f.write("\n" + indent + "]")
+
+
+def write_json_arrays(f: IO[str], arrays: Dict[str, Iterable[Any]], level: int = 0) -> None:
+    """Zapíše slovník {typ: položky} jako JSON objekt polí (jako json.dump(..., indent=2))."""
+    if not arrays:
+        f.write("{}")
+        return
+
+    indent = JSON_INDENT * (level + 1)
+    f.write("{\n")
+    for i, (name, items) in enumerate(arrays.items()):
+        if i:
+            f.write(",\n")
+        f.write(f"{indent}{json.dumps(name, ensure_ascii=False)}: ")
+        write_json_array(f, items, level + 1)
+    f.write("\n" + JSON_INDENT * level + "}")
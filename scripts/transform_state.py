@@ -0,0 +1,208 @@
+"""
+transform_state.py
+
+Stav inkrementální transformace do Neo4j formátu (data/transformed/state/).
+
+Funkce:
+- manifest vstupních souborů, které už byly transformovány (velikost, čas změny, SHA-256)
+- výběr nových nebo změněných vstupů (hash se přepočítává jen při změně velikosti nebo času)
+- uložení a načtení indexů entit transformeru (Firma, Zadavatel, Osoba, Zdroj, POCHAZI_Z),
+  proti kterým se transformují další vstupy
+- evidence zapsaných snapshotů (plných i delta) a jejich načtení do Neo4j - manifest
+  postupuje už při transformaci, delty se proto hromadí, dokud je loader nenačte
+"""
+
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import TRANSFORMED_DIR
+
+BASE_DIR = Path(__file__).parent.parent
+STATE_DIR = Path(TRANSFORMED_DIR) / "state"
+MANIFEST_FILE = STATE_DIR / "manifest.json"
+ENTITY_INDEX_FILE = STATE_DIR / "entity_index.json.gz"
+SNAPSHOTS_FILE = STATE_DIR / "snapshots.json"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def input_key(path: Path) -> str:
+    """Klíč vstupního souboru v manifestu (cesta relativní k repozitáři)."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(BASE_DIR.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def input_path(key: str) -> Path:
+    """Cesta vstupního souboru podle klíče v manifestu."""
+    return BASE_DIR / key
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 obsahu souboru."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest() -> Dict[str, Any]:
+    """Načte manifest transformovaných vstupů (prázdný, pokud ještě neexistuje)."""
+    if MANIFEST_FILE.exists():
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"files": {}}
+
+
+def save_manifest(manifest: Dict[str, Any]) -> None:
+    """Uloží manifest (atomicky přes dočasný soubor)."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = MANIFEST_FILE.with_name(MANIFEST_FILE.name + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_file, MANIFEST_FILE)
+
+
+def input_fingerprints(
+    manifest: Dict[str, Any],
+    paths: Iterable[Path],
+    hash_changed: bool = True
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Otisky vstupních souborů {klíč: {size, mtime, sha256}}.
+
+    Hash se přepočítává jen tehdy, když se od otisku v manifestu změnila velikost
+    nebo čas změny souboru. S hash_changed=False se ani pak nepočítá (plná
+    transformace zpracovala všechny vstupy, stačí velikost a čas změny); takový
+    otisk nemá sha256.
+    """
+    fingerprints = {}
+    for path in paths:
+        key = input_key(path)
+        stat = Path(path).stat()
+        cached = manifest.get("files", {}).get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime:
+            fingerprints[key] = cached
+            continue
+
+        fingerprints[key] = {"size": stat.st_size, "mtime": stat.st_mtime}
+        if hash_changed:
+            fingerprints[key]["sha256"] = hash_file(Path(path))
+    return fingerprints
+
+
+def changed_inputs(manifest: Dict[str, Any], fingerprints: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Klíče vstupů, které v manifestu nejsou nebo se změnily.
+
+    Soubor se stejnou velikostí a časem změny je beze změny; jinak rozhoduje
+    SHA-256 (otisk bez hashe se považuje za změněný).
+    """
+    files = manifest.get("files", {})
+    changed = []
+    for key, fingerprint in fingerprints.items():
+        cached = files.get(key)
+        if cached and cached["size"] == fingerprint["size"] and cached["mtime"] == fingerprint["mtime"]:
+            continue
+        if not cached or not cached.get("sha256") or cached["sha256"] != fingerprint.get("sha256"):
+            changed.append(key)
+    return changed
+
+
+def record_inputs(
+    manifest: Dict[str, Any],
+    fingerprints: Dict[str, Dict[str, Any]],
+    filter_ico: Optional[List[str]]
+) -> None:
+    """Zapíše transformované vstupy a použitý filtr IČO do manifestu a uloží ho."""
+    now = datetime.now().isoformat()
+    files = manifest.setdefault("files", {})
+    for key, fingerprint in fingerprints.items():
+        files[key] = {**fingerprint, "transformed_at": now}
+    manifest["filter_ico"] = filter_ico
+    manifest["updated_at"] = now
+    save_manifest(manifest)
+
+
+def load_entity_index() -> Optional[Dict[str, Any]]:
+    """Načte uložené indexy entit (None, pokud ještě neexistují)."""
+    if not ENTITY_INDEX_FILE.exists():
+        return None
+    with gzip.open(ENTITY_INDEX_FILE, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_entity_index(index: Dict[str, Any]) -> None:
+    """Uloží indexy entit (gzip JSON, atomicky přes dočasný soubor)."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = ENTITY_INDEX_FILE.with_name(ENTITY_INDEX_FILE.name + ".tmp")
+    with gzip.open(tmp_file, 'wt', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, default=str)
+    os.replace(tmp_file, ENTITY_INDEX_FILE)
+
+
+def load_snapshots() -> List[Dict[str, Any]]:
+    """Zapsané snapshoty v pořadí vzniku ({file, full, created_at, loaded_at})."""
+    if SNAPSHOTS_FILE.exists():
+        with open(SNAPSHOTS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return []
+
+
+def save_snapshots(snapshots: List[Dict[str, Any]]) -> None:
+    """Uloží evidenci snapshotů (atomicky přes dočasný soubor)."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = SNAPSHOTS_FILE.with_name(SNAPSHOTS_FILE.name + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(snapshots, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, SNAPSHOTS_FILE)
+
+
+def record_snapshot(path: Path, full: bool) -> None:
+    """Zapíše nový snapshot (plný, nebo delta) jako dosud nenačtený do Neo4j."""
+    snapshots = load_snapshots()
+    snapshots.append({
+        "file": input_key(path),
+        "full": full,
+        "created_at": datetime.now().isoformat(),
+        "loaded_at": None,
+    })
+    save_snapshots(snapshots)
+
+
+def pending_snapshots() -> List[Path]:
+    """
+    Snapshoty, které je třeba načíst do Neo4j, v pořadí vzniku.
+
+    Plný snapshot obsahuje vše, co vzniklo před ním, takže nenačtené starší
+    snapshoty nahrazuje; čekají jen nenačtené snapshoty od posledního plného
+    (včetně). Snapshoty, jejichž soubor už neexistuje, se vynechají.
+    """
+    snapshots = load_snapshots()
+    start = max((i for i, snapshot in enumerate(snapshots) if snapshot["full"]), default=0)
+    return [
+        input_path(snapshot["file"]) for snapshot in snapshots[start:]
+        if snapshot["loaded_at"] is None and input_path(snapshot["file"]).exists()
+    ]
+
+
+def mark_snapshot_loaded(path: Path) -> None:
+    """Označí snapshot jako načtený do Neo4j."""
+    key = input_key(path)
+    snapshots = load_snapshots()
+    for snapshot in snapshots:
+        if snapshot["file"] == key:
+            snapshot["loaded_at"] = datetime.now().isoformat()
+    save_snapshots(snapshots)
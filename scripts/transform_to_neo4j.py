@@ -6,10 +6,13 @@ Matches Czech schema from thesis: Osoba, Firma, Zadavatel, Zakazka, Zdroj, Skola
 import os
 import json
 import glob
+import shutil
 from datetime import datetime
 import sys
 from pathlib import Path
-from typing import Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
 
 def normalize_ico(ico: Optional[str]) -> Optional[str]:
     """Normalizuje IČO na formát bez mezer a s leading zeros."""
@@ -22,15 +25,122 @@ def normalize_ico(ico: Optional[str]) -> Optional[str]:
         ico_clean = ico_clean[:8]
     return ico_clean if ico_clean else None
 
+def as_ico_set(filter_ico) -> Optional[set]:
+    """Převede filtr (jedno IČO nebo kolekci IČO) na množinu, None pokud není zadán."""
+    if not filter_ico:
+        return None
+    if isinstance(filter_ico, str):
+        return {filter_ico}
+    return set(filter_ico)
+
+def jmeno_key(jmeno: Optional[str], prijmeni: Optional[str]) -> tuple:
+    """Normalizovaný klíč jména osoby pro index Osoba nodes (velikost písmen a bílé znaky se ignorují)."""
+    def normalize(value):
+        return " ".join(value.split()).casefold() if value is not None else None
+    return normalize(jmeno), normalize(prijmeni)
+
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import TENDERS_DIR, COMPANIES_DIR, PEOPLE_DIR, TRANSFORMED_DIR, NEO4J_SCHEMA
+from scripts.smlouvy_store import ContractStore
+from scripts.extract_smlouvy_contracts import iter_extracted_contracts, list_extracted_files
+from scripts.smlouvy_parquet import iter_parquet_contracts
+from scripts.transform_shards import JsonArrayShard, write_json_array, write_json_arrays
+from scripts.transform_state import (
+    changed_inputs, input_fingerprints, input_path, load_entity_index,
+    load_manifest, record_inputs, record_snapshot, save_entity_index
+)
+
+# Sloupce Parquet datasetu smluv, které transformace potřebuje
+PARQUET_TRANSFORM_COLUMNS = [
+    "contract_id", "subject", "value_with_vat", "value_without_vat",
+    "published_date", "contract_date",
+    "authority_ico", "authority_name", "contractor_ico", "contractor_name",
+]
+
+# Počet částí smluv na jeden proces při paralelní transformaci (vyrovnání zátěže)
+PARTITIONS_PER_WORKER = 4
+
+# Extrahované osoby z RZP (rzp_persons_*.json)
+RZP_EXTRACTED_DIR = Path(__file__).parent.parent / "data" / "people" / "extracted" / "rzp"
+
+def list_rzp_files() -> List[Path]:
+    """Extrahované soubory osob z RZP seřazené podle názvu."""
+    if not RZP_EXTRACTED_DIR.exists():
+        return []
+    return sorted(
+        path for path in RZP_EXTRACTED_DIR.glob("rzp_persons_*.json")
+        if "transformed" not in path.name
+    )
+
+def _transform_partition(task) -> dict:
+    """
+    Worker pro paralelní transformaci (map) - transformuje jednu část vstupů.
+    
+    Args:
+        task: ("smlouvy", zdroj_id, filtr IČO, (cesta k úložišti smluv, rozsah idSmlouvy), adresář shardů)
+              nebo ("rzp", zdroj_id, filtr IČO, cesta k extrahovanému souboru RZP, adresář shardů);
+              s adresářem shardů (streamovaný režim) se nodes a relationships zapisují
+              do shardů a procesu rodiče se předají jen jejich cesty
+    
+    Returns:
+        Dílčí nodes a relationships (seznamy nebo zavřené shardy); u RZP i osoby
+        s relationships podle jména (osoba_jmeno), které se zpracují až při slučování
+    """
+    kind, zdroj_id, filter_ico, source, shard_dir = task
+    transformer = Neo4jTransformer(streaming=shard_dir is not None, shard_dir=shard_dir)
+    partial = {"shard_dir": shard_dir}
+    
+    if kind == "smlouvy":
+        store_path, contract_range = source
+        with ContractStore(Path(store_path)) as store:
+            contracts = store.iter_contracts(as_ico_set(filter_ico), contract_range=contract_range)
+            transformer.transform_smlouvy_contract_records(contracts, zdroj_id)
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            rzp_persons = json.load(f)
+        transformer.transform_rzp_persons(rzp_persons, zdroj_id, filter_ico=filter_ico)
+        partial["name_relationships"] = [
+            person_data for person_data in rzp_persons
+            if any(relationship.get("osoba_jmeno") for relationship in person_data.get("relationships", []))
+        ]
+        partial["persons"] = len(rzp_persons)
+    
+    transformer.finalize_pochazi_z()
+    transformer.close_shard_files()
+    partial["nodes"] = transformer.nodes
+    partial["relationships"] = transformer.relationships
+    return partial
+
+def iter_partitions_parallel(tasks: list, workers: int) -> Iterator[dict]:
+    """
+    Transformuje části vstupů v process poolu a vrací dílčí výsledky v pořadí úloh.
+    
+    Počet rozpracovaných úloh je omezený, aby se hotové výsledky nehromadily
+    v paměti, zatímco se čeká na pomalejší část.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        next_task = 0
+        
+        for _ in range(len(tasks)):
+            while next_task < len(tasks) and len(pending) < workers * 2:
+                pending.append(executor.submit(_transform_partition, tasks[next_task]))
+                next_task += 1
+            yield pending.popleft().result()
 
 class Neo4jTransformer:
     """Transforms raw data into Neo4j node and relationship format matching Czech thesis schema."""
     
-    def __init__(self):
-        self.output_dir = TRANSFORMED_DIR
+    def __init__(self, streaming: bool = False, output_dir: Optional[str] = None, shard_dir: Optional[str] = None):
+        """
+        streaming: nodes a relationships průběžně zapisovat do append-only shardů
+                   (v paměti zůstávají jen indexy pro deduplikaci), snapshot se
+                   sestaví z shardů v save_transformed_data
+        output_dir: adresář pro transformovaná data (výchozí TRANSFORMED_DIR)
+        shard_dir: adresář shardů streamovaného režimu (výchozí output_dir/shards/<čas>_<pid>)
+        """
+        self.output_dir = output_dir or TRANSFORMED_DIR
         os.makedirs(self.output_dir, exist_ok=True)
         # Czech schema nodes
         self.nodes = {
@@ -48,14 +158,103 @@ class Neo4jTransformer:
             "PODAVA_NABIDKU": [],       # Firma -> Zakazka
             "JE_PRIDELENA": [],         # Firma -> Zakazka
             "STUDOVAL_NA": [],          # Osoba -> Skola
-            "POCHAZI_Z": [],            # Any -> Zdroj
+            "POCHAZI_Z": [],            # Any -> Zdroj (sestaví se z self.pochazi_z v finalize_pochazi_z)
             "VYHLASUJE_ZAKAZKU": []     # Zadavatel -> Zakazka
         }
-        # Track entities by IČO to avoid duplicates
+        # Track entities by IČO to avoid duplicates (klíč -> id nodu, nody samotné jsou jen v self.nodes)
         self.firmy_by_ico = {}
         self.zadavatele_by_ico = {}
-        # Track Zdroj nodes
+        # Track Osoba ids and normalized name -> {datum_narozeni: osoba_id}
+        self.osoby_by_id = {}
+        self.osoby_by_jmeno = {}
+        # Track Zdroj ids
         self.zdroje = {}
+        # Track POCHAZI_Z edges: (entity id, zdroj_id) -> (datum_ziskani, datum_posledniho_ziskani)
+        self.pochazi_z = {}
+        # POCHAZI_Z edges from previous runs (incremental transform): (entity id, zdroj_id) -> datum_ziskani
+        self.pochazi_z_ulozene = {}
+        
+        self.streaming = streaming
+        self.shard_dir = None
+        if streaming:
+            # POCHAZI_Z se do shardu zapíše až při dokončení snapshotu - datum_posledniho_ziskani
+            # se mění až do konce transformace
+            self.shard_dir = Path(shard_dir) if shard_dir else (
+                Path(self.output_dir) / "shards" / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+            )
+            self.nodes = {
+                node_type: JsonArrayShard(self.shard_dir / f"nodes_{node_type.lower()}.shard")
+                for node_type in self.nodes
+            }
+            self.relationships = {
+                rel_type: [] if rel_type == "POCHAZI_Z" else JsonArrayShard(self.shard_dir / f"rels_{rel_type.lower()}.shard")
+                for rel_type, rels in self.relationships.items()
+            }
+    
+    def add_osoba(self, osoba_node: dict) -> None:
+        """
+        Přidá Osoba node a zaindexuje ho podle osoba_id a jména.
+        
+        Indexy si pamatují první osobu s daným id / jménem (stejně jako dřívější
+        lineární hledání v self.nodes["Osoba"]).
+        """
+        self.nodes["Osoba"].append(osoba_node)
+        self.osoby_by_id.setdefault(osoba_node.get("osoba_id"), osoba_node.get("osoba_id"))
+        
+        key = jmeno_key(osoba_node.get("jmeno"), osoba_node.get("prijmeni"))
+        self.osoby_by_jmeno.setdefault(key, {}).setdefault(osoba_node.get("datum_narozeni"), osoba_node.get("osoba_id"))
+    
+    def find_osoba_by_jmeno(self, jmeno: str, prijmeni: str, datum_narozeni: Optional[str] = None) -> Optional[str]:
+        """
+        Najde osoba_id podle jména a příjmení (O(1) přes index).
+        
+        Se zadaným datem narození se přednostně vrátí osoba s tímto datem,
+        jinak první osoba s daným jménem.
+        """
+        by_datum = self.osoby_by_jmeno.get(jmeno_key(jmeno, prijmeni))
+        if not by_datum:
+            return None
+        if datum_narozeni in by_datum:
+            return by_datum[datum_narozeni]
+        return next(iter(by_datum.values()))
+    
+    def _link_zdroj(self, entity_id: str, zdroj_id: str) -> None:
+        """
+        Zaznamená původ entity (POCHAZI_Z) - jedna hrana na dvojici (entita, zdroj).
+        
+        datum_ziskani je čas prvního výskytu entity ve zdroji, datum_posledniho_ziskani
+        posledního; opakovaný výskyt (např. dodavatel s tisíci smluv) jen posune
+        datum_posledniho_ziskani místo přidání další stejné hrany.
+        """
+        now = datetime.now().isoformat()
+        key = (entity_id, zdroj_id)
+        dates = self.pochazi_z.get(key)
+        if dates is not None:
+            self.pochazi_z[key] = (dates[0], now)
+            return
+        
+        # Hrana z předchozího běhu (inkrementální transformace) si ponechá datum_ziskani
+        self.pochazi_z[key] = (self.pochazi_z_ulozene.pop(key, now), now)
+    
+    def finalize_pochazi_z(self) -> None:
+        """
+        Sestaví POCHAZI_Z relationships z indexu self.pochazi_z (v pořadí prvního výskytu).
+        
+        Během transformace se z hran drží jen data získání; ve streamovaném režimu
+        se hrany zapíšou do shardu, jinak do seznamu.
+        """
+        if self.streaming:
+            rels = JsonArrayShard(self.shard_dir / "rels_pochazi_z.shard")
+        else:
+            rels = []
+        for (entity_id, zdroj_id), (datum_ziskani, datum_posledniho_ziskani) in self.pochazi_z.items():
+            rels.append({
+                "from": entity_id,
+                "to": zdroj_id,
+                "datum_ziskani": datum_ziskani,
+                "datum_posledniho_ziskani": datum_posledniho_ziskani
+            })
+        self.relationships["POCHAZI_Z"] = rels
     
     def get_or_create_zdroj(self, zdroj_id: str, nazev: str, url: str = "", typ: str = "registr") -> str:
         """Vytvoří nebo vrátí Zdroj node."""
@@ -74,7 +273,7 @@ class Neo4jTransformer:
         
         zdroj_node = {k: v for k, v in zdroj_node.items() if v is not None and v != ""}
         self.nodes["Zdroj"].append(zdroj_node)
-        self.zdroje[zdroj_id] = zdroj_node
+        self.zdroje[zdroj_id] = zdroj_id
         
         return zdroj_id
     
@@ -94,12 +293,7 @@ class Neo4jTransformer:
         if ico in self.firmy_by_ico:
             # Link to Zdroj if not already linked
             if zdroj_id:
-                rel = {
-                    "from": ico,
-                    "to": zdroj_id,
-                    "datum_ziskani": datetime.now().isoformat()
-                }
-                self.relationships["POCHAZI_Z"].append(rel)
+                self._link_zdroj(ico, zdroj_id)
             return ico
         
         # Vytvořit nový Firma node
@@ -115,16 +309,11 @@ class Neo4jTransformer:
         node = {k: v for k, v in node.items() if v is not None and v != ""}
         
         self.nodes["Firma"].append(node)
-        self.firmy_by_ico[ico] = node
+        self.firmy_by_ico[ico] = ico
         
         # Link to Zdroj
         if zdroj_id:
-            rel = {
-                "from": ico,
-                "to": zdroj_id,
-                "datum_ziskani": datetime.now().isoformat()
-            }
-            self.relationships["POCHAZI_Z"].append(rel)
+            self._link_zdroj(ico, zdroj_id)
         
         return ico
     
@@ -147,12 +336,7 @@ class Neo4jTransformer:
         if zadavatel_id in self.zadavatele_by_ico:
             # Link to Zdroj if not already linked
             if zdroj_id:
-                rel = {
-                    "from": zadavatel_id,
-                    "to": zdroj_id,
-                    "datum_ziskani": datetime.now().isoformat()
-                }
-                self.relationships["POCHAZI_Z"].append(rel)
+                self._link_zdroj(zadavatel_id, zdroj_id)
             return zadavatel_id
         
         # Create Zadavatel node
@@ -169,21 +353,20 @@ class Neo4jTransformer:
         # Clean None values
         node = {k: v for k, v in node.items() if v is not None and v != ""}
         self.nodes["Zadavatel"].append(node)
-        self.zadavatele_by_ico[zadavatel_id] = node
+        self.zadavatele_by_ico[zadavatel_id] = zadavatel_id
         
         # Link to Zdroj
         if zdroj_id:
-            rel = {
-                "from": zadavatel_id,
-                "to": zdroj_id,
-                "datum_ziskani": datetime.now().isoformat()
-            }
-            self.relationships["POCHAZI_Z"].append(rel)
+            self._link_zdroj(zadavatel_id, zdroj_id)
         
         return zadavatel_id
     
-    def transform_all(self, filter_ico=None):
-        """Transform all available data files."""
+    def transform_all(self, filter_ico=None, use_parquet=False):
+        """
+        Transform all available data files.
+        
+        use_parquet: smlouvy číst z Parquet datasetu (jen potřebné sloupce) místo úložiště smluv
+        """
         print("Transforming data for Neo4j (Czech schema)...")
         
         # Create Zdroj for smlouvy.gov.cz
@@ -194,14 +377,171 @@ class Neo4jTransformer:
             "registr"
         )
         
-        # Transform smlouvy.gov.cz contracts (from extracted directory)
-        extracted_dir = Path(__file__).parent.parent / "data" / "tenders" / "extracted" / "smlouvy_gov"
-        if extracted_dir.exists():
-            contract_files = list(extracted_dir.glob("contracts_*.json"))
-            for file in contract_files:
-                if "transformed" not in str(file):
-                    self.transform_smlouvy_contracts(str(file), zdroj_smlouvy, filter_ico=filter_ico)
+        # Transform smlouvy.gov.cz contracts (latest versions from the contract store,
+        # newly extracted files are ingested first; or from the Parquet dataset)
+        if use_parquet:
+            self.transform_smlouvy_contracts_from_parquet(zdroj_smlouvy, filter_ico=filter_ico)
+        else:
+            with ContractStore() as store:
+                store.ingest_directory()
+                self.transform_smlouvy_contracts_from_store(store, zdroj_smlouvy, filter_ico=filter_ico)
+        
+        # Transform legacy tenders, companies and people
+        self.transform_legacy_files()
+        
+        # Create Zdroj for RZP
+        zdroj_rzp = self.get_or_create_zdroj(
+            "RZP",
+            "Registr živnostenského podnikání",
+            "https://rzp.gov.cz",
+            "registr"
+        )
+        
+        # Transform RZP data (from extracted directory)
+        for file in list_rzp_files():
+            self.transform_rzp_data(str(file), zdroj_rzp, filter_ico=filter_ico)
+        
+        # Save transformed data
+        snapshot = self.save_transformed_data()
+        
+        # Plná transformace je výchozím stavem pro další inkrementální běhy
+        # (zpracovala všechny vstupy, jejich obsah se proto nehashuje)
+        fingerprints = input_fingerprints(load_manifest(), list_extracted_files() + list_rzp_files(), hash_changed=False)
+        self.save_state(filter_ico, fingerprints, {"files": {}}, snapshot, full=True)
+        
+        print(f"\nTransformation complete!")
+        print(f"Nodes: {sum(len(v) for v in self.nodes.values())}")
+        print(f"Relationships: {sum(len(v) for v in self.relationships.values())}")
+    
+    def transform_parallel(self, filter_ico=None, workers: int = 2):
+        """
+        Plná transformace v process poolu (map-reduce).
+        
+        Map: smlouvy z úložiště se rozdělí na souvislé rozsahy idSmlouvy a soubory RZP
+        se transformují každý zvlášť do dílčích nodes a relationships.
+        Reduce: dílčí výsledky se slučují v pořadí vstupů (merge_partial), relationships
+        z RZP podle jména osoby se dopočítají až nad sloučenými osobami. Výsledek je
+        stejný jako u transform_all (kromě časů získání).
+        
+        Ve streamovaném režimu zapisují workery do vlastních shardů v self.shard_dir
+        a vracejí jen jejich cesty; relationships se připojí kopírováním shardů, nodes
+        se deduplikují po jednotlivých položkách. Bez streamovaného režimu se dílčí
+        výsledky předávají celé (paměť roste s velikostí části a počtem rozpracovaných úloh).
+        """
+        print(f"Transforming data for Neo4j in parallel ({workers} processes)...")
+        
+        # Zdroj nodes vznikají v hlavním procesu (ve stejném pořadí jako v transform_all)
+        zdroj_smlouvy = self.get_or_create_zdroj(
+            "REGISTR_SMLUV",
+            "Registr smluv",
+            "https://smlouvy.gov.cz",
+            "registr"
+        )
+        zdroj_rzp = self.get_or_create_zdroj(
+            "RZP",
+            "Registr živnostenského podnikání",
+            "https://rzp.gov.cz",
+            "registr"
+        )
+        
+        with ContractStore() as store:
+            store.ingest_directory()
+            store_path = str(store.path)
+            contract_ranges = store.contract_id_ranges(workers * PARTITIONS_PER_WORKER)
+        rzp_files = list_rzp_files()
+        
+        filter_list = self.state_filter(filter_ico)
+        tasks = [("smlouvy", zdroj_smlouvy, filter_list, (store_path, contract_range)) for contract_range in contract_ranges]
+        tasks += [("rzp", zdroj_rzp, filter_list, str(file)) for file in rzp_files]
+        tasks = [
+            task + (str(self.shard_dir / f"part_{i:04d}") if self.streaming else None,)
+            for i, task in enumerate(tasks)
+        ]
+        print(f"  {len(contract_ranges)} contract partitions, {len(rzp_files)} RZP files")
+        
+        partials = iter_partitions_parallel(tasks, workers)
+        zakazka_ids = set()
+        
+        for _ in contract_ranges:
+            self.merge_partial(next(partials), zakazka_ids)
+        
+        # Legacy formáty jsou malé, transformují se sekvenčně na stejném místě jako v transform_all
+        self.transform_legacy_files()
+        
+        for file in rzp_files:
+            partial = next(partials)
+            print(f"Merging RZP data from {file.name}...")
+            self.merge_partial(partial, zakazka_ids)
+            self.transform_rzp_name_relationships(partial["name_relationships"], zdroj_rzp)
+            print(f"  Processed {partial['persons']} persons from RZP")
         
+        snapshot = self.save_transformed_data()
+        
+        fingerprints = input_fingerprints(load_manifest(), list_extracted_files() + rzp_files, hash_changed=False)
+        self.save_state(filter_ico, fingerprints, {"files": {}}, snapshot, full=True)
+        
+        print(f"\nParallel transformation complete!")
+        print(f"Nodes: {sum(len(v) for v in self.nodes.values())}")
+        print(f"Relationships: {sum(len(v) for v in self.relationships.values())}")
+    
+    def merge_partial(self, partial: dict, zakazka_ids: set) -> None:
+        """
+        Sloučí dílčí výsledek paralelní transformace (reduce).
+        
+        Pravidla jsou deterministická a při slučování v pořadí vstupů odpovídají
+        sekvenční transformaci:
+        - node se stejným klíčem (Firma podle ico, Zadavatel podle zadavatel_id,
+          Zakazka podle zakazka_id, Osoba podle osoba_id, Zdroj podle zdroj_id)
+          vyhrává první sloučený, pozdější se zahodí
+        - POCHAZI_Z si ponechá první datum_ziskani a poslední datum_posledniho_ziskani
+        - ostatní relationships se připojí (shardy kopírováním)
+        
+        Shardy dílčího výsledku (streamovaný režim) se po sloučení smažou.
+        """
+        nodes = partial["nodes"]
+        
+        for node in nodes["Firma"]:
+            if node["ico"] not in self.firmy_by_ico:
+                self.firmy_by_ico[node["ico"]] = node["ico"]
+                self.nodes["Firma"].append(node)
+        
+        for node in nodes["Zadavatel"]:
+            if node["zadavatel_id"] not in self.zadavatele_by_ico:
+                self.zadavatele_by_ico[node["zadavatel_id"]] = node["zadavatel_id"]
+                self.nodes["Zadavatel"].append(node)
+        
+        for node in nodes["Zakazka"]:
+            if node["zakazka_id"] not in zakazka_ids:
+                zakazka_ids.add(node["zakazka_id"])
+                self.nodes["Zakazka"].append(node)
+        
+        for node in nodes["Osoba"]:
+            if node["osoba_id"] not in self.osoby_by_id:
+                self.add_osoba(node)
+        
+        for node in nodes["Zdroj"]:
+            if node["zdroj_id"] not in self.zdroje:
+                self.zdroje[node["zdroj_id"]] = node["zdroj_id"]
+                self.nodes["Zdroj"].append(node)
+        
+        self.nodes["Skola"].extend(nodes["Skola"])
+        
+        for rel_type, rels in partial["relationships"].items():
+            if rel_type != "POCHAZI_Z":
+                self.relationships[rel_type].extend(rels)
+                continue
+            
+            for rel in rels:
+                key = (rel["from"], rel["to"])
+                dates = self.pochazi_z.get(key)
+                datum_ziskani = dates[0] if dates is not None else rel["datum_ziskani"]
+                self.pochazi_z[key] = (datum_ziskani, rel["datum_posledniho_ziskani"])
+        
+        if partial.get("shard_dir"):
+            shutil.rmtree(partial["shard_dir"], ignore_errors=True)
+    
+    def transform_legacy_files(self):
+        """Transformuje data ve starších formátech (tenders, companies, people)."""
         # Transform tenders (legacy format)
         tender_files = glob.glob(os.path.join(TENDERS_DIR, "*.json"))
         for file in tender_files:
@@ -219,30 +559,166 @@ class Neo4jTransformer:
         for file in people_files:
             if "transformed" not in file:
                 self.transform_people(file)
+    
+    def transform_delta(self, source_files, filter_ico=None):
+        """
+        Transformuje jen smlouvy, jejichž poslední verze pochází z daných extrahovaných
+        souborů (denní delta). Ostatní zdroje se nezpracovávají - načtení delty do Neo4j
+        přes MERGE existující data nemaže.
         
-        # Create Zdroj for RZP
-        zdroj_rzp = self.get_or_create_zdroj(
-            "RZP",
-            "Registr živnostenského podnikání",
-            "https://rzp.gov.cz",
+        Stav sdílí s transform_incremental: entity se deduplikují proti uloženým indexům
+        (pokud stav pro tento filtr IČO existuje) a soubory delty se zapíšou do manifestu,
+        takže je další inkrementální běh znovu nezpracuje.
+        """
+        print(f"Transforming delta for Neo4j ({len(source_files)} extracted files)...")
+        
+        manifest = load_manifest()
+        index = load_entity_index()
+        if index is not None and manifest.get("filter_ico") == self.state_filter(filter_ico):
+            self.restore_indexes(index)
+        else:
+            # Bez stavu pro tento filtr začíná nový stav (ostatní vstupy pak zpracuje
+            # další inkrementální běh)
+            manifest = {"files": {}}
+        
+        zdroj_smlouvy = self.get_or_create_zdroj(
+            "REGISTR_SMLUV",
+            "Registr smluv",
+            "https://smlouvy.gov.cz",
             "registr"
         )
         
-        # Transform RZP data (from extracted directory)
-        rzp_dir = Path(__file__).parent.parent / "data" / "people" / "extracted" / "rzp"
-        if rzp_dir.exists():
-            rzp_files = list(rzp_dir.glob("rzp_persons_*.json"))
+        with ContractStore() as store:
+            for file in source_files:
+                store.ingest_file(Path(file))
+            contracts = store.iter_contracts(as_ico_set(filter_ico), source_files=source_files)
+            self.transform_smlouvy_contract_records(contracts, zdroj_smlouvy)
+        
+        snapshot = self.save_transformed_data()
+        fingerprints = input_fingerprints(manifest, [Path(file) for file in source_files])
+        self.save_state(filter_ico, fingerprints, manifest, snapshot, full=False)
+        
+        print(f"\nDelta transformation complete!")
+        print(f"Nodes: {sum(len(v) for v in self.nodes.values())}")
+        print(f"Relationships: {sum(len(v) for v in self.relationships.values())}")
+    
+    def transform_incremental(self, filter_ico=None):
+        """
+        Transformuje jen nové nebo změněné extrahované soubory (smlouvy a osoby z RZP).
+        
+        Vstupy se porovnávají s manifestem podle SHA-256 obsahu, entity se deduplikují
+        proti indexům uloženým předchozím během. Výsledný snapshot obsahuje jen přidané
+        nebo změněné nodes a relationships (načtení do Neo4j přes MERGE). Bez uloženého
+        stavu nebo s jiným filtrem IČO se provede plná transformace.
+        """
+        manifest = load_manifest()
+        index = load_entity_index()
+        if index is None or manifest.get("filter_ico") != self.state_filter(filter_ico):
+            print("No incremental transform state for this IČO filter, running full transform...")
+            self.transform_all(filter_ico=filter_ico)
+            return
+        
+        fingerprints = input_fingerprints(manifest, list_extracted_files() + list_rzp_files())
+        changed = changed_inputs(manifest, fingerprints)
+        contract_files = [input_path(key) for key in changed if input_path(key).name.startswith("contracts_")]
+        rzp_files = [input_path(key) for key in changed if input_path(key).name.startswith("rzp_persons_")]
+        if not changed:
+            print("Transformed data are up to date, no new or changed input files")
+            return
+        
+        print(f"Transforming incrementally for Neo4j ({len(contract_files)} contract files, {len(rzp_files)} RZP files)...")
+        self.restore_indexes(index)
+        
+        if contract_files:
+            zdroj_smlouvy = self.get_or_create_zdroj(
+                "REGISTR_SMLUV",
+                "Registr smluv",
+                "https://smlouvy.gov.cz",
+                "registr"
+            )
+            with ContractStore() as store:
+                for file in contract_files:
+                    store.ingest_file(file)
+                contracts = store.iter_contracts(
+                    as_ico_set(filter_ico),
+                    source_files=[file.name for file in contract_files]
+                )
+                self.transform_smlouvy_contract_records(contracts, zdroj_smlouvy)
+        
+        if rzp_files:
+            zdroj_rzp = self.get_or_create_zdroj(
+                "RZP",
+                "Registr živnostenského podnikání",
+                "https://rzp.gov.cz",
+                "registr"
+            )
             for file in rzp_files:
-                if "transformed" not in str(file):
-                    self.transform_rzp_data(str(file), zdroj_rzp, filter_ico=filter_ico)
+                self.transform_rzp_data(str(file), zdroj_rzp, filter_ico=filter_ico)
         
-        # Save transformed data
-        self.save_transformed_data()
+        snapshot = self.save_transformed_data()
+        self.save_state(filter_ico, {key: fingerprints[key] for key in changed}, manifest, snapshot, full=False)
         
-        print(f"\nTransformation complete!")
+        print(f"\nIncremental transformation complete!")
         print(f"Nodes: {sum(len(v) for v in self.nodes.values())}")
         print(f"Relationships: {sum(len(v) for v in self.relationships.values())}")
     
+    @staticmethod
+    def state_filter(filter_ico) -> Optional[List[str]]:
+        """Filtr IČO v podobě ukládané do manifestu (seřazený seznam, None = bez filtru)."""
+        filter_icos = as_ico_set(filter_ico)
+        return sorted(filter_icos) if filter_icos else None
+    
+    def export_indexes(self) -> dict:
+        """Indexy entit pro uložení mezi běhy inkrementální transformace (JSON serializovatelné)."""
+        pochazi_z = {}
+        for (entity_id, zdroj_id), datum_ziskani in self.pochazi_z_ulozene.items():
+            pochazi_z.setdefault(zdroj_id, {})[entity_id] = datum_ziskani
+        for (entity_id, zdroj_id), (datum_ziskani, _) in self.pochazi_z.items():
+            pochazi_z.setdefault(zdroj_id, {})[entity_id] = datum_ziskani
+        
+        return {
+            "firmy_by_ico": self.firmy_by_ico,
+            "zadavatele_by_ico": self.zadavatele_by_ico,
+            "osoby_by_id": self.osoby_by_id,
+            "osoby_by_jmeno": [
+                [jmeno, prijmeni, list(by_datum.items())]
+                for (jmeno, prijmeni), by_datum in self.osoby_by_jmeno.items()
+            ],
+            "zdroje": self.zdroje,
+            "pochazi_z": pochazi_z
+        }
+    
+    def restore_indexes(self, index: dict) -> None:
+        """
+        Obnoví indexy entit z předchozího běhu.
+        
+        Entity z indexů se znovu nevytvářejí (nejsou v self.nodes), nové výskyty se
+        proti nim deduplikují.
+        """
+        self.firmy_by_ico = index["firmy_by_ico"]
+        self.zadavatele_by_ico = index["zadavatele_by_ico"]
+        self.osoby_by_id = index["osoby_by_id"]
+        self.osoby_by_jmeno = {
+            (jmeno, prijmeni): dict(by_datum)
+            for jmeno, prijmeni, by_datum in index["osoby_by_jmeno"]
+        }
+        self.zdroje = index["zdroje"]
+        self.pochazi_z_ulozene = {
+            (entity_id, zdroj_id): datum_ziskani
+            for zdroj_id, entities in index["pochazi_z"].items()
+            for entity_id, datum_ziskani in entities.items()
+        }
+    
+    def save_state(self, filter_ico, fingerprints: dict, manifest: dict, snapshot: str, full: bool) -> None:
+        """
+        Uloží indexy entit, zapíše otisky transformovaných vstupních souborů do manifestu
+        a zapíše snapshot jako nenačtený (loader načte všechny nenačtené delty).
+        """
+        save_entity_index(self.export_indexes())
+        record_inputs(manifest, fingerprints, self.state_filter(filter_ico))
+        record_snapshot(Path(snapshot), full)
+        print(f"Saved incremental transform state ({len(fingerprints)} input files)")
+    
     def transform_smlouvy_contracts(self, file_path, zdroj_id: str, filter_ico=None):
         """
         Transformuje smlouvy z smlouvy.gov.cz do Neo4j formátu.
@@ -255,29 +731,52 @@ class Neo4jTransformer:
         """
         print(f"Processing smlouvy.gov.cz contracts from {os.path.basename(file_path)}...")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            contracts = json.load(f)
+        # Extrahované soubory (.jsonl, .jsonl.gz i starší .json) se čtou průběžně
+        contracts = iter_extracted_contracts(Path(file_path))
+        self.transform_smlouvy_contract_records(contracts, zdroj_id, filter_ico=filter_ico)
+    
+    def transform_smlouvy_contracts_from_store(self, store: ContractStore, zdroj_id: str, filter_ico=None):
+        """
+        Transformuje smlouvy z úložiště posledních verzí (jeden Zakazka node na smlouvu).
         
+        Filtr podle IČO se aplikuje už v dotazu do úložiště.
+        """
+        print(f"Processing smlouvy.gov.cz contracts from store ({store.count()} contracts)...")
+        filter_icos = as_ico_set(filter_ico)
+        self.transform_smlouvy_contract_records(store.iter_contracts(filter_icos), zdroj_id)
+    
+    def transform_smlouvy_contracts_from_parquet(self, zdroj_id: str, filter_ico=None):
+        """
+        Transformuje poslední verze smluv z Parquet datasetu.
+        
+        Čtou se jen sloupce potřebné pro transformaci, filtr podle IČO se
+        vyhodnotí už při čtení datasetu.
+        """
+        print("Processing smlouvy.gov.cz contracts from Parquet dataset...")
+        contracts = iter_parquet_contracts(PARQUET_TRANSFORM_COLUMNS, icos=as_ico_set(filter_ico))
+        self.transform_smlouvy_contract_records(contracts, zdroj_id)
+    
+    def transform_smlouvy_contract_records(self, contracts, zdroj_id: str, filter_ico=None):
+        """Transformuje iterovatelnou kolekci smluv (záznamy Contract) do Neo4j formátu."""
         contracts_processed = 0
+        filter_icos = as_ico_set(filter_ico)
         
         for contract in contracts:
             # Filtrování podle IČO (pokud je zadáno)
-            if filter_ico:
-                authority_ico = contract.get("authority", {}).get("ico")
-                contractor_ico = contract.get("contractor", {}).get("ico")
-                if authority_ico != filter_ico and contractor_ico != filter_ico:
+            if filter_icos:
+                if contract.authority_ico not in filter_icos and contract.contractor_ico not in filter_icos:
                     continue
             
             # Vytvořit Zakazka node
-            contract_id = contract.get("contract_id", "")
+            contract_id = contract.contract_id
             zakazka_id = contract_id if contract_id else f"ZAKAZKA-{contracts_processed}"
             
             # Určit hodnotu (preferovat s DPH, jinak bez DPH)
-            value = contract.get("value_with_vat") or contract.get("value_without_vat")
+            value = contract.value_with_vat or contract.value_without_vat
             
             # Parse dates
-            publication_date = contract.get("published_date", "")
-            contract_date = contract.get("contract_date", "")
+            publication_date = contract.published_date
+            contract_date = contract.contract_date
             
             # Extract year from date
             rok = None
@@ -296,9 +795,9 @@ class Neo4jTransformer:
             
             zakazka_node = {
                 "zakazka_id": zakazka_id,
-                "nazev": contract.get("subject", ""),
+                "nazev": contract.subject,
                 "stav_zaznamu": "overeny",
-                "popis": contract.get("subject", ""),
+                "popis": contract.subject,
                 "stav": "ukoncena",  # Smlouvy v registru jsou dokončené
                 "hodnota": value,
                 "mena": "CZK",
@@ -312,24 +811,19 @@ class Neo4jTransformer:
             self.nodes["Zakazka"].append(zakazka_node)
             
             # Link Zakazka to Zdroj
-            rel_zdroj = {
-                "from": zakazka_id,
-                "to": zdroj_id,
-                "datum_ziskani": datetime.now().isoformat()
-            }
-            self.relationships["POCHAZI_Z"].append(rel_zdroj)
+            self._link_zdroj(zakazka_id, zdroj_id)
             
             # Vytvořit Zadavatel node (authority)
-            authority = contract.get("authority", {})
+            authority = contract.authority
             zadavatel_id = None
-            if authority.get("ico") or authority.get("name"):
-                zadavatel_id = self.get_or_create_zadavatel(authority, zdroj_id)
+            if authority and (authority.ico or authority.name):
+                zadavatel_id = self.get_or_create_zadavatel(authority.to_dict(), zdroj_id)
             
             # Vytvořit Firma node (contractor)
-            contractor = contract.get("contractor", {})
+            contractor = contract.contractor
             firma_id = None
-            if contractor.get("ico") or contractor.get("name"):
-                firma_id = self.get_or_create_firma(contractor, zdroj_id)
+            if contractor and (contractor.ico or contractor.name):
+                firma_id = self.get_or_create_firma(contractor.to_dict(), zdroj_id)
             
             # Vytvořit relationships
             if zadavatel_id and zakazka_id:
@@ -452,7 +946,7 @@ class Neo4jTransformer:
             
             # Clean None values
             node = {k: v for k, v in node.items() if v is not None and v != ""}
-            self.nodes["Osoba"].append(node)
+            self.add_osoba(node)
             
             # Create VYKONAVA_FUNKCI relationship if company_id exists
             company_id = person.get("company_id")
@@ -484,13 +978,26 @@ class Neo4jTransformer:
         with open(file_path, 'r', encoding='utf-8') as f:
             rzp_persons = json.load(f)
         
-        persons_processed = 0
+        self.transform_rzp_persons(rzp_persons, zdroj_id, filter_ico=filter_ico)
+        self.transform_rzp_name_relationships(rzp_persons, zdroj_id)
+        
+        print(f"  Processed {len(rzp_persons)} persons from RZP")
+    
+    def transform_rzp_persons(self, rzp_persons, zdroj_id: str, filter_ico=None):
+        """
+        Transformuje osoby z RZP (identifikované IČO) a jejich vztahy k firmám.
+        
+        Nezávisí na osobách z jiných souborů RZP, při paralelní transformaci běží ve workeru.
+        """
+        filter_icos = as_ico_set(filter_ico)
+        if filter_icos:
+            filter_icos = {normalize_ico(ico) for ico in filter_icos}
         
         for person_data in rzp_persons:
             # Filtrování podle IČO (pokud je zadáno)
-            if filter_ico:
+            if filter_icos:
                 person_ico = person_data.get("ico")
-                if person_ico != normalize_ico(filter_ico):
+                if person_ico not in filter_icos:
                     continue
             
             # Vytvořit Osoba node
@@ -504,7 +1011,7 @@ class Neo4jTransformer:
                 osoba_id = f"OSOBA-{jmeno}_{prijmeni}".replace(" ", "_")[:30]
             
             # Zkontrolovat, zda už osoba neexistuje
-            if any(o.get("osoba_id") == osoba_id for o in self.nodes["Osoba"]):
+            if osoba_id in self.osoby_by_id:
                 # Osoba už existuje, použít existující
                 pass
             else:
@@ -525,15 +1032,10 @@ class Neo4jTransformer:
                 
                 # Clean None values
                 osoba_node = {k: v for k, v in osoba_node.items() if v is not None and v != ""}
-                self.nodes["Osoba"].append(osoba_node)
+                self.add_osoba(osoba_node)
             
             # Propojit se Zdroj
-            rel_zdroj = {
-                "from": osoba_id,
-                "to": zdroj_id,
-                "datum_ziskani": datetime.now().isoformat()
-            }
-            self.relationships["POCHAZI_Z"].append(rel_zdroj)
+            self._link_zdroj(osoba_id, zdroj_id)
             
             # Vytvořit vztahy s firmami
             relationships = person_data.get("relationships", [])
@@ -574,9 +1076,15 @@ class Neo4jTransformer:
                     }
                     rel = {k: v for k, v in rel.items() if v is not None and v != ""}
                     self.relationships["VLASTNI_PODIL"].append(rel)
+    
+    def transform_rzp_name_relationships(self, rzp_persons, zdroj_id: str):
+        """
+        Zpracuje relationships z RZP, které mají osoba_jmeno místo osoba_id
+        (např. ze statutárního orgánu, kde osoba ještě neexistuje jako node).
         
-        # Zpracovat relationships, které mají osoba_jmeno místo osoba_id
-        # (např. ze statutárního orgánu, kde osoba ještě neexistuje jako node)
+        Osoba se hledá podle jména mezi všemi dosud transformovanými osobami, při
+        paralelní transformaci proto běží až při slučování výsledků (v pořadí souborů).
+        """
         for person_data in rzp_persons:
             relationships = person_data.get("relationships", [])
             for relationship in relationships:
@@ -588,13 +1096,8 @@ class Neo4jTransformer:
                     jmeno = jmeno_parts[0] if jmeno_parts else ""
                     prijmeni = jmeno_parts[1] if len(jmeno_parts) > 1 else ""
                     
-                    # Zkusit najít existující osobu
-                    osoba_id = None
-                    for osoba in self.nodes["Osoba"]:
-                        if (osoba.get("jmeno") == jmeno and 
-                            osoba.get("prijmeni") == prijmeni):
-                            osoba_id = osoba.get("osoba_id")
-                            break
+                    # Zkusit najít existující osobu (index podle jména)
+                    osoba_id = self.find_osoba_by_jmeno(jmeno, prijmeni)
                     
                     # Pokud osoba neexistuje, vytvořit novou
                     if not osoba_id:
@@ -608,15 +1111,10 @@ class Neo4jTransformer:
                             "stav_zaznamu": "overeny"
                         }
                         osoba_node = {k: v for k, v in osoba_node.items() if v is not None and v != ""}
-                        self.nodes["Osoba"].append(osoba_node)
+                        self.add_osoba(osoba_node)
                         
                         # Propojit se Zdroj
-                        rel_zdroj = {
-                            "from": osoba_id,
-                            "to": zdroj_id,
-                            "datum_ziskani": datetime.now().isoformat()
-                        }
-                        self.relationships["POCHAZI_Z"].append(rel_zdroj)
+                        self._link_zdroj(osoba_id, zdroj_id)
                     
                     # Vytvořit relationship s firmou
                     firma_ico = relationship.get("firma_ico")
@@ -639,21 +1137,26 @@ class Neo4jTransformer:
                             }
                             rel = {k: v for k, v in rel.items() if v is not None and v != ""}
                             self.relationships["VYKONAVA_FUNKCI"].append(rel)
-            
-            persons_processed += 1
-        
-        print(f"  Processed {persons_processed} persons from RZP")
     
     def save_transformed_data(self):
-        """Save transformed nodes and relationships to JSON files."""
+        """
+        Save transformed nodes and relationships to JSON files.
+        
+        Soubory se zapisují po položkách (ze seznamů i ze shardů streamovaného režimu),
+        celý snapshot se v paměti nesestavuje. Shardy se po zápisu snapshotu smažou.
+        
+        Returns:
+            Cesta ke kombinovanému souboru snapshotu (neo4j_data_*.json)
+        """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.finalize_pochazi_z()
         
         # Save nodes
         for node_type, nodes in self.nodes.items():
             if nodes:
                 output_file = os.path.join(self.output_dir, f"nodes_{node_type.lower()}_{timestamp}.json")
                 with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(nodes, f, indent=2, ensure_ascii=False, default=str)
+                    write_json_array(f, nodes)
                 print(f"Saved {len(nodes)} {node_type} nodes to {os.path.basename(output_file)}")
         
         # Save relationships
@@ -661,27 +1164,57 @@ class Neo4jTransformer:
             if rels:
                 output_file = os.path.join(self.output_dir, f"rels_{rel_type.lower()}_{timestamp}.json")
                 with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(rels, f, indent=2, ensure_ascii=False, default=str)
+                    write_json_array(f, rels)
                 print(f"Saved {len(rels)} {rel_type} relationships to {os.path.basename(output_file)}")
         
-        # Save combined file
-        combined = {
-            "nodes": self.nodes,
-            "relationships": self.relationships,
-            "timestamp": timestamp
-        }
+        # Save combined file ({"nodes": ..., "relationships": ..., "timestamp": ...})
         combined_file = os.path.join(self.output_dir, f"neo4j_data_{timestamp}.json")
         with open(combined_file, 'w', encoding='utf-8') as f:
-            json.dump(combined, f, indent=2, ensure_ascii=False, default=str)
+            f.write('{\n  "nodes": ')
+            write_json_arrays(f, self.nodes, level=1)
+            f.write(',\n  "relationships": ')
+            write_json_arrays(f, self.relationships, level=1)
+            f.write(f',\n  "timestamp": {json.dumps(timestamp)}\n}}')
+        
+        if self.streaming:
+            self.close_shards()
         
         print(f"\nAll transformed data saved to {self.output_dir}")
+        return combined_file
+    
+    def close_shard_files(self):
+        """Zavře soubory shardů (shardy zůstanou na disku a lze je dál číst)."""
+        for items in list(self.nodes.values()) + list(self.relationships.values()):
+            if isinstance(items, JsonArrayShard):
+                items.close()
+    
+    def close_shards(self):
+        """Zavře a smaže shardy streamovaného režimu (po zápisu snapshotu už nejsou potřeba)."""
+        self.close_shard_files()
+        if self.shard_dir:
+            shutil.rmtree(self.shard_dir, ignore_errors=True)
+            # Adresář shards/ smazat, pokud v něm nejsou shardy jiných běhů
+            if self.shard_dir.parent.exists() and not any(self.shard_dir.parent.iterdir()):
+                self.shard_dir.parent.rmdir()
 
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="Transform data to Neo4j format (Czech schema)")
     parser.add_argument("--ico", type=str, help="Filter by IČO")
+    parser.add_argument("--parquet", action="store_true", help="Read contracts from the Parquet dataset (requires pyarrow)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Transform only new or changed extracted files and save a delta snapshot")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Transform contract partitions and RZP files in parallel in this many processes (full transform)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Write nodes and relationships to append-only shards as they are produced (bounded memory)")
     args = parser.parse_args()
     
-    transformer = Neo4jTransformer()
-    transformer.transform_all(filter_ico=args.ico)
+    transformer = Neo4jTransformer(streaming=args.streaming)
+    if args.incremental:
+        transformer.transform_incremental(filter_ico=args.ico)
+    elif args.workers > 1 and not args.parquet:
+        transformer.transform_parallel(filter_ico=args.ico, workers=args.workers)
+    else:
+        transformer.transform_all(filter_ico=args.ico, use_parquet=args.parquet)
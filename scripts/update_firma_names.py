@@ -4,7 +4,6 @@ Aktualizuje názvy firem v Neo4j z dat smlouvy.
 Použije se pro doplnění názvů firem, které máme v databázi pouze s IČO.
 """
 
-import json
 from pathlib import Path
 from typing import Dict
 import sys
@@ -12,6 +11,8 @@ import sys
 # Přidat parent directory do path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from scripts.extract_smlouvy_contracts import EXTRACTED_DIR, iter_extracted_dicts, list_extracted_files
+
 try:
     from neo4j import GraphDatabase
     from config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
@@ -29,18 +30,14 @@ def get_firma_names_from_contracts() -> Dict[str, str]:
     """
     firma_names = {}
     
-    extracted_dir = Path(__file__).parent.parent / "data" / "tenders" / "extracted" / "smlouvy_gov"
-    
-    if not extracted_dir.exists():
-        print(f"[update_firma_names] Adresář neexistuje: {extracted_dir}")
+    if not EXTRACTED_DIR.exists():
+        print(f"[update_firma_names] Adresář neexistuje: {EXTRACTED_DIR}")
         return firma_names
     
-    for json_file in extracted_dir.glob("*.json"):
+    for json_file in list_extracted_files(EXTRACTED_DIR):
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                contracts = json.load(f)
-            
-            for contract in contracts:
+            # Smlouvy se čtou průběžně (JSON Lines po řádcích)
+            for contract in iter_extracted_dicts(json_file):
                 # Zadavatel (může být objekt nebo přímo ico/name)
                 if isinstance(contract.get('authority'), dict):
                     zadavatel_ico = contract.get('authority', {}).get('ico')